@@ -1 +1,14 @@
-from .java_bytecode_disassembler import disassembler
\ No newline at end of file
+from .java_bytecode_disassembler import (disassembler, disassemble, disassemble_bytes, register_attribute_handler,
+                                         unregister_attribute_handler)
+from .classfile import (ClassFile, ConstantPool, FieldInfo, MethodInfo, CodeAttribute, ExceptionEntry, Attribute,
+                        DisassemblyResult)
+from .batch import disassemble_many, iter_disassemble
+from .cache import ResultCache
+from .instrumentation import Collector
+from .archive import disassemble_archive, iter_archive_classes
+from .random_access import ClassIndex, open_class
+from .callgraph import CallGraph, build_call_graph
+from .dependencies import DependencyGraph, build_dependency_graph, class_dependencies
+from .corpus_index import CorpusIndex
+from .hierarchy import Hierarchy, build_hierarchy
+from .output import classfile_to_dict, write_classfile, write_jsonl
@@ -0,0 +1,121 @@
+import argparse   # command line parsing
+import sys
+
+from .batch import BatchSummary, iter_disassemble
+from .cache import ResultCache
+from .dependencies import build_dependency_graph
+from .instrumentation import Collector
+from .java_bytecode_disassembler import SCAN_MODES
+from .output import OUTPUT_FORMATS, write_jsonl, write_results
+
+# Command line interface------------------------------------------------------------------------------------------------
+# Disassembles '.class' files, archives and directories of both in parallel, e.g.
+#
+#     python -m java_bytecode_disassembler -j 8 plugins/ Main.class app.jar
+#     python -m java_bytecode_disassembler --format jsonl -o classes.jsonl app.jar
+#     python -m java_bytecode_disassembler --metrics /var/lib/node_exporter/disassembler.prom plugins/
+#     python -m java_bytecode_disassembler --dependency-cycles package build/classes
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="java_bytecode_disassembler",
+                                     description="Disassemble java '.class' files and archives in parallel.")
+    parser.add_argument("paths", nargs="+",
+                        help="'.class' files, '.jar'/'.zip'/'.war'/'.ear' archives, or directories to scan recursively")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=None, help="number of files handed to a worker at a time")
+    parser.add_argument("--write", action="store_true",
+                        help="write the disassembled data to the 'deconst_class' directory")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS + ("jsonl",), default=None,
+                        help="write one '.json' or '.bin' file per class, or all classes to one JSON-Lines file")
+    parser.add_argument("-o", "--output", default=None,
+                        help="output directory for --format json/binary (default: 'deconst_class'), or output file "
+                             "for --format jsonl (default: 'deconst_class.jsonl', appended to)")
+    parser.add_argument("--scan", choices=SCAN_MODES, default="full",
+                        help="'header' stops after the interfaces table, 'constants' after the constant pool and "
+                             "this_class, 'version' only reads the first 8 bytes")
+    parser.add_argument("--attributes", type=lambda value: [name for name in value.split(",") if name],
+                        default=None, help="comma separated allow-list of attributes to decode, e.g. "
+                                           "'Code,LineNumberTable'; all other attributes are skipped")
+    parser.add_argument("--cache", default=None, help="directory of a persistent result cache keyed by class content")
+    parser.add_argument("--cache-size", type=int, default=1024, help="size cap of the result cache in MiB")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="disassemble identical copies of a class only once per batch")
+    parser.add_argument("--metrics", default=None,
+                        help="write per-phase timings and attribute/instruction counts of the run to this file")
+    parser.add_argument("--metrics-format", choices=("prometheus", "json"), default="prometheus",
+                        help="format of the --metrics file (default: Prometheus text format)")
+    parser.add_argument("--dependency-cycles", choices=("class", "package"), default=None,
+                        help="only read the constant pools, print the dependency cycles between classes or packages "
+                             "and exit with status 1 if there are any (e.g. as a pre-commit check)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print additional data during disassembly")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for option, value in (("--workers", args.workers), ("--chunksize", args.chunksize)):
+        if value is not None and value < 1:
+            parser.error(option + " must be at least 1")
+    if args.write and (args.cache is not None or args.dedupe):
+        parser.error("--write can not be combined with --cache or --dedupe")
+
+    cache = ResultCache(args.cache, args.cache_size << 20) if args.cache is not None else None
+    collector = Collector() if args.metrics is not None else None
+
+    if args.dependency_cycles is not None:
+        return check_dependency_cycles(args, cache, collector)
+
+    summary = BatchSummary()
+    results = iter_disassemble(args.paths, workers=args.workers, chunksize=args.chunksize, write=args.write,
+                               verbose=args.verbose, scan=args.scan, attributes=args.attributes, cache=cache,
+                               dedupe=args.dedupe, collector=collector)
+    if args.format == "jsonl":
+        with open(args.output or "deconst_class.jsonl", "a", encoding="utf-8") as stream:
+            for result in write_jsonl(results, stream):
+                summary.add(result)
+    else:
+        if args.format is not None:
+            results = write_results(results, args.output or "deconst_class", args.format)
+        for result in results:
+            summary.add(result)
+
+    for result in summary.failed:
+        print("FAILED: " + result.path, file=sys.stderr)
+    print(summary.report())
+    if cache is not None:
+        print("Cache: " + str(cache.hits) + " hits, " + str(cache.misses) + " misses")
+    write_metrics(args, collector)
+    return 1 if summary.failed else 0
+
+
+def write_metrics(args, collector):
+    if collector is not None:
+        if args.metrics_format == "json":
+            with open(args.metrics, "w", encoding="utf-8") as output:
+                output.write(collector.to_json())
+        else:
+            collector.write_prometheus(args.metrics)
+
+
+def check_dependency_cycles(args, cache, collector):
+    graph = build_dependency_graph(args.paths, workers=args.workers, chunksize=args.chunksize, cache=cache,
+                                   dedupe=args.dedupe, collector=collector)
+    if args.dependency_cycles == "package":
+        cycles = graph.packages().cycles()
+    else:
+        cycles = graph.cycles()
+    for pathway in graph.failed:
+        print("FAILED: " + pathway, file=sys.stderr)
+    for cycle in cycles:
+        print("CYCLE: " + " <-> ".join(cycle))
+    print("Read " + str(graph.classes) + " classes, " + str(graph.edge_count) + " dependencies, " + str(len(cycles)) +
+          " " + args.dependency_cycles + " cycles")
+    write_metrics(args, collector)
+    return 1 if cycles or graph.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import io            # in-memory file objects for archives nested inside other archives
+import os
+import traceback     # for system traceback in error handling operations
+import weakref       # mappings of the open archives
+import zipfile       # reading '.jar', '.zip', '.war' and '.ear' archives
+
+from .classfile import DisassemblyResult
+from .java_bytecode_disassembler import disassembler, VERSION_HEADER_SIZE
+from .reader import map_stream
+
+# archive---------------------------------------------------------------------------------------------------------------
+# Java archives are plain zip files. The '.class' entries are read with zipfile straight into memory and handed to the
+# disassembler as bytes, so an archive is analyzed without extracting it or writing temporary files. The central
+# directory of every archive is walked once; archives nested inside an archive (e.g. 'WEB-INF/lib/*.jar' inside a
+# '.war') are opened from memory and walked in the same pass.
+#
+# Archive entries are named '<archive>!/<entry>', following the notation used by the JVM for jar URLs, e.g.
+#
+#     app.war!/WEB-INF/lib/util.jar!/com/example/Util.class
+#
+# Entries that are stored without compression can be read with zero_copy=True: the archive file is memory-mapped once
+# and the entry is returned as a memoryview of the mapping instead of being copied out of the archive. The CRC of such
+# an entry is not checked. Zero-copy entries can not be sent to worker processes, so the batch interface only uses
+# them when it disassembles in the current process.
+
+ARCHIVE_SUFFIXES = (".jar", ".zip", ".war", ".ear")
+ENTRY_SEPARATOR = "!/"
+LOCAL_HEADER_SIZE = 30
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+_mappings = weakref.WeakKeyDictionary()   # ZipFile -> mmap of the archive file, or None if it can not be mapped
+
+
+def is_archive(pathway):
+    return os.fspath(pathway).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+# iter_archive_entries() walks the central directory of an open ZipFile and yields (name, archive, info) for every
+# '.class' entry without reading the entry itself. Nested archives are read into memory and walked in turn; a nested
+# archive that can not be opened yields a failed DisassemblyResult in its place.
+def iter_archive_entries(archive, prefix):
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        name = prefix + ENTRY_SEPARATOR + info.filename
+        if info.filename.endswith(".class"):
+            yield name, archive, info
+        elif is_archive(info.filename):
+            try:
+                nested = zipfile.ZipFile(io.BytesIO(archive.read(info)))
+            except Exception:
+                yield DisassemblyResult(name, None, traceback.format_exc())
+                continue
+            yield from iter_archive_entries(nested, name)
+
+
+# archive_mapping() maps the file behind an open ZipFile once; archives opened from memory are not mapped
+def archive_mapping(archive):
+    try:
+        return _mappings[archive]
+    except KeyError:
+        pass
+    try:
+        mapping = map_stream(archive.fp)
+    except (AttributeError, OSError, ValueError):
+        mapping = None   # a nested archive held in a BytesIO, or a file object without a file descriptor
+    _mappings[archive] = mapping
+    return mapping
+
+
+# stored_entry() returns a memoryview of the data of an uncompressed entry, located through its local file header, or
+# None if the entry has to be read through zipfile
+def stored_entry(archive, info):
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:   # compressed or encrypted
+        return None
+    mapping = archive_mapping(archive)
+    if not mapping:
+        return None
+    header = mapping[info.header_offset:info.header_offset + LOCAL_HEADER_SIZE]
+    if len(header) != LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIGNATURE:
+        return None
+    start = (info.header_offset + LOCAL_HEADER_SIZE + int.from_bytes(header[26:28], "little") +
+             int.from_bytes(header[28:30], "little"))
+    if start + info.file_size > len(mapping):
+        return None
+    return memoryview(mapping)[start:start + info.file_size]
+
+
+# read_entry() returns the contents of an archive entry. In the "version" scan mode only the first 8 bytes are
+# decompressed. With zero_copy=True, uncompressed entries are returned as a memoryview of the mapped archive.
+def read_entry(archive, info, scan="full", zero_copy=False):
+    if zero_copy:
+        view = stored_entry(archive, info)
+        if view is not None:
+            return view[:VERSION_HEADER_SIZE] if scan == "version" else view
+    if scan == "version":
+        with archive.open(info) as entry:
+            return entry.read(VERSION_HEADER_SIZE)
+    return archive.read(info)
+
+
+# iter_archive_classes() yields (name, bytes) for every '.class' entry of the archive. The archive may be given as a
+# path or as a binary file object; name is used as the prefix of the entry names and defaults to the path.
+def iter_archive_classes(archive, name=None):
+    if name is None:
+        name = os.fspath(archive) if isinstance(archive, (str, os.PathLike)) else "<archive>"
+    with zipfile.ZipFile(archive) as opened:
+        for entry in iter_archive_entries(opened, name):
+            if isinstance(entry, DisassemblyResult):
+                continue
+            entry_name, entry_archive, info = entry
+            yield entry_name, entry_archive.read(info)
+
+
+# disassemble_archive() yields one DisassemblyResult per '.class' entry of the archive, in central directory order.
+def disassemble_archive(archive, name=None, write=False, verbose=False, fail_check=False, scan="full",
+                        attributes=None, collector=None, lazy=False):
+    if name is None:
+        name = os.fspath(archive) if isinstance(archive, (str, os.PathLike)) else "<archive>"
+    with zipfile.ZipFile(archive) as opened:
+        for entry in iter_archive_entries(opened, name):
+            if isinstance(entry, DisassemblyResult):
+                yield entry
+                continue
+            entry_name, entry_archive, info = entry
+            yield disassembler(entry_name, verbose=verbose, fail_check=fail_check, write=write,
+                               source=read_entry(entry_archive, info, scan, zero_copy=True), scan=scan,
+                               attributes=attributes, collector=collector, lazy=lazy).result()
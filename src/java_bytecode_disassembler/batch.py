@@ -0,0 +1,284 @@
+import copy                                           # copies of results shared by identical classes
+import os                                             # filesystem manipulation
+import time                                           # for timing batch runs
+import traceback                                      # for system traceback in error handling operations
+import zipfile                                        # reading '.jar', '.zip', '.war' and '.ear' archives
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor    # process pool used to spread the work across cores
+from contextlib import ExitStack
+
+from .archive import is_archive, iter_archive_entries, read_entry
+from .cache import ResultCache, cache_key
+from .classfile import DisassemblyResult
+from .instrumentation import Collector
+from .java_bytecode_disassembler import disassembler, VERSION_HEADER_SIZE
+
+# batch-----------------------------------------------------------------------------------------------------------------
+# Batch disassembly of whole directories and lists of '.class' files. The paths are split into chunks and each chunk is
+# disassembled inside a worker process, so every process keeps its own copy of the disassembler state and the work
+# scales with the number of cores. Results are collected per file; a file that fails to disassemble produces a result
+# with the error text instead of stopping the batch.
+#
+# Archives ('.jar', '.zip', '.war', '.ear') are expanded into their '.class' entries (see archive.py). The entries are
+# read in the parent process and the workers receive the raw bytes, so nothing is extracted to disk.
+#
+# With a ResultCache (see cache.py) or dedupe=True, the parent also reads the plain '.class' files and hashes the bytes
+# of every class. Classes found in the cache, and repeated copies of a class within the batch (e.g. shaded copies in
+# several archives), are not sent to the workers at all.
+
+
+# find_class_files() expands the given paths: directories are walked recursively for '.class' files and archives, while
+# files are passed through as they are.
+def find_class_files(paths):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    for pathway in paths:
+        pathway = os.fspath(pathway)
+        if os.path.isdir(pathway):
+            for root, dirs, files in os.walk(pathway):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".class") or is_archive(name):
+                        yield os.path.join(root, name)
+        else:
+            yield pathway
+
+
+# collect_entries() lists everything the batch will disassemble: '.class' paths, and (name, archive, info) entries for
+# the contents of archives. Each archive is opened once, registered on the given ExitStack so that it stays open until
+# the batch has finished, and its central directory is walked once. An archive that can not be opened is listed as a
+# failed DisassemblyResult.
+def collect_entries(paths, archives):
+    entries = []
+    for pathway in find_class_files(paths):
+        if is_archive(pathway):
+            try:
+                archive = archives.enter_context(zipfile.ZipFile(pathway))
+            except Exception:
+                entries.append(DisassemblyResult(pathway, None, traceback.format_exc()))
+                continue
+            entries.extend(iter_archive_entries(archive, pathway))
+        else:
+            entries.append(pathway)
+    return entries
+
+
+# load_entry() turns an archive entry into (name, bytes) ready to be sent to a worker. Paths are read as well when
+# read_files is set, otherwise they are passed through unchanged, like failed results. zero_copy is only set when the
+# entries are disassembled in this process (see read_entry() in archive.py).
+def load_entry(entry, scan="full", read_files=False, zero_copy=False):
+    if isinstance(entry, tuple):
+        name, archive, info = entry
+        try:
+            return name, read_entry(archive, info, scan, zero_copy)
+        except Exception:
+            return DisassemblyResult(name, None, traceback.format_exc())
+    if read_files and not isinstance(entry, DisassemblyResult):
+        try:
+            with open(entry, "rb") as classfile_data:
+                return entry, classfile_data.read(VERSION_HEADER_SIZE if scan == "version" else -1)
+        except Exception:
+            return DisassemblyResult(entry, None, traceback.format_exc())
+    return entry
+
+
+# Runs inside the worker processes. Each call handles one chunk of entries and returns the results for the whole
+# chunk, which keeps the inter-process traffic down to one message per chunk. With collect=True the chunk is
+# instrumented by a Collector of its own, which is returned along with the results as (results, collector).
+def disassemble_chunk(chunk, options, collect=False):
+    if collect:
+        collector = Collector()
+        options = dict(options, collector=collector)
+    results = []
+    for entry in chunk:
+        if isinstance(entry, DisassemblyResult):
+            results.append(entry)
+        elif isinstance(entry, tuple):
+            name, source = entry
+            results.append(disassembler(name, source=source, **options).result())
+        else:
+            results.append(disassembler(entry, **options).result())
+    if collect:
+        return results, collector
+    return results
+
+
+def default_chunksize(total, workers):
+    # aim for roughly four chunks per worker so that the pool stays balanced when some classes are much larger than
+    # others, without paying the scheduling overhead of one task per file
+    return max(1, min(512, total // (workers * 4)))
+
+
+# iter_chunks() reads the archive entries of one chunk at a time, so that only the chunks currently being worked on are
+# held in memory rather than the decompressed contents of a whole archive.
+def iter_chunks(entries, chunksize, scan="full", read_files=False, zero_copy=False):
+    for index in range(0, len(entries), chunksize):
+        yield [load_entry(entry, scan, read_files, zero_copy) for entry in entries[index:index + chunksize]]
+
+
+# batch_lookup----------------------------------------------------------------------------------------------------------
+# Keeps the cache and the in-batch duplicate detection out of the workers. split() removes every class that is already
+# known from a chunk before it is sent to a worker; merge() puts the results of the worker back into input order,
+# stores them in the cache and fills in the classes that were held back.
+
+class batch_lookup:
+
+    __slots__ = ("cache", "dedupe", "scan", "attributes", "seen", "submitted")
+
+    def __init__(self, cache, dedupe, scan, attributes):
+        self.cache = cache
+        self.dedupe = dedupe
+        self.scan = scan
+        self.attributes = attributes
+        self.seen = {}           # key -> DisassemblyResult of the first copy of each class in the batch
+        self.submitted = set()   # keys sent to the workers so far
+
+    # returns the entries to send to the worker and the plan used by merge()
+    def split(self, chunk):
+        work = []
+        plan = []
+        for entry in chunk:
+            if isinstance(entry, DisassemblyResult):
+                # the class could not be read
+                plan.append((entry, None, None))
+                continue
+            name, source = entry
+            key = cache_key(source, self.scan, self.attributes)
+            if self.dedupe and (key in self.seen or key in self.submitted):
+                plan.append((None, name, key))
+                continue
+            if self.cache is not None:
+                classfile = self.cache.get(key)
+                if classfile is not None:
+                    result = self.renamed(DisassemblyResult(name, classfile), name)
+                    if self.dedupe:
+                        self.seen[key] = result
+                    plan.append((result, None, None))
+                    continue
+            self.submitted.add(key)
+            work.append(entry)
+            plan.append((None, None, key))
+        return work, plan
+
+    def merge(self, plan, results):
+        results = iter(results)
+        for result, name, key in plan:
+            if result is None and name is None:
+                # disassembled by the worker
+                result = next(results)
+                if self.cache is not None and result.ok:
+                    self.cache.put(key, result.classfile)
+                if self.dedupe:
+                    self.seen[key] = result
+            elif result is None:
+                # a repeated copy of a class that appeared earlier in the batch
+                result = self.renamed(self.seen[key], name)
+            yield result
+
+    @staticmethod
+    def renamed(result, name):
+        classfile = result.classfile
+        if classfile is not None and classfile.name != name:
+            classfile = copy.copy(classfile)
+            classfile.name = name
+        return DisassemblyResult(name, classfile, result.error)
+
+
+# iter_disassemble() yields one DisassemblyResult per '.class' file or archive entry, in the order of the input paths.
+# With workers=1 the files are processed in the current process; otherwise a ProcessPoolExecutor with the given number
+# of workers is used (None uses one worker per core). The counts of every parsed class are added to the collector, if
+# one is given (see instrumentation.py).
+def iter_disassemble(paths, workers=None, chunksize=None, write=False, verbose=False, fail_check=False, scan="full",
+                     attributes=None, cache=None, dedupe=False, collector=None):
+    options = {"write": write, "verbose": verbose, "fail_check": fail_check, "scan": scan, "attributes": attributes}
+
+    if write and (cache is not None or dedupe):
+        # the 'deconst_class' tree is only written while a class is disassembled, so no class may be skipped
+        raise ValueError("ERROR: the result cache and dedupe can not be combined with write")
+    if isinstance(cache, (str, os.PathLike)):
+        cache = ResultCache(cache)
+    lookup = batch_lookup(cache, dedupe, scan, attributes) if cache is not None or dedupe else None
+
+    with ExitStack() as archives:
+        entries = collect_entries(paths, archives)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if chunksize is None:
+            chunksize = default_chunksize(len(entries), workers)
+
+        if write:
+            # create the output directory up front so that the workers do not race to create it
+            os.makedirs(os.path.join(os.getcwd(), "deconst_class"), exist_ok=True)
+
+        in_process = workers == 1 or len(entries) <= chunksize
+        chunks = iter_chunks(entries, chunksize, scan, read_files=lookup is not None, zero_copy=in_process)
+
+        if in_process:
+            # the parsers run in this process and report to the collector directly
+            options["collector"] = collector
+            for chunk in chunks:
+                if lookup is None:
+                    yield from disassemble_chunk(chunk, options)
+                else:
+                    work, plan = lookup.split(chunk)
+                    yield from lookup.merge(plan, disassemble_chunk(work, options))
+            return
+
+        # keep a bounded number of chunks in flight; results are still yielded in input order
+        # the collectors of the workers are sent back with each chunk and merged into the given one
+        collect = collector is not None
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in chunks:
+                if lookup is None:
+                    pending.append((executor.submit(disassemble_chunk, chunk, options, collect), None))
+                else:
+                    work, plan = lookup.split(chunk)
+                    pending.append((executor.submit(disassemble_chunk, work, options, collect), plan))
+                if len(pending) >= workers * 2:
+                    yield from collect_chunk(pending.popleft(), lookup, collector)
+            while pending:
+                yield from collect_chunk(pending.popleft(), lookup, collector)
+
+
+def collect_chunk(submitted, lookup, collector=None):
+    future, plan = submitted
+    results = future.result()
+    if collector is not None:
+        results, chunk_collector = results
+        collector.merge(chunk_collector)
+    if plan is None:
+        return results
+    return lookup.merge(plan, results)
+
+
+def disassemble_many(paths, workers=None, chunksize=None, write=False, verbose=False, fail_check=False, scan="full",
+                     attributes=None, cache=None, dedupe=False, collector=None):
+    return list(iter_disassemble(paths, workers=workers, chunksize=chunksize, write=write, verbose=verbose,
+                                 fail_check=fail_check, scan=scan, attributes=attributes, cache=cache, dedupe=dedupe,
+                                 collector=collector))
+
+
+# BatchSummary----------------------------------------------------------------------------------------------------------
+# Small helper used by the command line interface to keep track of a running batch.
+
+class BatchSummary:
+
+    __slots__ = ("total", "failed", "started")
+
+    def __init__(self):
+        self.total = 0
+        self.failed = []
+        self.started = time.perf_counter()
+
+    def add(self, result):
+        self.total = self.total + 1
+        if not result.ok:
+            self.failed.append(result)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.total / elapsed if elapsed > 0 else 0.0
+        return ("Disassembled " + str(self.total) + " classes (" + str(len(self.failed)) + " failed) in " +
+                format(elapsed, ".2f") + "s, " + format(rate, ".1f") + " classes/s")
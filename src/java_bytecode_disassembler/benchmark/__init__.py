@@ -0,0 +1,14 @@
+from .generator import DEFAULT_SIZES, DIMENSIONS, generate_class
+from .runner import PHASES, flagged_phases, format_report, growth_exponent, measure, scale
+
+__all__ = [
+    "DEFAULT_SIZES",
+    "DIMENSIONS",
+    "PHASES",
+    "flagged_phases",
+    "format_report",
+    "generate_class",
+    "growth_exponent",
+    "measure",
+    "scale",
+]
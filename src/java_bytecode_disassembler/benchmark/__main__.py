@@ -0,0 +1,55 @@
+import argparse   # command line parsing
+import json
+import sys
+
+from .generator import DIMENSIONS
+from .runner import SUPERLINEAR_THRESHOLD, flagged_phases, format_report, scale
+
+# Benchmark command line interface--------------------------------------------------------------------------------------
+# Scales the synthetic classes along one or all dimensions and prints the per-phase times, e.g.
+#
+#     python -m java_bytecode_disassembler.benchmark --dimension code_length --steps 5
+#     python -m java_bytecode_disassembler.benchmark --json > benchmark.json
+#
+# The exit status is 1 when a phase grows faster than the threshold, so the benchmark can guard against regressions.
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="java_bytecode_disassembler.benchmark",
+                                     description="Benchmark the disassembler on synthetic classes of growing size.")
+    parser.add_argument("--dimension", choices=DIMENSIONS + ("all",), default="all", help="input size to scale")
+    parser.add_argument("--steps", type=int, default=4, help="number of sizes; every step doubles the size")
+    parser.add_argument("--start", type=int, default=None, help="size of the first step")
+    parser.add_argument("--repeat", type=int, default=3, help="parses per size; the fastest one is reported")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--threshold", type=float, default=SUPERLINEAR_THRESHOLD,
+                        help="growth exponent above which a phase is flagged")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.steps < 2:
+        build_parser().error("--steps must be at least 2 to fit a growth exponent")
+
+    dimensions = DIMENSIONS if args.dimension == "all" else (args.dimension,)
+    reports = []
+    for dimension in dimensions:
+        report = scale(dimension, steps=args.steps, start=args.start, repeat=args.repeat, memory=not args.no_memory,
+                       threshold=args.threshold)
+        reports.append(report)
+        if not args.json:
+            print(format_report(report))
+            print()
+
+    flagged = [(report["dimension"], phase) for report in reports for phase in flagged_phases(report)]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    elif flagged:
+        print("superlinear: " + ", ".join(dimension + "/" + phase for dimension, phase in flagged))
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import struct   # big-endian encoding of the class file structures
+
+# generator-------------------------------------------------------------------------------------------------------------
+# Builds synthetic '.class' files in pure Python, so the disassembler can be benchmarked on inputs of any size without a
+# java compiler. Every part of the class that the parser spends time on can be scaled independently:
+#
+#     constants           number of extra Utf8/Integer entries in the constant pool
+#     methods             number of methods, each with a Code attribute
+#     code_length         length in bytes of the code array of each method
+#     stackmap_frames     number of StackMapTable frames per method
+#     annotation_depth    nesting depth of the class level RuntimeVisibleAnnotations
+#     local_variables     number of LocalVariableTable entries per method
+#
+# The files are structurally valid (every length and index is consistent, so the parser reads them from start to end)
+# but the bytecode is not meant to pass the verifier of a JVM.
+
+DEFAULT_SIZES = {
+    "constants": 16,
+    "methods": 4,
+    "code_length": 64,
+    "stackmap_frames": 4,
+    "annotation_depth": 2,
+    "local_variables": 4,
+}
+
+DIMENSIONS = tuple(DEFAULT_SIZES)
+
+
+class constant_pool_builder:
+
+    __slots__ = ("entries", "count", "index")
+
+    def __init__(self):
+        self.entries = []   # encoded entries
+        self.count = 1      # index 0 is reserved
+        self.index = {}     # (tag, value) -> index, so every constant is only added once
+
+    def add(self, key, encoded, slots=1):
+        index = self.index.get(key)
+        if index is None:
+            index = self.count
+            self.entries.append(encoded)
+            self.count = self.count + slots
+            self.index[key] = index
+        return index
+
+    def utf8(self, text):
+        encoded = text.encode("utf-8")
+        return self.add(("Utf8", text), struct.pack(">BH", 1, len(encoded)) + encoded)
+
+    def integer(self, value):
+        return self.add(("Integer", value), struct.pack(">Bi", 3, value))
+
+    def class_ref(self, name):
+        return self.add(("Class", name), struct.pack(">BH", 7, self.utf8(name)))
+
+    def string(self, text):
+        return self.add(("String", text), struct.pack(">BH", 8, self.utf8(text)))
+
+    def name_and_type(self, name, descriptor):
+        return self.add(("NameAndType", name, descriptor),
+                        struct.pack(">BHH", 12, self.utf8(name), self.utf8(descriptor)))
+
+    def methodref(self, owner, name, descriptor):
+        return self.add(("Methodref", owner, name, descriptor),
+                        struct.pack(">BHH", 10, self.class_ref(owner), self.name_and_type(name, descriptor)))
+
+    def encode(self):
+        return struct.pack(">H", self.count) + b"".join(self.entries)
+
+
+def attribute(name_index, body):
+    return struct.pack(">HI", name_index, len(body)) + body
+
+
+# generate_code() fills code_length bytes with a repeating run of instructions that carry operands (sipush, ldc_w,
+# invokestatic, goto) and ends with a return
+def generate_code(code_length, constant, method):
+    code = bytearray()
+    pattern = (struct.pack(">Bh", 0x11, 1000) + b"\x57" +          # sipush 1000; pop
+               struct.pack(">BH", 0x13, constant) + b"\x57" +       # ldc_w #constant; pop
+               struct.pack(">BH", 0xb8, method) +                   # invokestatic #method
+               struct.pack(">Bh", 0xa7, 3))                         # goto +3
+    while len(code) + len(pattern) < code_length:
+        code += pattern
+    code += b"\x00" * (max(code_length, len(code) + 1) - len(code) - 1)   # nop padding
+    code += b"\xb1"                                                       # return
+    return bytes(code)
+
+
+def generate_stackmaptable(pool, frames):
+    body = bytearray(struct.pack(">H", frames))
+    object_index = pool.class_ref("java/lang/Object")
+    for index in range(frames):
+        kind = index % 4
+        if kind == 0:
+            body += bytes([index % 64])                                           # same_frame
+        elif kind == 1:
+            body += bytes([64 + index % 64, 1])                                   # same_locals_1_stack_item (int)
+        elif kind == 2:
+            body += struct.pack(">BHB", 252, 1, 1)                                # append_frame (int)
+        else:
+            body += struct.pack(">BHHBHBHB", 255, 1, 2, 7, object_index, 1, 1, 0)   # full_frame
+    return bytes(body)
+
+
+def generate_localvariabletable(pool, entries, code_length):
+    descriptor = pool.utf8("I")
+    body = bytearray(struct.pack(">H", entries))
+    for index in range(entries):
+        body += struct.pack(">HHHHH", 0, code_length, pool.utf8("local" + str(index)), descriptor, index)
+    return bytes(body)
+
+
+# element values nest annotations inside arrays inside annotations, depth levels deep
+def generate_element_value(pool, depth):
+    if depth <= 0:
+        return struct.pack(">BH", ord("I"), pool.integer(depth))
+    return struct.pack(">BHB", ord("["), 1, ord("@")) + generate_annotation(pool, depth - 1)
+
+
+def generate_annotation(pool, depth):
+    return (struct.pack(">HH", pool.utf8("Lbenchmark/Nested" + str(depth) + ";"), 2) +
+            struct.pack(">H", pool.utf8("value")) + generate_element_value(pool, depth) +
+            struct.pack(">HBH", pool.utf8("name"), ord("s"), pool.utf8("level" + str(depth))))
+
+
+def generate_class(constants=None, methods=None, code_length=None, stackmap_frames=None, annotation_depth=None,
+                   local_variables=None, name="benchmark/Generated"):
+    sizes = dict(DEFAULT_SIZES)
+    for key, value in (("constants", constants), ("methods", methods), ("code_length", code_length),
+                       ("stackmap_frames", stackmap_frames), ("annotation_depth", annotation_depth),
+                       ("local_variables", local_variables)):
+        if value is not None:
+            sizes[key] = value
+
+    pool = constant_pool_builder()
+    this_class = pool.class_ref(name)
+    super_class = pool.class_ref("java/lang/Object")
+    code_name = pool.utf8("Code")
+    stackmap_name = pool.utf8("StackMapTable")
+    lvt_name = pool.utf8("LocalVariableTable")
+    string_constant = pool.string("benchmark")
+    target = pool.methodref(name, "target", "()V")
+
+    for index in range(sizes["constants"]):
+        if index % 2:
+            pool.integer(index)
+        else:
+            pool.utf8("constant_" + str(index))
+
+    body = bytearray()
+    body += struct.pack(">H", sizes["methods"])
+    for index in range(sizes["methods"]):
+        code = generate_code(sizes["code_length"], string_constant, target)
+        code_attributes = []
+        if sizes["stackmap_frames"]:
+            code_attributes.append(attribute(stackmap_name, generate_stackmaptable(pool, sizes["stackmap_frames"])))
+        if sizes["local_variables"]:
+            code_attributes.append(attribute(lvt_name, generate_localvariabletable(pool, sizes["local_variables"],
+                                                                                   len(code))))
+        code_body = (struct.pack(">HHI", 4, max(1, sizes["local_variables"]), len(code)) + code +
+                     struct.pack(">HH", 0, len(code_attributes)) + b"".join(code_attributes))
+        body += struct.pack(">HHHH", 0x0009, pool.utf8("method" + str(index)), pool.utf8("()V"), 1)
+        body += attribute(code_name, code_body)
+
+    class_attributes = []
+    if sizes["annotation_depth"]:
+        annotations = struct.pack(">H", 1) + generate_annotation(pool, sizes["annotation_depth"])
+        class_attributes.append(attribute(pool.utf8("RuntimeVisibleAnnotations"), annotations))
+    class_attributes.append(attribute(pool.utf8("SourceFile"), struct.pack(">H", pool.utf8("Generated.java"))))
+
+    return (struct.pack(">IHH", 0xcafebabe, 0, 61) + pool.encode() +
+            struct.pack(">HHHH", 0x0021, this_class, super_class, 0) +    # access flags, this, super, no interfaces
+            struct.pack(">H", 0) +                                        # no fields
+            bytes(body) +
+            struct.pack(">H", len(class_attributes)) + b"".join(class_attributes))
@@ -0,0 +1,215 @@
+import math
+import time
+import tracemalloc   # per-phase memory measurement
+
+from .. import java_bytecode_disassembler as parser_module
+from ..java_bytecode_disassembler import attribute_info, disassembler
+from .generator import DEFAULT_SIZES, DIMENSIONS, generate_class
+
+# runner----------------------------------------------------------------------------------------------------------------
+# Times each phase of the parser on synthetic classes and reports how the time grows with the size of the input.
+#
+# The phases are measured by temporarily wrapping the parser methods listed in PHASES. Times are inclusive (the time of
+# "methods" contains the time of "attribute_code", which contains "decode_instructions") and recursive calls of a phase
+# are only counted once. Memory is measured in a separate run under tracemalloc, because tracing slows the parser down
+# far more than the timing does; the memory of a phase is the peak allocation above the level at which it started.
+#
+# scale() parses classes of increasing size along one dimension of the generator and fits the growth exponent k of
+# time ~ size**k for every phase. A phase whose exponent exceeds the threshold (1.5 by default, i.e. closer to quadratic
+# than to linear) is flagged.
+
+PHASES = (
+    ("bytecode", disassembler, "bytecode"),
+    ("constant_pool", disassembler, "constant_pool"),
+    ("fields", disassembler, "fields"),
+    ("methods", disassembler, "methods"),
+    ("attributes", disassembler, "attributes"),
+    ("attribute_code", attribute_info, "attribute_code"),
+    ("decode_instructions", parser_module, "decode_instructions"),
+    ("stackmaptable", attribute_info.attribute_stackmaptable, "__init__"),
+    ("localvariabletable", attribute_info, "attribute_localvariabletable"),
+    ("annotations", attribute_info.annotations, "attribute_runtimevisibleannotations"),
+)
+
+# start sizes used by scale() for each dimension; every step doubles the size
+DEFAULT_START = {
+    "constants": 1000,
+    "methods": 25,
+    "code_length": 1000,
+    "stackmap_frames": 250,
+    "annotation_depth": 8,
+    "local_variables": 250,
+}
+
+SUPERLINEAR_THRESHOLD = 1.5
+MIN_PHASE_TIME = 0.0005   # phases faster than this at the largest size are too noisy to fit
+
+
+class phase_probe:
+
+    __slots__ = ("memory", "times", "calls", "peaks", "active", "stack", "originals")
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.times = {}       # phase -> seconds
+        self.calls = {}       # phase -> number of (outermost) calls
+        self.peaks = {}       # phase -> bytes
+        self.active = {}      # phase -> recursion depth
+        self.stack = []       # [phase, traced memory at the start, peak seen so far] of the running phases
+        self.originals = []
+
+    def __enter__(self):
+        for phase, owner, attribute in PHASES:
+            original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, self.wrap(phase, original))
+        return self
+
+    def __exit__(self, *exc_info):
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+
+    def wrap(self, phase, function):
+        probe = self
+
+        def timed(*args, **kwargs):
+            if probe.active.get(phase):
+                return function(*args, **kwargs)
+            probe.active[phase] = 1
+            probe.enter(phase)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                probe.active[phase] = 0
+                probe.times[phase] = probe.times.get(phase, 0.0) + elapsed
+                probe.calls[phase] = probe.calls.get(phase, 0) + 1
+                probe.leave(phase)
+
+        return timed
+
+    # tracemalloc keeps a single peak, so it is reset whenever a phase starts; the peak reached so far is handed to
+    # every running phase first so that the outer phases still see it
+    def enter(self, phase):
+        if not self.memory:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self.stack:
+            frame[2] = max(frame[2], peak)
+        tracemalloc.reset_peak()
+        self.stack.append([phase, current, current])
+
+    def leave(self, phase):
+        if not self.memory:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self.stack:
+            frame[2] = max(frame[2], peak)
+        frame = self.stack.pop()
+        self.peaks[phase] = max(self.peaks.get(phase, 0), frame[2] - frame[1])
+
+
+def parse(source):
+    parser = disassembler("<benchmark>", write=False, fail_check=False, source=source)
+    if parser.classfile is None:
+        raise RuntimeError("ERROR: the benchmark class could not be disassembled\n" + str(parser.error))
+    return parser.classfile
+
+
+# measure() parses the class repeat times and returns {phase: {"time": seconds, "calls": n, "memory": bytes}}; the
+# time of each phase is the best of the repeats and the "total" phase covers the whole parse
+def measure(source, repeat=3, memory=True):
+    results = {}
+    for run in range(repeat):
+        with phase_probe() as probe:
+            started = time.perf_counter()
+            parse(source)
+            total = time.perf_counter() - started
+        probe.times["total"] = total
+        probe.calls["total"] = 1
+        for phase, elapsed in probe.times.items():
+            result = results.setdefault(phase, {"time": elapsed, "calls": probe.calls[phase], "memory": None})
+            result["time"] = min(result["time"], elapsed)
+
+    if memory:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            with phase_probe(memory=True) as probe:
+                probe.enter("total")
+                parse(source)
+                probe.leave("total")
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        for phase, peak in probe.peaks.items():
+            if phase in results:
+                results[phase]["memory"] = peak
+    return results
+
+
+# growth_exponent() fits log(time) = k * log(size) + c by least squares and returns k
+def growth_exponent(sizes, times):
+    points = [(math.log(size), math.log(elapsed)) for size, elapsed in zip(sizes, times) if size > 0 and elapsed > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, y in points) / len(points)
+    mean_y = sum(y for x, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, y in points)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+# scale() measures classes whose size along the dimension doubles at every step and returns a report:
+#
+#     {"dimension": ..., "sizes": [...], "phases": {phase: {"times": [...], "memory": [...], "exponent": k,
+#                                                           "flagged": bool}}}
+def scale(dimension, steps=4, start=None, repeat=3, memory=True, threshold=SUPERLINEAR_THRESHOLD, **fixed):
+    if dimension not in DIMENSIONS:
+        raise ValueError("ERROR: unknown dimension '" + str(dimension) + "', expected one of " + ", ".join(DIMENSIONS))
+    if start is None:
+        start = DEFAULT_START[dimension]
+    sizes = [start * 2 ** step for step in range(steps)]
+
+    measured = []
+    for size in sizes:
+        options = dict(DEFAULT_SIZES)
+        options.update(fixed)
+        options[dimension] = size
+        measured.append(measure(generate_class(**options), repeat=repeat, memory=memory))
+
+    phases = {}
+    for phase in measured[-1]:
+        times = [results.get(phase, {}).get("time", 0.0) for results in measured]
+        exponent = growth_exponent(sizes, times)
+        phases[phase] = {
+            "times": times,
+            "memory": [results.get(phase, {}).get("memory") for results in measured],
+            "exponent": exponent,
+            "flagged": exponent is not None and times[-1] >= MIN_PHASE_TIME and exponent > threshold,
+        }
+    return {"dimension": dimension, "sizes": sizes, "phases": phases}
+
+
+def flagged_phases(report):
+    return [phase for phase, result in report["phases"].items() if result["flagged"]]
+
+
+def format_report(report):
+    sizes = report["sizes"]
+    lines = [report["dimension"] + ": " + ", ".join(str(size) for size in sizes)]
+    lines.append(format("phase", "<22") + "".join(format("ms@" + str(size), ">12") for size in sizes) +
+                 format("peak KiB", ">12") + format("exponent", ">10"))
+    for phase, result in sorted(report["phases"].items(), key=lambda item: -item[1]["times"][-1]):
+        peak = result["memory"][-1]
+        exponent = result["exponent"]
+        lines.append(format(phase, "<22") +
+                     "".join(format(elapsed * 1000, ">12.3f") for elapsed in result["times"]) +
+                     format(format(peak / 1024, ".1f") if peak is not None else "-", ">12") +
+                     format(format(exponent, ".2f") if exponent is not None else "-", ">10") +
+                     ("  SUPERLINEAR" if result["flagged"] else ""))
+    return "\n".join(lines)
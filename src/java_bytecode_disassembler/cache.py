@@ -0,0 +1,115 @@
+import hashlib                         # content hashes used as cache keys
+import os
+import pickle                          # serialization of the cached ClassFile objects
+from collections import OrderedDict    # least recently used order of the cache entries
+
+# cache-----------------------------------------------------------------------------------------------------------------
+# Persistent on-disk cache of disassembly results. A cached ClassFile is stored under a key made from a hash of the
+# class bytes and of the parser options that change the result (scan mode and attribute allow-list), so an unchanged
+# class is only disassembled once, no matter which file or archive it is read from. The total size of the cache is
+# capped; once the cap is exceeded the least recently used entries are evicted. Handlers added with
+# register_attribute_handler() are not part of the key, so a cache should not be shared between runs that register
+# different handlers.
+
+CACHE_FORMAT = 7                  # bumped whenever the object model changes so that stale entries are never returned
+CACHE_SUFFIX = ".pickle"
+DEFAULT_CACHE_SIZE = 1 << 30      # 1 GiB
+
+
+def cache_key(source, scan="full", attributes=None):
+    digest = hashlib.blake2b(digest_size=20)
+    options = (CACHE_FORMAT, scan, sorted(attributes) if attributes is not None else None)
+    digest.update(repr(options).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(source)
+    return digest.hexdigest()
+
+
+class ResultCache:
+
+    __slots__ = ("directory", "max_bytes", "entries", "size", "hits", "misses")
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # key -> size in bytes, least recently used first
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        # the modification time of each entry records when it was last used
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_SUFFIX):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-len(CACHE_SUFFIX)], stat.st_size))
+        for mtime, key, size in sorted(found):
+            self.entries[key] = size
+            self.size = self.size + size
+        self.evict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    # get() returns the cached ClassFile for the key, or None on a miss
+    def get(self, key):
+        if key not in self.entries:
+            self.misses = self.misses + 1
+            return None
+        pathway = self.path(key)
+        try:
+            with open(pathway, "rb") as stored:
+                classfile = pickle.load(stored)
+            os.utime(pathway)
+        except Exception:
+            # the entry was removed or damaged outside of this cache; forget it
+            self.discard(key)
+            self.misses = self.misses + 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits = self.hits + 1
+        return classfile
+
+    # put() stores the ClassFile under the key; the file is written under a temporary name and renamed into place so
+    # that an interrupted run never leaves a partial entry behind
+    def put(self, key, classfile):
+        try:
+            encoded = pickle.dumps(classfile, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return   # e.g. a registered attribute handler returned an object that can not be pickled
+        if len(encoded) > self.max_bytes:
+            return
+        pathway = self.path(key)
+        temporary = pathway + "." + str(os.getpid()) + ".tmp"
+        with open(temporary, "wb") as stored:
+            stored.write(encoded)
+        os.replace(temporary, pathway)
+
+        self.size = self.size - self.entries.pop(key, 0) + len(encoded)
+        self.entries[key] = len(encoded)
+        self.evict()
+
+    def discard(self, key):
+        size = self.entries.pop(key, None)
+        if size is None:
+            return
+        self.size = self.size - size
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        while self.size > self.max_bytes and self.entries:
+            self.discard(next(iter(self.entries)))
+
+    def clear(self):
+        for key in list(self.entries):
+            self.discard(key)
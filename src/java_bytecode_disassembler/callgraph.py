@@ -0,0 +1,229 @@
+from array import array   # compact edge and adjacency columns
+from collections import Counter
+
+from .batch import iter_disassemble
+from .opcodes import MNEMONICS
+
+# callgraph-------------------------------------------------------------------------------------------------------------
+# A whole-application call graph built from the invoke instructions of every method. build_call_graph() disassembles a
+# directory, a list of '.class' files or archives (see batch.py) and adds one edge from the calling method to the
+# target of every invokevirtual, invokespecial, invokestatic, invokeinterface and invokedynamic instruction. The
+# targets are read from the constant pool through ConstantPool.resolve(), so no text output is written or parsed.
+#
+# Methods are identified by their key 'owner.name:descriptor', e.g.
+#
+#     java/io/PrintStream.println:(Ljava/lang/String;)V
+#
+# and every key is interned once as an integer node id. The edges are kept as three flat columns (caller id, callee id,
+# opcode) in array('I')/array('B'). The first query turns them into forward and reverse adjacency in compressed sparse
+# row form: the callees of node n are targets[offsets[n]:offsets[n + 1]], and the same for the callers. Each query is
+# therefore one slice of an array, whatever the size of the graph. Adding classes after a query drops the adjacency,
+# which is rebuilt by the next query.
+#
+# An invokedynamic call site has no owner class. Its edges point at the method handles passed to its bootstrap method
+# (the body of a lambda, or the method named by a method reference), or at the bootstrap method itself when no method
+# handle is passed. Calls from the same method to the same target are recorded once.
+
+INVOKE_OPCODES = frozenset((0xb6, 0xb7, 0xb8, 0xb9, 0xba))   # invokevirtual ... invokedynamic
+INVOKEDYNAMIC = 0xba
+CONSTANT_METHOD_HANDLE = "Constant_MethodHandle"
+REF_INVOKE_VIRTUAL = 5   # reference kinds 5 to 9 refer to methods, 1 to 4 to fields
+
+
+def method_key(owner, name, descriptor):
+    return owner + "." + name + ":" + descriptor
+
+
+class CallGraph:
+
+    __slots__ = ("ids", "names", "callers", "callees", "opcodes", "classes", "owners", "failed", "adjacency")
+
+    def __init__(self):
+        self.ids = {}                 # method key -> node id
+        self.names = []               # node id -> method key
+        self.callers = array("I")     # caller node id of every edge
+        self.callees = array("I")     # callee node id of every edge
+        self.opcodes = array("B")     # invoke opcode of every edge
+        self.classes = 0              # classes added
+        self.owners = set()           # names of the classes added
+        self.failed = []              # paths of the classes that could not be disassembled
+        self.adjacency = None         # (forward offsets, callees, opcodes, reverse offsets, callers, opcodes)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.callers)
+
+    # node() returns the id of a method key, interning it on first use
+    def node(self, key):
+        node = self.ids.get(key)
+        if node is None:
+            node = self.ids[key] = len(self.names)
+            self.names.append(key)
+        return node
+
+    def add_edge(self, caller, callee, opcode):
+        self.callers.append(caller)
+        self.callees.append(callee)
+        self.opcodes.append(opcode)
+        self.adjacency = None
+
+    # add_class() adds the edges of every method of a ClassFile. A class whose name was already added (e.g. a copy of it
+    # in a second archive) is skipped, so its calls are not recorded twice. The edges are collected before any of them is
+    # recorded: a class with a broken constant pool reference raises ValueError and leaves the graph as it was.
+    def add_class(self, classfile):
+        constant_pool = classfile.constant_pool
+        owner = classfile.this_class_name
+        if owner in self.owners:
+            return False
+        bootstrap = classfile.attribute("BootstrapMethods")
+        dynamic_targets = {}   # bootstrap method index -> callee keys
+        calls = []             # (caller key, [(callee key, opcode), ...]) of every method with code
+
+        for method in classfile.methods:
+            code = method.code
+            if code is None or not code.instructions:
+                continue
+            edges = []
+            calls.append((method_key(owner, method.name, method.descriptor), edges))
+            seen = set()
+            for instruction in code.instructions:
+                opcode = instruction[1]
+                if opcode not in INVOKE_OPCODES:
+                    continue
+                resolved = constant_pool.resolve(instruction[2][0])
+                if opcode == INVOKEDYNAMIC:
+                    keys = dynamic_targets.get(resolved[0])
+                    if keys is None:
+                        keys = dynamic_targets[resolved[0]] = self.bootstrap_targets(constant_pool, bootstrap,
+                                                                                     resolved[0])
+                else:
+                    keys = (method_key(*resolved),)
+                for key in keys:
+                    if (key, opcode) not in seen:
+                        seen.add((key, opcode))
+                        edges.append((key, opcode))
+
+        self.owners.add(owner)
+        self.classes = self.classes + 1
+        for caller, edges in calls:
+            caller = self.node(caller)
+            for callee, opcode in edges:
+                self.add_edge(caller, self.node(callee), opcode)
+        return True
+
+    # the method handles among the bootstrap arguments, or the bootstrap method when there are none
+    def bootstrap_targets(self, constant_pool, bootstrap, index):
+        if bootstrap is None or index >= len(bootstrap.bootstrap_methods):
+            return ()
+        bootstrap_method_ref, bootstrap_arguments = bootstrap.bootstrap_methods[index]
+        keys = []
+        for argument in bootstrap_arguments:
+            if constant_pool.tag(argument) == CONSTANT_METHOD_HANDLE:
+                handle = constant_pool.resolve(argument)
+                if handle[0] >= REF_INVOKE_VIRTUAL:   # handles of fields are not calls
+                    keys.append(method_key(*handle[1:]))
+        if not keys:
+            keys = [method_key(*constant_pool.resolve(bootstrap_method_ref)[1:])]
+        return tuple(keys)
+
+    # adjacency---------------------------------------------------------------------------------------------------------
+
+    # build() sorts the edges into forward and reverse adjacency with a counting sort, which takes two passes over the
+    # edges per direction
+    def build(self):
+        if self.adjacency is None:
+            forward = compress(len(self.names), self.callers, self.callees, self.opcodes)
+            reverse = compress(len(self.names), self.callees, self.callers, self.opcodes)
+            self.adjacency = forward + reverse
+        return self.adjacency
+
+    def resolve_node(self, method):
+        if isinstance(method, int):
+            return method
+        if isinstance(method, tuple):
+            method = method_key(*method)
+        return self.ids.get(method)
+
+    # callee_ids() and caller_ids() return the node ids adjacent to a method as a slice of the adjacency arrays
+    def callee_ids(self, method):
+        node = self.resolve_node(method)
+        if node is None:
+            return array("I")
+        offsets, targets = self.build()[:2]
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def caller_ids(self, method):
+        node = self.resolve_node(method)
+        if node is None:
+            return array("I")
+        offsets, sources = self.build()[3:5]
+        return sources[offsets[node]:offsets[node + 1]]
+
+    # calls_from() and calls_to() return (method key, mnemonic) pairs; a method can be given as its key, an
+    # (owner, name, descriptor) tuple or a node id
+    def calls_from(self, method):
+        return self.named_edges(method, 0)
+
+    def calls_to(self, method):
+        return self.named_edges(method, 3)
+
+    def named_edges(self, method, side):
+        node = self.resolve_node(method)
+        if node is None:
+            return []
+        adjacency = self.build()
+        offsets, nodes, opcodes = adjacency[side:side + 3]
+        names = self.names
+        return [(names[nodes[position]], MNEMONICS[opcodes[position]])
+                for position in range(offsets[node], offsets[node + 1])]
+
+    def callees_of(self, method):
+        names = self.names
+        return [names[node] for node in self.callee_ids(method)]
+
+    def callers_of(self, method):
+        names = self.names
+        return [names[node] for node in self.caller_ids(method)]
+
+
+# compress() groups the edges by their first node: it returns (offsets, second nodes, opcodes), where the edges of node n
+# are at positions offsets[n] to offsets[n + 1]
+def compress(node_count, first, second, opcodes):
+    counts = Counter(first)
+    offsets = array("I", bytes(4 * (node_count + 1)))
+    total = 0
+    for node in range(node_count):
+        offsets[node] = total
+        total += counts.get(node, 0)
+    offsets[node_count] = total
+
+    positions = offsets.tolist()   # next free position of every node
+    nodes = array("I", bytes(4 * len(first)))
+    sorted_opcodes = array("B", bytes(len(first)))
+    for node, target, opcode in zip(first, second, opcodes):
+        position = positions[node]
+        nodes[position] = target
+        sorted_opcodes[position] = opcode
+        positions[node] = position + 1
+    return offsets, nodes, sorted_opcodes
+
+
+# build_call_graph() disassembles the given paths (directories, '.class' files and archives) and returns their
+# CallGraph; workers and chunksize are passed on to iter_disassemble(). Only the Code and BootstrapMethods attributes are
+# decoded.
+def build_call_graph(paths, workers=None, chunksize=None, cache=None, dedupe=False, collector=None, graph=None):
+    if graph is None:
+        graph = CallGraph()
+    for result in iter_disassemble(paths, workers=workers, chunksize=chunksize, attributes=("Code", "BootstrapMethods"),
+                                   cache=cache, dedupe=dedupe, collector=collector):
+        if not result.ok:
+            graph.failed.append(result.path)
+            continue
+        try:
+            graph.add_class(result.classfile)
+        except (ValueError, IndexError):   # a class with a broken constant pool reference
+            graph.failed.append(result.path)
+    return graph
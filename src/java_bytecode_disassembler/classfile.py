@@ -0,0 +1,816 @@
+import re                # pairing of surrogates in modified UTF-8 strings
+import struct            # decoding of the numeric constants
+from array import array  # compact columns of the constant pool
+
+from .opcodes import constant_operand   # constant pool operands of decoded instructions
+
+# classfile-------------------------------------------------------------------------------------------------------------
+# The classes below form the in-memory object model of a disassembled '.class' file. The disassembler fills them in as
+# it walks the bytecode and hands the finished ClassFile back to the caller, so the results can be analysed in-process
+# without writing them to the 'deconst_class' directory first. Every class uses __slots__ to keep the per-object memory
+# overhead low when large numbers of classes are held at once.
+#
+# Index values (name_index, descriptor_index, ...) are kept exactly as they appear in the bytecode, i.e. they are
+# indexes into the ConstantPool. Convenience properties resolve the most commonly used ones to strings.
+
+
+# ConstantPool----------------------------------------------------------------------------------------------------------
+# Compact storage of the constant pool built by disassembler.constant_pool(). Instead of one Python list per constant,
+# the pool is held in a few flat columns indexed by the constant pool index:
+#
+#     tags      bytearray of the tag byte of each entry (0 for index 0 and for the second slot of a Long or Double)
+#     first     array('H') of the first u2 of the entry: name_index, class_index, string_index, descriptor_index,
+#               bootstrap_method_attr_index, the reference_kind of a MethodHandle, or the length of a Utf8 string
+#     second    array('H') of the second u2: name_and_type_index, descriptor_index, reference_index
+#     words     array('I') holding the offset of a Utf8 string in data, the bits of an Integer or Float, and the high
+#               and low words of a Long or Double in its two slots
+#
+# data holds the bytes of the constant pool; Utf8 strings are decoded from it the first time they are asked for and
+# cached in strings. A pool of 65535 entries costs about 9 bytes per entry on top of its bytes.
+#
+# Indexing the pool (pool[index], iteration, entries) still returns the readable list form of an entry, e.g.
+# ["Constant_Methodref", 3, 12], with ["reserved"] at index 0 and a "longspace"/"doublespace" placeholder in the second
+# slot of a Long or Double constant. These lists are built on demand and are not kept.
+#
+# resolve() follows the references of an entry down to its strings and caches the result per index, so a reference that
+# is used by many instructions is only chased once:
+#
+#     Constant_Fieldref, Constant_Methodref,      (owner, name, descriptor), e.g.
+#     Constant_InterfaceMethodref                 ("java/io/PrintStream", "println", "(Ljava/lang/String;)V")
+#     Constant_InvokeDynamic, CONSTANT_Dynamic    (bootstrap_method_attr_index, name, descriptor)
+#     Constant_MethodHandle                       (reference_kind, owner, name, descriptor)
+#     Constant_NameAndType                        (name, descriptor)
+#     Constant_Class, CONSTANT_Module/Package     the name
+#     Constant_String, Constant_MethodType        the string or the descriptor
+#     Constant_Utf8 and the numeric constants     the value
+#
+# resolve_instruction() does the same for the constant pool operand of a decoded instruction (ldc, getfield, invoke*,
+# new, checkcast, ...).
+
+CONSTANT_TAGS = {1: "Constant_Utf8", 3: "Constant_Integer", 4: "Constant_Float", 5: "Constant_Long",
+                 6: "Constant_Double", 7: "Constant_Class", 8: "Constant_String", 9: "Constant_Fieldref",
+                 10: "Constant_Methodref", 11: "Constant_InterfaceMethodref", 12: "Constant_NameAndType",
+                 15: "Constant_MethodHandle", 16: "Constant_MethodType", 17: "CONSTANT_Dynamic",
+                 18: "Constant_InvokeDynamic", 19: "CONSTANT_Module", 20: "CONSTANT_Package"}
+CONSTANT_UTF8 = 1
+CONSTANT_CLASS = 7
+CONSTANT_NAME_AND_TYPE = 12
+CONSTANT_METHOD_HANDLE = 15
+MEMBER_REFERENCES = (9, 10, 11)               # Fieldref, Methodref, InterfaceMethodref
+DYNAMIC_REFERENCES = (17, 18)                 # Dynamic, InvokeDynamic
+NUMERIC_CONSTANTS = (3, 4, 5, 6)
+SINGLE_INDEX_CONSTANTS = (7, 8, 16, 19, 20)   # entries holding a single u2 index
+WIDE_PLACEHOLDERS = {5: "longspace", 6: "doublespace"}
+
+_int = struct.Struct(">i")
+_float = struct.Struct(">f")
+_long = struct.Struct(">q")
+_double = struct.Struct(">d")
+_words = struct.Struct(">II")
+
+
+class ConstantPool:
+
+    __slots__ = ("tags", "first", "second", "words", "data", "strings", "resolved")
+
+    def __init__(self, count=1, data=b""):
+        self.tags = bytearray(count)
+        self.first = array("H", bytes(2 * count))
+        self.second = array("H", bytes(2 * count))
+        self.words = array("I", bytes(4 * count))
+        self.data = data
+        self.strings = {}    # index -> decoded Utf8 string
+        self.resolved = {}   # index -> result of resolve()
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index = index + len(self.tags)
+        tag = self.tags[index]
+        if tag == 0:
+            if index > 0 and self.tags[index - 1] in WIDE_PLACEHOLDERS:
+                return WIDE_PLACEHOLDERS[self.tags[index - 1]]
+            return ["reserved"]
+        name = CONSTANT_TAGS[tag]
+        if tag == CONSTANT_UTF8:
+            return [name, self.first[index], self.utf8(index)]
+        if tag in NUMERIC_CONSTANTS:
+            return [name, self.value(index)]
+        if tag in SINGLE_INDEX_CONSTANTS:
+            return [name, self.first[index]]
+        return [name, self.first[index], self.second[index]]
+
+    def __iter__(self):
+        for index in range(len(self.tags)):
+            yield self[index]
+
+    # entries builds the readable list form of the whole pool
+    @property
+    def entries(self):
+        return list(self)
+
+    # returns the readable tag of an entry ("reserved" for index 0, None for the second slot of a Long or Double)
+    def tag(self, index):
+        if index == 0:
+            return "reserved"
+        return CONSTANT_TAGS.get(self.tags[index])
+
+    def check(self, index, tag):
+        if not 0 < index < len(self.tags) or self.tags[index] != tag:
+            raise ValueError("constant " + str(index) + " is not a " + CONSTANT_TAGS[tag] + " entry")
+
+    # returns the raw bytes of a Constant_Utf8 entry as a memoryview of data
+    def utf8_bytes(self, index):
+        self.check(index, CONSTANT_UTF8)
+        start = self.words[index]
+        return memoryview(self.data)[start:start + self.first[index]]
+
+    # returns the string stored in a Constant_Utf8 entry
+    def utf8(self, index):
+        string = self.strings.get(index)
+        if string is None:
+            self.check(index, CONSTANT_UTF8)
+            start = self.words[index]
+            raw = self.data[start:start + self.first[index]]
+            if raw.isascii() and b"\x00" not in raw:
+                string = raw.decode("ascii")   # the common case: no multi-byte sequences at all
+            else:
+                try:
+                    string = decode_modified_utf8(raw)
+                except UnicodeDecodeError:
+                    string = raw.hex()
+                    print("\tWARNING: bytecode contains special characters; data may be obfuscated")
+            self.strings[index] = string
+        return string
+
+    # returns the value of a Constant_Integer, Constant_Float, Constant_Long or Constant_Double entry
+    def value(self, index):
+        tag = self.tags[index]
+        if tag == 3:
+            return _int.unpack(self.words[index].to_bytes(4, "big"))[0]
+        if tag == 4:
+            return _float.unpack(self.words[index].to_bytes(4, "big"))[0]
+        if tag == 5:
+            return _long.unpack(_words.pack(self.words[index], self.words[index + 1]))[0]
+        if tag == 6:
+            return _double.unpack(_words.pack(self.words[index], self.words[index + 1]))[0]
+        raise ValueError("constant " + str(index) + " is not a numeric constant")
+
+    # returns the internal name (e.g. "java/lang/Object") of a Constant_Class entry; index 0 resolves to None
+    def class_name(self, index):
+        if index == 0:
+            return None
+        self.check(index, CONSTANT_CLASS)
+        return self.utf8(self.first[index])
+
+    # returns the (name, descriptor) strings of a Constant_NameAndType entry
+    def name_and_type(self, index):
+        self.check(index, CONSTANT_NAME_AND_TYPE)
+        return self.utf8(self.first[index]), self.utf8(self.second[index])
+
+    # returns the symbolic value of an entry with every reference followed (see the table above); cached per index
+    def resolve(self, index):
+        resolved = self.resolved.get(index)
+        if resolved is not None:
+            return resolved
+        if not 0 < index < len(self.tags) or self.tags[index] == 0:
+            raise ValueError("constant " + str(index) + " is not a constant pool entry")
+        tag = self.tags[index]
+        if tag in MEMBER_REFERENCES:
+            resolved = (self.class_name(self.first[index]),) + self.name_and_type(self.second[index])
+        elif tag in DYNAMIC_REFERENCES:
+            resolved = (self.first[index],) + self.name_and_type(self.second[index])
+        elif tag == CONSTANT_METHOD_HANDLE:
+            reference = self.second[index]
+            if self.tags[reference] not in MEMBER_REFERENCES:
+                raise ValueError("constant " + str(reference) + " is not a member reference")
+            resolved = (self.first[index],) + self.resolve(reference)
+        elif tag == CONSTANT_NAME_AND_TYPE:
+            resolved = self.name_and_type(index)
+        elif tag in SINGLE_INDEX_CONSTANTS:
+            resolved = self.utf8(self.first[index])
+        elif tag == CONSTANT_UTF8:
+            resolved = self.utf8(index)
+        else:
+            resolved = self.value(index)
+        self.resolved[index] = resolved
+        return resolved
+
+    # resolves the constant pool operand of a decoded (pc, opcode, operands) instruction; None if it has no such operand
+    def resolve_instruction(self, instruction):
+        index = constant_operand(instruction)
+        if index is None:
+            return None
+        return self.resolve(index)
+
+
+# decode_modified_utf8() decodes the "modified UTF-8" of the JVM (JVMS 4.4.7), which differs from UTF-8 in two ways:
+# NUL is written as the two bytes C0 80, and characters outside the Basic Multilingual Plane are written as a surrogate
+# pair with each surrogate encoded on its own in three bytes (as in CESU-8). Everything else is plain UTF-8, so most
+# strings are decoded by a single call of the UTF-8 codec; the exact path only runs when that call fails. Surrogates
+# without a partner are kept as they are, like in a Java string. Bytes that are not valid modified UTF-8 raise
+# UnicodeDecodeError, including the raw NUL byte and the four-byte sequences (lead bytes F0 to F7) that plain UTF-8
+# accepts; bytes F8 to FF are never valid, so every byte from F0 up is rejected before the UTF-8 codec is called.
+
+_surrogate_pair = re.compile("[\ud800-\udbff][\udc00-\udfff]")
+_invalid_bytes = re.compile(b"[\x00\xf0-\xff]")   # bytes that never appear in modified UTF-8
+
+
+def _join_surrogates(match):
+    high, low = match.group()
+    return chr(0x10000 + ((ord(high) - 0xd800) << 10) + ord(low) - 0xdc00)
+
+
+def decode_modified_utf8(raw):
+    invalid = _invalid_bytes.search(raw)
+    if invalid is not None:
+        raise UnicodeDecodeError("modified-utf-8", bytes(raw), invalid.start(), invalid.start() + 1,
+                                 "byte not allowed in modified UTF-8")
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    if b"\xc0\x80" in raw:
+        raw = raw.replace(b"\xc0\x80", b"\x00")
+    string = raw.decode("utf-8", "surrogatepass")
+    return _surrogate_pair.sub(_join_surrogates, string)
+
+
+# ClassFile-------------------------------------------------------------------------------------------------------------
+
+class ClassFile:
+
+    __slots__ = ("name", "magic", "minor_version", "major_version", "constant_pool", "access_flags", "this_class",
+                 "super_class", "interfaces", "fields", "methods", "attributes", "unknown_attributes", "offsets")
+
+    def __init__(self, name=None):
+        self.name = name                # path or logical name the class was read from
+        self.magic = None
+        self.minor_version = None
+        self.major_version = None
+        self.constant_pool = None       # ConstantPool
+        self.access_flags = None        # raw access_flags bitmask
+        self.this_class = None          # constant pool index of this class
+        self.super_class = None         # constant pool index of the super class (0 for java/lang/Object)
+        self.interfaces = []            # constant pool indexes of the direct super interfaces
+        self.fields = []                # FieldInfo objects
+        self.methods = []               # MethodInfo objects
+        self.attributes = []            # class level attributes
+        self.unknown_attributes = {}    # attribute name -> number of occurrences that no handler recognised
+        self.offsets = OffsetMap()      # where each structure was found in the class bytes
+
+    def __repr__(self):
+        return "<ClassFile " + str(self.this_class_name) + ">"
+
+    @property
+    def this_class_name(self):
+        if self.constant_pool is None or not self.this_class:
+            return None
+        return self.constant_pool.class_name(self.this_class)
+
+    @property
+    def super_class_name(self):
+        if self.constant_pool is None or not self.super_class:
+            return None
+        return self.constant_pool.class_name(self.super_class)
+
+    @property
+    def interface_names(self):
+        return [self.constant_pool.class_name(index) for index in self.interfaces]
+
+    def attribute(self, name):
+        return find_attribute(self.attributes, name)
+
+    def method(self, name, descriptor=None):
+        for method in self.methods:
+            if method.name == name and (descriptor is None or method.descriptor == descriptor):
+                return method
+        return None
+
+    def field(self, name):
+        for field in self.fields:
+            if field.name == name:
+                return field
+        return None
+
+
+# OffsetMap-------------------------------------------------------------------------------------------------------------
+# The byte offset and length of every top-level structure, recorded while the class is parsed. The constants are kept
+# in two array('I') columns indexed like the constant pool (a length of 0 marks index 0 and the second slot of a Long or
+# Double constant); constant() and constants return them as (offset, length) pairs, or None for the unused slots.
+# fields, methods and attributes hold one (offset, length) pair per field_info, method_info and class level
+# attribute_info, in the order of the class file. The attribute_info structures of a field or method are listed in its
+# attribute_offsets.
+
+class OffsetMap:
+
+    __slots__ = ("constant_offsets", "constant_lengths", "fields", "methods", "attributes")
+
+    def __init__(self):
+        self.constant_offsets = array("I")
+        self.constant_lengths = array("I")
+        self.fields = []
+        self.methods = []
+        self.attributes = []
+
+    def constant(self, index):
+        length = self.constant_lengths[index]
+        if length == 0:
+            return None
+        return self.constant_offsets[index], length
+
+    @property
+    def constants(self):
+        return [self.constant(index) for index in range(len(self.constant_lengths))]
+
+
+# FieldInfo and MethodInfo----------------------------------------------------------------------------------------------
+# The field_info and method_info structures share the same layout. The name and descriptor strings are resolved from the
+# constant pool once, while the fields and methods are parsed. attribute_offsets holds the (offset, length) of every
+# attribute_info structure of the member in the class bytes, including the attributes that were skipped. flag_names
+# decodes the access_flags bitmask into the names of the flags that are set, e.g. ["ACC_PUBLIC", "ACC_STATIC"].
+
+FIELD_ACCESS_FLAGS = ((0x0001, "ACC_PUBLIC"), (0x0002, "ACC_PRIVATE"), (0x0004, "ACC_PROTECTED"),
+                      (0x0008, "ACC_STATIC"), (0x0010, "ACC_FINAL"), (0x0040, "ACC_VOLATILE"),
+                      (0x0080, "ACC_TRANSIENT"), (0x1000, "ACC_SYNTHETIC"), (0x4000, "ACC_ENUM"))
+METHOD_ACCESS_FLAGS = ((0x0001, "ACC_PUBLIC"), (0x0002, "ACC_PRIVATE"), (0x0004, "ACC_PROTECTED"),
+                       (0x0008, "ACC_STATIC"), (0x0010, "ACC_FINAL"), (0x0020, "ACC_SYNCHRONIZED"),
+                       (0x0040, "ACC_BRIDGE"), (0x0080, "ACC_VARARGS"), (0x0100, "ACC_NATIVE"),
+                       (0x0400, "ACC_ABSTRACT"), (0x0800, "ACC_STRICT"), (0x1000, "ACC_SYNTHETIC"))
+
+
+class FieldInfo:
+
+    ACCESS_FLAGS = FIELD_ACCESS_FLAGS
+
+    __slots__ = ("access_flags", "name_index", "descriptor_index", "name", "descriptor", "attributes",
+                 "attribute_offsets")
+
+    def __init__(self, access_flags, name_index, descriptor_index, name=None, descriptor=None, attributes=None):
+        self.access_flags = access_flags
+        self.name_index = name_index
+        self.descriptor_index = descriptor_index
+        self.name = name
+        self.descriptor = descriptor
+        self.attributes = attributes if attributes is not None else []
+        self.attribute_offsets = []
+
+    def __repr__(self):
+        return "<" + type(self).__name__ + " " + str(self.name) + " " + str(self.descriptor) + ">"
+
+    @property
+    def flag_names(self):
+        return [name for flag, name in self.ACCESS_FLAGS if self.access_flags & flag]
+
+    def attribute(self, name):
+        return find_attribute(self.attributes, name)
+
+
+# A method parsed with lazy=True holds its Code attribute as a placeholder that remembers where the attribute starts in
+# the class bytes. The placeholder is decoded (and replaced by the CodeAttribute in the list) the first time the Code
+# attribute is reached through attributes, attribute("Code") or code; attribute() looks up the other attributes without
+# decoding the Code attribute. Pickling a method decodes it first, so the class bytes are never pickled.
+
+_attributes_slot = FieldInfo.attributes   # slot descriptor behind the attributes property of MethodInfo
+
+
+class MethodInfo(FieldInfo):
+
+    ACCESS_FLAGS = METHOD_ACCESS_FLAGS
+
+    __slots__ = ("_pending",)
+
+    def __init__(self, access_flags, name_index, descriptor_index, name=None, descriptor=None, attributes=None):
+        self._pending = False   # True while the attribute list holds placeholders that have not been decoded
+        FieldInfo.__init__(self, access_flags, name_index, descriptor_index, name, descriptor, attributes)
+
+    @property
+    def attributes(self):
+        attributes = _attributes_slot.__get__(self)
+        if self._pending:
+            for index, attribute in enumerate(attributes):
+                if isinstance(attribute, LazyAttribute):
+                    attributes[index] = attribute.decode()
+            self._pending = False
+        return attributes
+
+    @attributes.setter
+    def attributes(self, attributes):
+        _attributes_slot.__set__(self, attributes)
+
+    def attribute(self, name):
+        attributes = _attributes_slot.__get__(self)
+        for index, attribute in enumerate(attributes):
+            if attribute.name == name:
+                if isinstance(attribute, LazyAttribute):
+                    attribute = attributes[index] = attribute.decode()
+                return attribute
+        return None
+
+    # defer() appends a LazyAttribute to the attribute list
+    def defer(self, attribute):
+        _attributes_slot.__get__(self).append(attribute)
+        self._pending = True
+
+    # the Code attribute of the method, or None for abstract and native methods
+    @property
+    def code(self):
+        return self.attribute("Code")
+
+    # decoded is False while the method still holds attributes that have not been decoded
+    @property
+    def decoded(self):
+        return not any(isinstance(attribute, LazyAttribute) for attribute in _attributes_slot.__get__(self))
+
+
+def find_attribute(attributes, name):
+    for attribute in attributes:
+        if attribute.name == name:
+            return attribute
+    return None
+
+
+# Attributes------------------------------------------------------------------------------------------------------------
+# Attribute is the base of every attribute type. Attributes that carry no data of their own (Deprecated, Synthetic) are
+# represented by a plain Attribute; attributes the disassembler does not know are kept as an UnknownAttribute holding
+# the raw info bytes.
+
+class Attribute:
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "<" + type(self).__name__ + " " + str(self.name) + ">"
+
+
+# LazyAttribute is the placeholder for an attribute whose decoding has been deferred; decoder is a callable that parses
+# the attribute_info structure at the given offset and returns the finished Attribute object.
+class LazyAttribute(Attribute):
+
+    __slots__ = ("offset", "length", "decoder")
+
+    def __init__(self, name, offset, length, decoder):
+        Attribute.__init__(self, name)
+        self.offset = offset     # offset of the attribute_info structure in the class bytes
+        self.length = length     # length of the structure, including the name index and length fields
+        self.decoder = decoder
+
+    def decode(self):
+        return self.decoder(self.offset)
+
+
+class UnknownAttribute(Attribute):
+
+    __slots__ = ("info",)
+
+    def __init__(self, name, info):
+        Attribute.__init__(self, name)
+        self.info = info
+
+
+class ConstantValueAttribute(Attribute):
+
+    __slots__ = ("constantvalue_index",)
+
+    def __init__(self, name, constantvalue_index):
+        Attribute.__init__(self, name)
+        self.constantvalue_index = constantvalue_index
+
+
+class SignatureAttribute(Attribute):
+
+    __slots__ = ("signature_index",)
+
+    def __init__(self, name, signature_index):
+        Attribute.__init__(self, name)
+        self.signature_index = signature_index
+
+
+class SourceFileAttribute(Attribute):
+
+    __slots__ = ("sourcefile_index",)
+
+    def __init__(self, name, sourcefile_index):
+        Attribute.__init__(self, name)
+        self.sourcefile_index = sourcefile_index
+
+
+class SourceDebugExtensionAttribute(Attribute):
+
+    __slots__ = ("debug_extension",)
+
+    def __init__(self, name, debug_extension):
+        Attribute.__init__(self, name)
+        self.debug_extension = debug_extension
+
+
+class ExceptionsAttribute(Attribute):
+
+    __slots__ = ("exception_index_table",)
+
+    def __init__(self, name, exception_index_table):
+        Attribute.__init__(self, name)
+        self.exception_index_table = exception_index_table
+
+
+# classes holds one (inner_class_info_index, outer_class_info_index, inner_name_index, inner_class_access_flags) tuple
+# for every inner class
+class InnerClassesAttribute(Attribute):
+
+    __slots__ = ("classes",)
+
+    def __init__(self, name, classes):
+        Attribute.__init__(self, name)
+        self.classes = classes
+
+
+# bootstrap_methods holds one (bootstrap_method_ref, bootstrap_arguments) tuple for every bootstrap method
+class BootstrapMethodsAttribute(Attribute):
+
+    __slots__ = ("bootstrap_methods",)
+
+    def __init__(self, name, bootstrap_methods):
+        Attribute.__init__(self, name)
+        self.bootstrap_methods = bootstrap_methods
+
+
+class EnclosingMethodAttribute(Attribute):
+
+    __slots__ = ("class_index", "method_index")
+
+    def __init__(self, name, class_index, method_index):
+        Attribute.__init__(self, name)
+        self.class_index = class_index
+        self.method_index = method_index
+
+
+class NestHostAttribute(Attribute):
+
+    __slots__ = ("host_class_index",)
+
+    def __init__(self, name, host_class_index):
+        Attribute.__init__(self, name)
+        self.host_class_index = host_class_index
+
+
+# used for both the NestMembers and the PermittedSubclasses attributes
+class ClassListAttribute(Attribute):
+
+    __slots__ = ("classes",)
+
+    def __init__(self, name, classes):
+        Attribute.__init__(self, name)
+        self.classes = classes
+
+
+class RecordAttribute(Attribute):
+
+    __slots__ = ("components",)
+
+    def __init__(self, name, components):
+        Attribute.__init__(self, name)
+        self.components = components
+
+
+class RecordComponent:
+
+    __slots__ = ("name_index", "descriptor_index", "attributes")
+
+    def __init__(self, name_index, descriptor_index, attributes):
+        self.name_index = name_index
+        self.descriptor_index = descriptor_index
+        self.attributes = attributes
+
+
+# parameters holds one (name_index, access_flags) tuple for every parameter
+class MethodParametersAttribute(Attribute):
+
+    __slots__ = ("parameters",)
+
+    def __init__(self, name, parameters):
+        Attribute.__init__(self, name)
+        self.parameters = parameters
+
+
+# requires, exports, opens and provides hold one tuple per entry, in the same field order as the JVM specification:
+#   requires - (requires_index, requires_flags, requires_version_index)
+#   exports  - (exports_index, exports_flags, exports_to_index tuple)
+#   opens    - (opens_index, opens_flags, opens_to_index tuple)
+#   provides - (provides_index, provides_with_index tuple)
+class ModuleAttribute(Attribute):
+
+    __slots__ = ("module_name_index", "module_flags", "module_version_index", "requires", "exports", "opens", "uses",
+                 "provides")
+
+    def __init__(self, name, module_name_index, module_flags, module_version_index, requires, exports, opens, uses,
+                 provides):
+        Attribute.__init__(self, name)
+        self.module_name_index = module_name_index
+        self.module_flags = module_flags
+        self.module_version_index = module_version_index
+        self.requires = requires
+        self.exports = exports
+        self.opens = opens
+        self.uses = uses
+        self.provides = provides
+
+
+class ModulePackagesAttribute(Attribute):
+
+    __slots__ = ("package_index",)
+
+    def __init__(self, name, package_index):
+        Attribute.__init__(self, name)
+        self.package_index = package_index
+
+
+class ModuleMainClassAttribute(Attribute):
+
+    __slots__ = ("main_class_index",)
+
+    def __init__(self, name, main_class_index):
+        Attribute.__init__(self, name)
+        self.main_class_index = main_class_index
+
+
+# Code------------------------------------------------------------------------------------------------------------------
+
+class CodeAttribute(Attribute):
+
+    __slots__ = ("max_stack", "max_locals", "code", "exception_table", "attributes", "instructions")
+
+    def __init__(self, name, max_stack, max_locals, code, exception_table, attributes, instructions=None):
+        Attribute.__init__(self, name)
+        self.max_stack = max_stack
+        self.max_locals = max_locals
+        self.code = code                          # raw bytecode of the method as bytes
+        self.exception_table = exception_table    # ExceptionEntry objects
+        self.attributes = attributes              # LineNumberTable, LocalVariableTable, StackMapTable, ...
+        self.instructions = instructions          # decoded (pc, opcode, operands) tuples, see opcodes.py
+
+    def attribute(self, name):
+        return find_attribute(self.attributes, name)
+
+
+class ExceptionEntry:
+
+    __slots__ = ("start_pc", "end_pc", "handler_pc", "catch_type")
+
+    def __init__(self, start_pc, end_pc, handler_pc, catch_type):
+        self.start_pc = start_pc
+        self.end_pc = end_pc
+        self.handler_pc = handler_pc
+        self.catch_type = catch_type     # constant pool index of the caught class; 0 catches everything
+
+    def __repr__(self):
+        return "<ExceptionEntry " + str(self.start_pc) + "-" + str(self.end_pc) + " -> " + str(self.handler_pc) + ">"
+
+
+# line_number_table holds one (start_pc, line_number) tuple per entry
+class LineNumberTableAttribute(Attribute):
+
+    __slots__ = ("line_number_table",)
+
+    def __init__(self, name, line_number_table):
+        Attribute.__init__(self, name)
+        self.line_number_table = line_number_table
+
+
+# local_variable_table holds one (start_pc, length, name_index, descriptor_index, index) tuple per entry; for the
+# LocalVariableTypeTable the fourth item is the signature_index
+class LocalVariableTableAttribute(Attribute):
+
+    __slots__ = ("local_variable_table",)
+
+    def __init__(self, name, local_variable_table):
+        Attribute.__init__(self, name)
+        self.local_variable_table = local_variable_table
+
+
+class StackMapTableAttribute(Attribute):
+
+    __slots__ = ("entries",)
+
+    def __init__(self, name, entries):
+        Attribute.__init__(self, name)
+        self.entries = entries
+
+
+# A single stack_map_frame. The verification_type_info items in locals and stack are (tag,) tuples, or (tag, index)
+# tuples for the Object_variable_info (7) and Uninitialized_variable_info (8) types.
+class StackMapFrame:
+
+    __slots__ = ("frame_type", "offset_delta", "locals", "stack")
+
+    def __init__(self, frame_type, offset_delta, locals=(), stack=()):
+        self.frame_type = frame_type
+        self.offset_delta = offset_delta
+        self.locals = locals
+        self.stack = stack
+
+
+# Annotations-----------------------------------------------------------------------------------------------------------
+
+# RuntimeVisibleAnnotations and RuntimeInvisibleAnnotations
+class AnnotationsAttribute(Attribute):
+
+    __slots__ = ("annotations",)
+
+    def __init__(self, name, annotations):
+        Attribute.__init__(self, name)
+        self.annotations = annotations
+
+
+# RuntimeVisibleParameterAnnotations and RuntimeInvisibleParameterAnnotations; one list of annotations per parameter
+class ParameterAnnotationsAttribute(Attribute):
+
+    __slots__ = ("parameter_annotations",)
+
+    def __init__(self, name, parameter_annotations):
+        Attribute.__init__(self, name)
+        self.parameter_annotations = parameter_annotations
+
+
+# RuntimeVisibleTypeAnnotations and RuntimeInvisibleTypeAnnotations
+class TypeAnnotationsAttribute(Attribute):
+
+    __slots__ = ("annotations",)
+
+    def __init__(self, name, annotations):
+        Attribute.__init__(self, name)
+        self.annotations = annotations
+
+
+class AnnotationDefaultAttribute(Attribute):
+
+    __slots__ = ("default_value",)
+
+    def __init__(self, name, default_value):
+        Attribute.__init__(self, name)
+        self.default_value = default_value
+
+
+# element_value_pairs holds one (element_name_index, ElementValue) tuple per pair
+class Annotation:
+
+    __slots__ = ("type_index", "element_value_pairs")
+
+    def __init__(self, type_index, element_value_pairs):
+        self.type_index = type_index
+        self.element_value_pairs = element_value_pairs
+
+
+# target_info is a tuple whose contents depend on target_type (see the JVM specification, section 4.7.20.1) and
+# target_path holds one (type_path_kind, type_argument_index) tuple per path entry
+class TypeAnnotation(Annotation):
+
+    __slots__ = ("target_type", "target_info", "target_path")
+
+    def __init__(self, target_type, target_info, target_path, type_index, element_value_pairs):
+        Annotation.__init__(self, type_index, element_value_pairs)
+        self.target_type = target_type
+        self.target_info = target_info
+        self.target_path = target_path
+
+
+# The value of an element_value depends on its tag:
+#   B C D F I J S Z s - const_value_index
+#   e                 - (type_name_index, const_name_index)
+#   c                 - class_info_index
+#   @                 - Annotation
+#   [                 - list of ElementValue
+class ElementValue:
+
+    __slots__ = ("tag", "value")
+
+    def __init__(self, tag, value):
+        self.tag = tag
+        self.value = value
+
+
+# DisassemblyResult-----------------------------------------------------------------------------------------------------
+# Returned by the batch and archive interfaces; one result is produced for every '.class' file or archive entry, whether
+# or not its disassembly succeeded.
+
+class DisassemblyResult:
+
+    __slots__ = ("path", "classfile", "error")
+
+    def __init__(self, path, classfile, error=None):
+        self.path = path              # path of the '.class' file
+        self.classfile = classfile    # ClassFile object, or None if the disassembly failed
+        self.error = error            # traceback text of the failure
+
+    def __repr__(self):
+        if self.error is not None:
+            return "<DisassemblyResult " + str(self.path) + " failed>"
+        return "<DisassemblyResult " + str(self.path) + ">"
+
+    @property
+    def ok(self):
+        return self.error is None and self.classfile is not None
@@ -0,0 +1,287 @@
+import os
+import sqlite3   # persistent index
+
+from .archive import ENTRY_SEPARATOR
+from .batch import find_class_files, iter_disassemble
+from .classfile import CONSTANT_CLASS
+
+# corpus_index----------------------------------------------------------------------------------------------------------
+# A persistent SQLite index of the classes, fields, methods and constant pool references of a corpus of '.class' files
+# and archives, so questions about the corpus are answered without disassembling anything again:
+#
+#     with CorpusIndex("corpus.sqlite") as index:
+#         index.update(["libs/", "build/classes"])
+#         index.classes_named("com/example/Util")                      # which archives define a class
+#         index.methods_with_descriptor("(Ljava/lang/String;)V")       # which methods have a descriptor
+#         index.references_to("com/example/Util", "CACHE")             # who references a field or method
+#
+# Every '.class' file and archive found on disk is a source. update() stores the modification time and size of each
+# source and only disassembles the sources that are new or have changed since the last update; the rows of a changed
+# source are deleted and written again, and sources that have disappeared from the indexed directories are removed.
+# Classes are disassembled with every attribute skipped (only the constant pool and the member headers are needed), and
+# the rows are written with executemany() in batches of batch_size classes, one transaction per batch. The database runs
+# in WAL mode, so queries from other connections are not blocked while an update is writing.
+#
+# A source is inserted with the UNINDEXED stamp first, and its real stamp is only written in the transaction that
+# commits the last of its classes. An update that is interrupted therefore leaves the unfinished sources unstamped, and
+# the next update indexes them again.
+#
+# Class, owner and descriptor names are internal names as found in the class file (e.g. 'java/lang/String'); dotted
+# names are accepted by the queries as well.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS classes (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources(id) ON DELETE CASCADE,
+    entry TEXT NOT NULL,
+    name TEXT NOT NULL,
+    super_name TEXT,
+    access_flags INTEGER,
+    major_version INTEGER
+);
+CREATE TABLE IF NOT EXISTS members (
+    class_id INTEGER NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    descriptor TEXT NOT NULL,
+    access_flags INTEGER
+);
+CREATE TABLE IF NOT EXISTS refs (
+    class_id INTEGER NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    name TEXT,
+    descriptor TEXT
+);
+CREATE INDEX IF NOT EXISTS classes_by_name ON classes(name);
+CREATE INDEX IF NOT EXISTS classes_by_source ON classes(source_id);
+CREATE INDEX IF NOT EXISTS members_by_class ON members(class_id);
+CREATE INDEX IF NOT EXISTS members_by_name ON members(name, descriptor);
+CREATE INDEX IF NOT EXISTS members_by_descriptor ON members(descriptor);
+CREATE INDEX IF NOT EXISTS refs_by_class ON refs(class_id);
+CREATE INDEX IF NOT EXISTS refs_by_target ON refs(owner, name, descriptor);
+"""
+
+# reference kind stored in refs for each constant pool tag
+REFERENCE_KINDS = {CONSTANT_CLASS: "class", 9: "field", 10: "method", 11: "interface_method"}
+BATCH_SIZE = 1000
+UNINDEXED = (-1, -1)   # (mtime_ns, size) of a source whose classes have not all been written yet
+
+
+def internal_name(name):
+    return name.replace(".", "/") if name is not None else None
+
+
+# class_rows() returns the member and reference rows of a ClassFile as (kind, name, descriptor, access_flags) and
+# (kind, owner, name, descriptor) tuples
+def class_rows(classfile):
+    members = [("field", field.name, field.descriptor, field.access_flags) for field in classfile.fields]
+    members.extend(("method", method.name, method.descriptor, method.access_flags) for method in classfile.methods)
+
+    constant_pool = classfile.constant_pool
+    references = []
+    for index, tag in enumerate(constant_pool.tags):
+        kind = REFERENCE_KINDS.get(tag)
+        if kind is None:
+            continue
+        if tag == CONSTANT_CLASS:
+            references.append((kind, constant_pool.class_name(index), None, None))
+        else:
+            references.append((kind,) + constant_pool.resolve(index))
+    return members, references
+
+
+class CorpusIndex:
+
+    __slots__ = ("pathway", "connection", "batch_size")
+
+    def __init__(self, pathway, batch_size=BATCH_SIZE):
+        self.pathway = os.fspath(pathway)
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(self.pathway)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")   # durable at every checkpoint, which is enough for an index
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    # updating----------------------------------------------------------------------------------------------------------
+
+    # update() brings the index up to date with the given paths (directories, '.class' files and archives) and returns
+    # {"added": [...], "updated": [...], "removed": [...], "missing": [...], "unchanged": n, "classes": n,
+    # "failed": [...]}; workers and chunksize are passed on to iter_disassemble(). Paths that do not exist are listed as
+    # missing, and with prune the sources indexed under them are removed.
+    def update(self, paths, workers=None, chunksize=None, prune=True):
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        roots = [os.path.abspath(os.fspath(pathway)) for pathway in paths]
+        connection = self.connection
+        known = {path: (source_id, mtime_ns, size)
+                 for source_id, path, mtime_ns, size in connection.execute("SELECT id, path, mtime_ns, size FROM sources")}
+        summary = {"added": [], "updated": [], "removed": [], "missing": [], "unchanged": 0, "classes": 0,
+                   "failed": []}
+
+        found = set()
+        changed = {}   # path -> (mtime_ns, size) of the sources to disassemble
+        for pathway in find_class_files(roots):
+            pathway = os.path.abspath(pathway)
+            try:
+                stat = os.stat(pathway)
+            except OSError:
+                summary["missing"].append(pathway)
+                continue
+            found.add(pathway)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            stored = known.get(pathway)
+            if stored is not None and stored[1:] == stamp:
+                summary["unchanged"] += 1
+                continue
+            changed[pathway] = stamp
+            summary["updated" if stored is not None else "added"].append(pathway)
+
+        removed = []
+        if prune:
+            removed = [path for path in known if path not in found and under(path, roots)]
+            summary["removed"] = removed
+
+        with connection:
+            for pathway in removed + summary["updated"]:
+                connection.execute("DELETE FROM sources WHERE id = ?", (known[pathway][0],))
+            connection.executemany("INSERT INTO sources (path, mtime_ns, size) VALUES (?, ?, ?)",
+                                   [(pathway,) + UNINDEXED for pathway in changed])
+        if not changed:
+            return summary
+
+        source_ids = {path: source_id for source_id, path in connection.execute("SELECT id, path FROM sources")}
+        next_id = (connection.execute("SELECT MAX(id) FROM classes").fetchone()[0] or 0) + 1
+        classes, members, references = [], [], []
+        failed_sources = set()
+        finished = []   # sources whose classes are all in the current batch or an earlier one
+        stamped = set()
+        current = None
+        # the results come in input order, so a source is complete once the results of the next one start
+        for result in iter_disassemble(list(changed), workers=workers, chunksize=chunksize, attributes=()):
+            source = result.path.split(ENTRY_SEPARATOR, 1)[0]
+            if source != current:
+                if current is not None:
+                    finished.append(current)
+                current = source
+            if not result.ok:
+                summary["failed"].append(result.path)
+                failed_sources.add(source)
+                continue
+            classfile = result.classfile
+            try:
+                names = (classfile.this_class_name, classfile.super_class_name)
+                class_members, class_references = class_rows(classfile)
+            except (ValueError, IndexError):
+                # a class that parsed but has a broken constant pool reference; its source is stamped as failed, so
+                # the next update does not stumble over it again
+                summary["failed"].append(result.path)
+                failed_sources.add(source)
+                continue
+            class_id = next_id
+            next_id = next_id + 1
+            classes.append((class_id, source_ids[source], result.path) + names +
+                           (classfile.access_flags, classfile.major_version))
+            members.extend((class_id,) + row for row in class_members)
+            references.extend((class_id,) + row for row in class_references)
+            summary["classes"] += 1
+            if len(classes) >= self.batch_size:
+                self.write_batch(classes, members, references, stamps(finished, changed, failed_sources))
+                stamped.update(finished)
+                classes, members, references, finished = [], [], [], []
+
+        # the last source, and sources without any class (e.g. an empty archive), are finished as well
+        finished = [pathway for pathway in changed if pathway not in stamped]
+        self.write_batch(classes, members, references, stamps(finished, changed, failed_sources))
+        return summary
+
+    # write_batch() commits a batch of rows together with the stamps of the sources they complete
+    def write_batch(self, classes, members, references, source_stamps=()):
+        with self.connection as connection:
+            connection.executemany("INSERT INTO classes VALUES (?, ?, ?, ?, ?, ?, ?)", classes)
+            connection.executemany("INSERT INTO members VALUES (?, ?, ?, ?, ?)", members)
+            connection.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?)", references)
+            connection.executemany("UPDATE sources SET mtime_ns = ?, size = ?, failed = ? WHERE path = ?",
+                                   source_stamps)
+
+    # queries-----------------------------------------------------------------------------------------------------------
+
+    # sources() returns (path, class count, failed) for every indexed '.class' file and archive
+    def sources(self):
+        return self.connection.execute(
+            "SELECT sources.path, COUNT(classes.id), sources.failed FROM sources "
+            "LEFT JOIN classes ON classes.source_id = sources.id GROUP BY sources.id ORDER BY sources.path").fetchall()
+
+    # classes_named() returns (source path, entry) for every definition of a class, e.g. one per archive that contains
+    # a copy of it
+    def classes_named(self, name):
+        return self.connection.execute(
+            "SELECT sources.path, classes.entry FROM classes JOIN sources ON sources.id = classes.source_id "
+            "WHERE classes.name = ? ORDER BY sources.path, classes.entry", (internal_name(name),)).fetchall()
+
+    # members() returns (class, kind, name, descriptor, access_flags, entry) for the fields and methods matching every
+    # given criterion; kind is "field" or "method"
+    def members(self, name=None, descriptor=None, kind=None, owner=None):
+        criteria, values = [], []
+        for column, value in (("members.name", name), ("members.descriptor", internal_name(descriptor)),
+                              ("members.kind", kind), ("classes.name", internal_name(owner))):
+            if value is not None:
+                criteria.append(column + " = ?")
+                values.append(value)
+        query = ("SELECT classes.name, members.kind, members.name, members.descriptor, members.access_flags, "
+                 "classes.entry FROM members JOIN classes ON classes.id = members.class_id")
+        if criteria:
+            query = query + " WHERE " + " AND ".join(criteria)
+        return self.connection.execute(query + " ORDER BY classes.name, members.name, members.descriptor",
+                                       values).fetchall()
+
+    def methods_with_descriptor(self, descriptor, name=None):
+        return self.members(name=name, descriptor=descriptor, kind="method")
+
+    # references_to() returns (class, kind, owner, name, descriptor, entry) for every class whose constant pool refers to
+    # the given class, or to one of its fields or methods when name (and descriptor) are given
+    def references_to(self, owner, name=None, descriptor=None, kind=None):
+        criteria, values = ["refs.owner = ?"], [internal_name(owner)]
+        for column, value in (("refs.name", name), ("refs.descriptor", internal_name(descriptor)), ("refs.kind", kind)):
+            if value is not None:
+                criteria.append(column + " = ?")
+                values.append(value)
+        return self.connection.execute(
+            "SELECT classes.name, refs.kind, refs.owner, refs.name, refs.descriptor, classes.entry FROM refs "
+            "JOIN classes ON classes.id = refs.class_id WHERE " + " AND ".join(criteria) +
+            " ORDER BY classes.name, refs.kind, refs.name", values).fetchall()
+
+    def count(self, table):
+        if table not in ("sources", "classes", "members", "refs"):
+            raise ValueError("ERROR: unknown table '" + str(table) + "'")
+        return self.connection.execute("SELECT COUNT(*) FROM " + table).fetchone()[0]
+
+
+# stamps() returns the rows that mark the given sources as indexed
+def stamps(finished, changed, failed_sources):
+    return [changed[pathway] + (int(pathway in failed_sources), pathway) for pathway in finished]
+
+
+# under() tells whether a path is one of the roots or lies inside one of them
+def under(pathway, roots):
+    for root in roots:
+        if pathway == root or pathway.startswith(root.rstrip(os.sep) + os.sep):
+            return True
+    return False
@@ -0,0 +1,229 @@
+import re                  # class names inside descriptors
+from array import array    # compact adjacency lists
+
+from .batch import iter_disassemble
+
+# dependencies----------------------------------------------------------------------------------------------------------
+# The classes a class depends on, read from its constant pool alone. The disassembler runs in the "constants" scan mode,
+# which stops right after this_class, so fields, methods and attributes are never read. The referenced classes are
+# collected from:
+#
+#     - every Constant_Class entry (array classes such as '[Ljava/lang/String;' give their element class)
+#     - the descriptors of the NameAndType entries of the fields and methods the class uses, and of MethodType entries
+#     - Utf8 entries that are complete field or method descriptors, which covers the descriptors of the class's own
+#       fields and methods; Utf8 entries used as string literals are not looked at
+#
+# Generic signatures and annotations are not read. class_dependencies() returns the sorted internal names of the
+# referenced classes without the class itself.
+#
+# A DependencyGraph holds the dependencies of a whole corpus. Class names are interned as integer node ids and each
+# class keeps its dependencies as an array('I'). cycles() returns the strongly connected components with more than one
+# class (found with Tarjan's algorithm in a single pass over the edges), and packages() folds the graph into one node
+# per package, which is the level at which module boundaries are usually checked:
+#
+#     graph = build_dependency_graph("build/classes")
+#     for cycle in graph.packages().cycles():
+#         print(" -> ".join(cycle))
+
+_FIELD_DESCRIPTOR = r"\[*(?:[BCDFIJSZ]|L[^;\[.<>]+;)"
+DESCRIPTOR = re.compile(r"\((?:" + _FIELD_DESCRIPTOR + r")*\)(?:V|" + _FIELD_DESCRIPTOR + r")|" + _FIELD_DESCRIPTOR)
+DESCRIPTOR_CLASS = re.compile(r"L([^;]+);")
+DESCRIPTOR_STARTS = frozenset(b"(L[")   # first bytes of the descriptors that can name a class
+
+CONSTANT_UTF8 = 1
+CONSTANT_CLASS = 7
+CONSTANT_STRING = 8
+CONSTANT_NAME_AND_TYPE = 12
+CONSTANT_METHOD_TYPE = 16
+
+
+def class_dependencies(classfile):
+    constant_pool = classfile.constant_pool
+    tags = constant_pool.tags
+    first = constant_pool.first
+    data = constant_pool.data
+    words = constant_pool.words
+    names = set()
+    descriptors = []
+    named = set()   # Utf8 entries used as class names or string literals
+
+    for index, tag in enumerate(tags):
+        if tag == CONSTANT_CLASS:
+            name = constant_pool.utf8(first[index])
+            named.add(first[index])
+            if name.startswith("["):
+                descriptors.append(name)
+            else:
+                names.add(name)
+        elif tag == CONSTANT_NAME_AND_TYPE:
+            descriptors.append(constant_pool.utf8(constant_pool.second[index]))
+        elif tag == CONSTANT_METHOD_TYPE or tag == CONSTANT_STRING:
+            named.add(first[index])
+            if tag == CONSTANT_METHOD_TYPE:
+                descriptors.append(constant_pool.utf8(first[index]))
+
+    # the Utf8 entries are only decoded when their first byte can start a descriptor
+    for index, tag in enumerate(tags):
+        if tag == CONSTANT_UTF8 and first[index] > 1 and data[words[index]] in DESCRIPTOR_STARTS and \
+                index not in named:
+            text = constant_pool.utf8(index)
+            if DESCRIPTOR.fullmatch(text):
+                descriptors.append(text)
+
+    for descriptor in descriptors:
+        names.update(DESCRIPTOR_CLASS.findall(descriptor))
+    names.discard(classfile.this_class_name)
+    return sorted(names)
+
+
+# package_of() returns the package of an internal class name, e.g. 'java/lang' for 'java/lang/String'
+def package_of(name):
+    return name.rpartition("/")[0]
+
+
+class DependencyGraph:
+
+    __slots__ = ("ids", "names", "dependencies", "classes", "failed", "reverse")
+
+    def __init__(self):
+        self.ids = {}            # class name -> node id
+        self.names = []          # node id -> class name
+        self.dependencies = {}   # node id -> array('I') of the node ids it depends on, for the classes of the corpus
+        self.classes = 0         # classes added
+        self.failed = []         # paths of the classes that could not be disassembled
+        self.reverse = None      # node id -> list of dependent node ids, built by the first dependents_of()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        node = self.ids.get(name)
+        return node is not None and node in self.dependencies
+
+    @property
+    def edge_count(self):
+        return sum(len(targets) for targets in self.dependencies.values())
+
+    def node(self, name):
+        node = self.ids.get(name)
+        if node is None:
+            node = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node
+
+    # add() records the dependencies of a class; a class that is added twice (e.g. from two archives) keeps both sets
+    def add(self, name, dependencies):
+        source = self.node(name)
+        targets = {self.node(dependency) for dependency in dependencies}
+        targets.discard(source)
+        known = self.dependencies.get(source)
+        if known is not None:
+            targets.update(known)
+        self.dependencies[source] = array("I", sorted(targets))
+        self.reverse = None
+
+    # add_class() raises ValueError for a class with a broken constant pool reference, before anything is recorded
+    def add_class(self, classfile):
+        name = classfile.this_class_name
+        dependencies = class_dependencies(classfile)
+        self.classes = self.classes + 1
+        self.add(name, dependencies)
+
+    def dependencies_of(self, name):
+        node = self.ids.get(name)
+        names = self.names
+        return [names[target] for target in self.dependencies.get(node, ())]
+
+    def dependents_of(self, name):
+        node = self.ids.get(name)
+        if node is None:
+            return []
+        if self.reverse is None:
+            reverse = [[] for name in self.names]
+            for source, targets in self.dependencies.items():
+                for target in targets:
+                    reverse[target].append(source)
+            self.reverse = reverse
+        names = self.names
+        return sorted(names[source] for source in self.reverse[node])
+
+    # packages() returns the graph with one node per package; dependencies within a package are dropped
+    def packages(self):
+        packages = {}
+        names = self.names
+        for source, targets in self.dependencies.items():
+            package = package_of(names[source])
+            targets = {package_of(names[target]) for target in targets}
+            targets.discard(package)
+            packages.setdefault(package, set()).update(targets)
+        graph = DependencyGraph()
+        for package, targets in sorted(packages.items()):
+            graph.add(package, targets)
+        graph.classes = self.classes
+        graph.failed = list(self.failed)
+        return graph
+
+    # cycles() returns every strongly connected component of more than one class as a sorted list of names; only the
+    # classes of the corpus can be part of a cycle, since the classes outside of it have no known dependencies
+    def cycles(self):
+        dependencies = self.dependencies
+        empty = array("I")
+        index_of = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        counter = 0
+
+        for root in dependencies:
+            if root in index_of:
+                continue
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(dependencies.get(root, empty)))]   # iterative depth-first search
+            while work:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index_of:
+                        index_of[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(dependencies.get(target, empty))))
+                        break
+                    if target in on_stack and index_of[target] < lowlink[node]:
+                        lowlink[node] = index_of[target]
+                else:
+                    work.pop()
+                    if work and lowlink[node] < lowlink[work[-1][0]]:
+                        lowlink[work[-1][0]] = lowlink[node]
+                    if lowlink[node] == index_of[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1:
+                            components.append(sorted(self.names[member] for member in component))
+        return sorted(components)
+
+
+# build_dependency_graph() disassembles the given paths (directories, '.class' files and archives) in the "constants"
+# scan mode and returns their DependencyGraph; workers, chunksize, cache and dedupe are passed on to iter_disassemble()
+def build_dependency_graph(paths, workers=None, chunksize=None, cache=None, dedupe=False, collector=None, graph=None):
+    if graph is None:
+        graph = DependencyGraph()
+    for result in iter_disassemble(paths, workers=workers, chunksize=chunksize, scan="constants", cache=cache,
+                                   dedupe=dedupe, collector=collector):
+        if not result.ok:
+            graph.failed.append(result.path)
+            continue
+        try:
+            graph.add_class(result.classfile)
+        except (ValueError, IndexError):   # a class with a broken constant pool reference
+            graph.failed.append(result.path)
+    return graph
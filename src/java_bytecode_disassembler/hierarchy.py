@@ -0,0 +1,289 @@
+import os
+import pickle                   # on-disk form of the index
+from array import array          # compact node and interval columns
+from bisect import bisect_right
+
+from .batch import iter_disassemble
+
+# hierarchy-------------------------------------------------------------------------------------------------------------
+# An in-memory index of the inheritance hierarchy of a classpath. build_hierarchy() disassembles directories, '.class'
+# files and archives in the "header" scan mode (which stops after the interfaces table) and records the super class and
+# the interfaces of every class. Class names are interned as integer node ids; classes that are only referenced (e.g.
+# java/lang/Object when the JDK is not part of the classpath) are nodes without known supertypes.
+#
+# Subtype queries are answered from an interval encoding that is computed once, on the first query after classes were
+# added:
+#
+#     - the super class edges form a forest. A depth-first walk numbers every node in pre-order, so the subclasses of a
+#       class are exactly the nodes numbered from its own number to the last number given inside its subtree.
+#     - an interface has no subclasses, but it is implemented by classes and extended by other interfaces. Its subtypes
+#       are the union of the intervals of those types, which is stored as a merged, sorted list of intervals.
+#
+# Every node therefore owns a short list of [start, end] intervals over the pre-order numbering (a single interval for
+# a class). is_subtype(a, b) is a binary search for the number of a among the intervals of b, and all_subtypes(x) reads
+# the nodes inside the intervals of x. all_supertypes(x) walks up the super class and interface edges, which only visits
+# the supertypes themselves. Types are subtypes of themselves, as in Class.isAssignableFrom(); all_subtypes() and
+# all_supertypes() do not include the type itself.
+#
+# save() writes the index, including the encoding, to a single file that load() reads back without rebuilding anything.
+
+HIERARCHY_FORMAT = 1   # bumped whenever the on-disk form changes
+NO_SUPER = 0xffffffff
+KNOWN = 1              # flags of a node: the class itself was added, not only referenced
+INTERFACE = 2          # ACC_INTERFACE was set on the class
+ACC_INTERFACE = 0x0200
+
+
+class Hierarchy:
+
+    __slots__ = ("ids", "names", "supers", "interfaces", "flags", "classes", "failed", "order", "numbers",
+                 "interval_offsets", "starts", "ends")
+
+    def __init__(self):
+        self.ids = {}               # class name -> node id
+        self.names = []             # node id -> class name
+        self.supers = array("I")    # node id -> node id of the super class, or NO_SUPER
+        self.interfaces = {}        # node id -> array('I') of the direct interfaces
+        self.flags = array("B")     # node id -> KNOWN | INTERFACE
+        self.classes = 0            # classes added
+        self.failed = []            # paths of the classes that could not be disassembled
+        self.order = None           # pre-order number -> node id; None until the encoding is built
+        self.numbers = None         # node id -> pre-order number
+        self.interval_offsets = None   # node id -> position of its first interval in starts/ends
+        self.starts = None
+        self.ends = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        node = self.ids.get(name)
+        return node is not None and bool(self.flags[node] & KNOWN)
+
+    def node(self, name):
+        node = self.ids.get(name)
+        if node is None:
+            node = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.supers.append(NO_SUPER)
+            self.flags.append(0)
+        return node
+
+    # add() records the direct supertypes of a class; super_name is None for java/lang/Object and module-info
+    def add(self, name, super_name, interface_names=(), is_interface=False):
+        node = self.node(name)
+        self.supers[node] = self.node(super_name) if super_name is not None else NO_SUPER
+        if interface_names:
+            self.interfaces[node] = array("I", [self.node(interface) for interface in interface_names])
+            for interface in self.interfaces[node]:
+                self.flags[interface] |= INTERFACE
+        else:
+            self.interfaces.pop(node, None)
+        self.flags[node] |= KNOWN | (INTERFACE if is_interface else 0)
+        self.order = None
+
+    # add_class() raises ValueError for a class with a broken constant pool reference, before anything is recorded
+    def add_class(self, classfile):
+        names = (classfile.this_class_name, classfile.super_class_name, classfile.interface_names)
+        self.classes = self.classes + 1
+        self.add(*names, is_interface=bool(classfile.access_flags & ACC_INTERFACE))
+
+    def is_interface(self, name):
+        node = self.ids.get(name)
+        return node is not None and bool(self.flags[node] & INTERFACE)
+
+    # encoding----------------------------------------------------------------------------------------------------------
+
+    def build(self):
+        if self.order is not None:
+            return
+        count = len(self.names)
+        supers = self.supers
+
+        # pre-order numbering of the super class forest; last[node] is the last number inside the subtree of node
+        children = [[] for node in range(count)]
+        roots = []
+        for node in range(count):
+            parent = supers[node]
+            if parent == NO_SUPER:
+                roots.append(node)
+            else:
+                children[parent].append(node)
+        order = array("I")
+        numbers = array("I", bytes(4 * count))
+        last = array("I", bytes(4 * count))
+        visited = bytearray(count)
+        # nodes caught in a (malformed) super class cycle are not reachable from any root and start walks of their own
+        for root in roots + list(range(count)):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            numbers[root] = len(order)
+            order.append(root)
+            work = [(root, iter(children[root]))]
+            while work:
+                node, pending = work[-1]
+                for child in pending:
+                    if not visited[child]:
+                        visited[child] = 1
+                        numbers[child] = len(order)
+                        order.append(child)
+                        work.append((child, iter(children[child])))
+                        break
+                else:
+                    work.pop()
+                    last[node] = len(order) - 1
+
+        # types that list each node among their direct interfaces
+        implementers = {}
+        for node, interfaces in self.interfaces.items():
+            for interface in interfaces:
+                implementers.setdefault(interface, []).append(node)
+
+        # intervals of a node: its subtree, merged with the intervals of its implementers (computed first)
+        intervals = [None] * count
+        for start in range(count):
+            if intervals[start] is not None:
+                continue
+            work = [(start, iter(implementers.get(start, ())))]
+            intervals[start] = ()   # in progress; an interface cycle ends at the node that closes it
+            while work:
+                node, pending = work[-1]
+                for implementer in pending:
+                    if intervals[implementer] is None:
+                        intervals[implementer] = ()
+                        work.append((implementer, iter(implementers.get(implementer, ()))))
+                        break
+                else:
+                    work.pop()
+                    spans = [(numbers[node], last[node])]
+                    for implementer in implementers.get(node, ()):
+                        spans.extend(intervals[implementer])
+                    intervals[node] = merge(spans)
+
+        interval_offsets = array("I", bytes(4 * (count + 1)))
+        starts = array("I")
+        ends = array("I")
+        for node in range(count):
+            interval_offsets[node] = len(starts)
+            for span_start, span_end in intervals[node]:
+                starts.append(span_start)
+                ends.append(span_end)
+        interval_offsets[count] = len(starts)
+
+        self.order = order
+        self.numbers = numbers
+        self.interval_offsets = interval_offsets
+        self.starts = starts
+        self.ends = ends
+
+    # queries-----------------------------------------------------------------------------------------------------------
+
+    # is_subtype() tells whether a is b, extends b or implements b, directly or not
+    def is_subtype(self, a, b):
+        if a == b:
+            return True
+        node = self.ids.get(a)
+        supertype = self.ids.get(b)
+        if node is None or supertype is None:
+            return False
+        self.build()
+        number = self.numbers[node]
+        low = self.interval_offsets[supertype]
+        position = bisect_right(self.starts, number, low, self.interval_offsets[supertype + 1]) - 1
+        return position >= low and number <= self.ends[position]
+
+    def all_subtypes(self, name):
+        node = self.ids.get(name)
+        if node is None:
+            return []
+        self.build()
+        order = self.order
+        names = self.names
+        subtypes = []
+        for position in range(self.interval_offsets[node], self.interval_offsets[node + 1]):
+            subtypes.extend(names[order[number]] for number in range(self.starts[position], self.ends[position] + 1))
+        subtypes.remove(name)
+        return sorted(subtypes)
+
+    def all_supertypes(self, name):
+        node = self.ids.get(name)
+        if node is None:
+            return []
+        seen = {node}
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            parents = list(self.interfaces.get(current, ()))
+            if self.supers[current] != NO_SUPER:
+                parents.append(self.supers[current])
+            for parent in parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    pending.append(parent)
+        seen.discard(node)
+        return sorted(self.names[parent] for parent in seen)
+
+    def superclass(self, name):
+        node = self.ids.get(name)
+        if node is None or self.supers[node] == NO_SUPER:
+            return None
+        return self.names[self.supers[node]]
+
+    # storage-----------------------------------------------------------------------------------------------------------
+
+    def save(self, pathway):
+        self.build()
+        pathway = os.fspath(pathway)
+        state = (HIERARCHY_FORMAT, self.names, self.supers, self.interfaces, self.flags, self.classes, self.failed,
+                 self.order, self.numbers, self.interval_offsets, self.starts, self.ends)
+        temporary = pathway + "." + str(os.getpid()) + ".tmp"
+        with open(temporary, "wb") as output:
+            pickle.dump(state, output, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, pathway)   # readers never see a partial file
+        return pathway
+
+    @classmethod
+    def load(cls, pathway):
+        with open(pathway, "rb") as stored:
+            state = pickle.load(stored)
+        if not isinstance(state, tuple) or state[0] != HIERARCHY_FORMAT:
+            raise ValueError("ERROR: '" + os.fspath(pathway) + "' is not a hierarchy index of format " +
+                             str(HIERARCHY_FORMAT))
+        hierarchy = cls()
+        (version, hierarchy.names, hierarchy.supers, hierarchy.interfaces, hierarchy.flags, hierarchy.classes,
+         hierarchy.failed, hierarchy.order, hierarchy.numbers, hierarchy.interval_offsets, hierarchy.starts,
+         hierarchy.ends) = state
+        hierarchy.ids = {name: node for node, name in enumerate(hierarchy.names)}
+        return hierarchy
+
+
+# merge() sorts intervals and joins the ones that overlap or touch
+def merge(spans):
+    spans = sorted(spans)
+    merged = [spans[0]]
+    for start, end in spans[1:]:
+        previous_start, previous_end = merged[-1]
+        if start <= previous_end + 1:
+            if end > previous_end:
+                merged[-1] = (previous_start, end)
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+# build_hierarchy() disassembles the headers of the given paths (directories, '.class' files and archives) and returns
+# their Hierarchy; workers, chunksize, cache and dedupe are passed on to iter_disassemble()
+def build_hierarchy(paths, workers=None, chunksize=None, cache=None, dedupe=False, collector=None, hierarchy=None):
+    if hierarchy is None:
+        hierarchy = Hierarchy()
+    for result in iter_disassemble(paths, workers=workers, chunksize=chunksize, scan="header", cache=cache,
+                                   dedupe=dedupe, collector=collector):
+        if not result.ok:
+            hierarchy.failed.append(result.path)
+            continue
+        try:
+            hierarchy.add_class(result.classfile)
+        except (ValueError, IndexError):   # a class with a broken constant pool reference
+            hierarchy.failed.append(result.path)
+    return hierarchy
@@ -0,0 +1,159 @@
+import json   # JSON export
+import os
+import time   # wall time of the collection
+
+# instrumentation-------------------------------------------------------------------------------------------------------
+# Structured counters for profiling the disassembler. A Collector passed to disassembler(..., collector=...) (or to
+# disassemble(), disassemble_bytes(), disassemble_archive() and the batch interface) records:
+#
+#     - the wall time and the number of bytes consumed by every phase of control_box (bytecode, constant_pool, ...)
+#     - the number of classes, failed classes, class bytes and total parse time
+#     - the count and total byte size of every attribute type, including skipped and unknown attributes
+#     - the number of decoded instructions
+#
+# Without a collector the parser only pays for a few 'is None' checks. One collector can be shared by any number of
+# sequential parses; the batch interface gives each worker process its own collector and merges them into the one
+# passed in. Classes answered from the result cache or by dedupe are not parsed and therefore not counted.
+#
+# The totals can be exported as JSON (to_json()) or in the Prometheus text format (to_prometheus(), or
+# write_prometheus() for the textfile collector of the node exporter), where dashboards derive classes/s and bytes/s
+# from the *_total counters.
+
+PROMETHEUS_PREFIX = "java_bytecode_disassembler"
+
+
+class Collector:
+
+    __slots__ = ("classes", "failed", "bytes", "seconds", "instructions", "phases", "attributes", "started")
+
+    def __init__(self):
+        self.classes = 0
+        self.failed = 0
+        self.bytes = 0           # size of the parsed classes
+        self.seconds = 0.0       # time spent parsing them
+        self.instructions = 0    # instructions decoded from Code attributes
+        self.phases = {}         # phase -> [calls, seconds, bytes consumed]
+        self.attributes = {}     # attribute name -> [count, bytes]
+        self.started = time.time()
+
+    # hooks called by the parser----------------------------------------------------------------------------------------
+
+    def phase(self, name, seconds, consumed):
+        totals = self.phases.get(name)
+        if totals is None:
+            totals = self.phases[name] = [0, 0.0, 0]
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += consumed
+
+    def attribute(self, name, length):
+        totals = self.attributes.get(name)
+        if totals is None:
+            totals = self.attributes[name] = [0, 0]
+        totals[0] += 1
+        totals[1] += length
+
+    def decoded(self, count):
+        self.instructions += count
+
+    def parsed(self, ok, size, seconds):
+        self.classes += 1
+        if not ok:
+            self.failed += 1
+        self.bytes += size
+        self.seconds += seconds
+
+    # aggregation-------------------------------------------------------------------------------------------------------
+
+    # merge() adds the counts of another collector (e.g. the one of a worker process) to this one
+    def merge(self, other):
+        self.classes += other.classes
+        self.failed += other.failed
+        self.bytes += other.bytes
+        self.seconds += other.seconds
+        self.instructions += other.instructions
+        for name, (calls, seconds, consumed) in other.phases.items():
+            totals = self.phases.setdefault(name, [0, 0.0, 0])
+            totals[0] += calls
+            totals[1] += seconds
+            totals[2] += consumed
+        for name, (count, length) in other.attributes.items():
+            totals = self.attributes.setdefault(name, [0, 0])
+            totals[0] += count
+            totals[1] += length
+        return self
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    # export------------------------------------------------------------------------------------------------------------
+
+    def to_dict(self):
+        elapsed = self.elapsed()
+        return {
+            "classes": self.classes,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "instructions": self.instructions,
+            "elapsed": elapsed,
+            "classes_per_second": self.classes / elapsed if elapsed > 0 else 0.0,
+            "bytes_per_second": self.bytes / elapsed if elapsed > 0 else 0.0,
+            "phases": {name: {"calls": calls, "seconds": seconds, "bytes": consumed}
+                       for name, (calls, seconds, consumed) in self.phases.items()},
+            "attributes": {str(name): {"count": count, "bytes": length}
+                           for name, (count, length) in self.attributes.items()},
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append("# HELP " + prefix + "_" + name + " " + help_text)
+            lines.append("# TYPE " + prefix + "_" + name + " " + kind)
+            for labels, value in samples:
+                lines.append(prefix + "_" + name + labels + " " + repr(value))
+
+        elapsed = self.elapsed()
+        metric("classes_total", "counter", "Classes parsed.", [("", self.classes)])
+        metric("classes_failed_total", "counter", "Classes that failed to parse.", [("", self.failed)])
+        metric("bytes_total", "counter", "Bytes of the parsed classes.", [("", self.bytes)])
+        metric("parse_seconds_total", "counter", "Time spent parsing classes.", [("", self.seconds)])
+        metric("instructions_total", "counter", "Instructions decoded from Code attributes.",
+               [("", self.instructions)])
+        metric("classes_per_second", "gauge", "Classes parsed per second of wall time.",
+               [("", self.classes / elapsed if elapsed > 0 else 0.0)])
+        metric("bytes_per_second", "gauge", "Class bytes parsed per second of wall time.",
+               [("", self.bytes / elapsed if elapsed > 0 else 0.0)])
+
+        phases = sorted(self.phases.items())
+        metric("phase_calls_total", "counter", "Calls of each parser phase.",
+               [(label("phase", name), calls) for name, (calls, seconds, consumed) in phases])
+        metric("phase_seconds_total", "counter", "Wall time of each parser phase.",
+               [(label("phase", name), seconds) for name, (calls, seconds, consumed) in phases])
+        metric("phase_bytes_total", "counter", "Bytes consumed by each parser phase.",
+               [(label("phase", name), consumed) for name, (calls, seconds, consumed) in phases])
+
+        attributes = sorted(self.attributes.items(), key=lambda item: str(item[0]))
+        metric("attributes_total", "counter", "Attributes read, by attribute name.",
+               [(label("attribute", name), count) for name, (count, length) in attributes])
+        metric("attribute_bytes_total", "counter", "Bytes of the attributes read, by attribute name.",
+               [(label("attribute", name), length) for name, (count, length) in attributes])
+        return "\n".join(lines) + "\n"
+
+    # write_prometheus() replaces the file in one step, so the node exporter never reads a partial file
+    def write_prometheus(self, pathway, prefix=PROMETHEUS_PREFIX):
+        pathway = os.fspath(pathway)
+        temporary = pathway + "." + str(os.getpid()) + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as output:
+            output.write(self.to_prometheus(prefix))
+        os.replace(temporary, pathway)
+        return pathway
+
+
+def label(name, value):
+    value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + name + "=\"" + value + "\"}"
@@ -1,22 +1,137 @@
 import os            # filesystem manipulation
 import traceback     # for system traceback in error handling operations
 import shutil        # for removing directories
+import struct        # decoding of the constant pool entries
+from array import array   # offset columns of the constant pool
+import time          # phase timing for the instrumentation collector
 from os import path  # for scanning directories
 
+from .reader import class_reader, map_stream   # cursor used to read the raw bytes of the '.class' file
+from .opcodes import decode_instructions, format_instruction   # instruction set table and decoder
+from .classfile import (ClassFile, ConstantPool, FieldInfo, MethodInfo, Attribute, UnknownAttribute,   # in-memory
+                        LazyAttribute,
+                        ConstantValueAttribute, SignatureAttribute, SourceFileAttribute,                 # object model
+                        SourceDebugExtensionAttribute, ExceptionsAttribute, InnerClassesAttribute,       # returned to
+                        BootstrapMethodsAttribute, EnclosingMethodAttribute, NestHostAttribute,          # the caller
+                        ClassListAttribute, RecordAttribute, RecordComponent, MethodParametersAttribute,
+                        ModuleAttribute, ModulePackagesAttribute, ModuleMainClassAttribute, CodeAttribute,
+                        ExceptionEntry, LineNumberTableAttribute, LocalVariableTableAttribute,
+                        StackMapTableAttribute, StackMapFrame, AnnotationsAttribute, ParameterAnnotationsAttribute,
+                        TypeAnnotationsAttribute, AnnotationDefaultAttribute, Annotation, TypeAnnotation,
+                        ElementValue, DisassemblyResult, CONSTANT_CLASS)
+
+# Scan modes------------------------------------------------------------------------------------------------------------
+# "full" disassembles the whole class. "header" stops after the interfaces table, which is all that is needed for
+# this_class/super_class/interfaces inventories. "constants" stops right after this_class, which leaves the constant pool
+# and the name of the class (used by the dependency extraction in dependencies.py). "version" reads only the first 8
+# bytes (magic, minor and major version).
+
+SCAN_MODES = ("full", "header", "constants", "version")
+VERSION_HEADER_SIZE = 8
+# last phase run by each partial scan mode
+SCAN_STOPS = {"version": "major_minor", "header": "interfaces", "constants": "this_class"}
+MMAP_THRESHOLD = 1 << 20   # '.class' files of at least this many bytes are memory-mapped instead of read
+
+# size of each constant pool entry after its tag byte, by tag; a Utf8 entry is followed by its string as well
+CONSTANT_SIZES = {1: 2, 3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4, 15: 3, 16: 2, 17: 4, 18: 4,
+                  19: 2, 20: 2}
+_u2 = struct.Struct(">H")
+_u4 = struct.Struct(">I")
+_u2_u2 = struct.Struct(">HH")
+_u4_u4 = struct.Struct(">II")
+_u2_u2_u2_u2 = struct.Struct(">HHHH")      # exception_table and InnerClasses entries
+_local_variable = struct.Struct(">HHHHH")  # LocalVariableTable and LocalVariableTypeTable entries
+
+# The phases of control_box in the order of the class file, with the message printed for each one in verbose mode. The
+# phase names are also the names reported to the instrumentation collector (see instrumentation.py).
+CONTROL_PHASES = (
+    ("bytecode", "Reading raw bytecode"),
+    ("magic_number", "Processing magic number"),
+    ("major_minor", "Processing major and minor version numbers"),
+    ("constant_pool_count", "Processing constant pool count"),
+    ("constant_pool", "Processing constant pool"),
+    ("access_flags", "Processing access flags"),
+    ("this_class", "Processing this_class"),
+    ("super_class", "Processing super_class"),
+    ("interfaces_count", "Processing interfaces_count"),
+    ("interfaces", "Processing interfaces"),
+    ("fields_count", "Processing fields_count"),
+    ("fields", "Processing fields"),
+    ("methods_count", "Processing methods_count"),
+    ("methods", "Processing methods"),
+    ("attributes_count", "Processing attributes_count"),
+    ("attributes", "Processing attributes"),
+)
+
+
+# parse_context---------------------------------------------------------------------------------------------------------
+# Holds all of the state of a single parse: the reader positioned in the raw bytes, the options, the constant pool and
+# the counters used to name the files of the 'deconst_class' tree. One context is created per disassembler and handed
+# down to every attribute parser, so separate disassemblers never share any state and can run in parallel threads.
+
+class parse_context:
+
+    __slots__ = ("pathway", "verbose", "write", "allowed", "log_files", "data", "constant_pool", "attribute_dispatch",
+                 "unknown_attributes", "collector", "code_count", "linenumbertable_count", "localvariabletable_count",
+                 "lvtt_count")
+
+    def __init__(self, pathway, verbose, write, allowed, log_files, collector=None):
+        self.pathway = pathway        # path or logical name of the class being parsed
+        self.verbose = verbose
+        self.write = write
+        self.allowed = allowed        # allow-list of attribute names to decode, or None to decode every attribute
+        self.log_files = log_files    # whether module_main_class.txt may be appended to
+        self.data = None              # class_reader over the raw bytes of the class
+        self.constant_pool = None     # ConstantPool, as built by disassembler.constant_pool()
+
+        # the handler resolved for each attribute_name_index and the counts of attributes that no handler recognised
+        self.attribute_dispatch = {}
+        self.unknown_attributes = {}
+
+        self.collector = collector    # instrumentation Collector, or None when the parse is not instrumented
+
+        # A class can hold several Code attributes, and a Code attribute several LineNumberTable, LocalVariableTable
+        # and LocalVariableTypeTable attributes. These counters give each of them a unique file name.
+        self.code_count = 0
+        self.linenumbertable_count = 0
+        self.localvariabletable_count = 0
+        self.lvtt_count = 0
+
+
 class disassembler:
 
 
-    def __init__(self, pathway, verbose=False, fail_check=True, write=True):
+    def __init__(self, pathway, verbose=False, fail_check=True, write=True, source=None, scan="full", attributes=None,
+                 collector=None, lazy=False):
 
-        global glob_path
-        glob_path = pathway    # store pathway for use across classes
+        if scan not in SCAN_MODES:
+            raise ValueError("ERROR: unknown scan mode '" + str(scan) + "', expected one of " + ", ".join(SCAN_MODES))
+        if lazy and write:
+            # the 'deconst_class' tree holds the decoded Code attributes, so they can not be deferred
+            raise ValueError("ERROR: lazy decoding can not be combined with write")
 
-        global code_count
-        code_count = 0  # variable to keep track of each code attribute if one or more are present within the bytecode
+        # The results of the disassembly are collected in self.classfile (see classfile.py). If the disassembly fails,
+        # self.classfile is left as None and the traceback is stored in self.error.
+        self.classfile = None
+        self.error = None
 
         self.write = write        # if the write value is False, the disassembler does not perform its usual write operations
         self.pathway = pathway  # store the pathway for global use within the class
+        self.source = source    # raw bytes of the class when it is not read from the pathway (e.g. an archive entry)
         self.verbose = verbose  # prints additional data to the console during disassembly for more extensive debugging
+        self.scan = scan        # how much of the class is disassembled (see SCAN_MODES)
+        self.collector = collector   # optional instrumentation Collector (see instrumentation.py)
+        self.lazy = lazy        # if True, the Code attributes of the methods are decoded when they are first accessed
+        self.mapping = None     # mmap of the '.class' file while a large file is being parsed
+
+        # attributes is an optional allow-list of attribute names (e.g. ["Code", "LineNumberTable"]). Attributes that
+        # are not listed are skipped using their attribute_length without being decoded.
+        self.allowed_attributes = frozenset(attributes) if attributes is not None else None
+
+        # all of the parse state lives in the context; classes passed in as bytes never touch the filesystem unless
+        # write is requested
+        self.context = parse_context(pathway, verbose, write, self.allowed_attributes, source is None,
+                                     collector)
 
 
         #  fail_check is used for handling if the disassembly fails
@@ -41,7 +156,7 @@ class disassembler:
             # A sub-directory with the name of the '.class' file is created to store processed data relating to the individual file
             # being processed.
 
-            if path.exists(pathway):  # check to ensure the '.class' file exists
+            if source is not None or path.exists(pathway):  # check to ensure the '.class' file exists
                 classfile_name = path.basename(pathway)  # get the filename from the path
                 if classfile_name.endswith(".class"):  # check to ensure that the filetype is '.class'
                     classfile_prefix = classfile_name.removesuffix(".class")  # remove the filetype suffix
@@ -68,58 +183,26 @@ class disassembler:
 
     def control_box(self):
 
+        self.classfile = ClassFile(self.pathway)
+        collector = self.collector
+        stop = SCAN_STOPS.get(self.scan)
+        if collector is not None:
+            started = time.perf_counter()
         try:
-            if self.verbose:
-                print("Reading raw bytecode")    # if the verbose command is passed, additonal data is printed
-            self.bytecode()
-            if self.verbose:
-                print("Processing magic number")
-            self.magic_number()
-            if self.verbose:
-                print("Processing major and minor version numbers")
-            self.major_minor()
-            if self.verbose:
-                print("Processing constant pool count")
-            self.constant_pool_count()
-            if self.verbose:
-                print("Processing constant pool")
-            self.constant_pool()
-            if self.verbose:
-                print("Processing access flags")
-            self.access_flags()
-            if self.verbose:
-                print("Processing this_class")
-            self.this_class()
-            if self.verbose:
-                print("Processing super_class")
-            self.super_class()
-            if self.verbose:
-                print("Processing interfaces_count")
-            self.interfaces_count()
-            if self.verbose:
-                print("Processing interfaces")
-            self.interfaces()
-            if self.verbose:
-                print("Processing fields_count")
-            self.fields_count()
-            if self.verbose:
-                print("Processing fields")
-            self.fields()
-            if self.verbose:
-                print("Processing methods_count")
-            self.methods_count()
-            if self.verbose:
-                print("Processing methods")
-            self.methods()
-            if self.verbose:
-                print("Processing attributes_count")
-            self.attributes_count()
-            if self.verbose:
-                print("Processing attributes")
-            self.attributes()
+            for phase, message in CONTROL_PHASES:
+                if self.verbose:
+                    print(message)    # if the verbose command is passed, additonal data is printed
+                if collector is None:
+                    getattr(self, phase)()
+                else:
+                    self.timed_phase(phase)
+                if phase == stop:
+                    break
         except:
             # print error traceback
-            print(traceback.format_exc())
+            self.classfile = None
+            self.error = traceback.format_exc()
+            print(self.error)
 
             # write the path of to the file that failed processing for further investigation
             if self.fail_check:
@@ -127,49 +210,80 @@ class disassembler:
                 write_error.write(self.pathway + "\n")
                 write_error.close()
 
+        if collector is not None:
+            data = self.context.data
+            collector.parsed(self.classfile is not None, len(data.buffer) if data is not None else 0,
+                             time.perf_counter() - started)
+
+        if self.mapping is not None and not self.lazy:
+            self.release_mapping()
+
+    # release_mapping() closes the mmap of a large class file as soon as the parse is done. In lazy mode the deferred
+    # Code attributes still read from the mapping, so it is only closed once the last of them has been collected; the
+    # same happens when a registered attribute handler kept a memoryview of the bytes.
+    def release_mapping(self):
+        self.context.data.buffer.release()
+        self.context.data = None
+        try:
+            self.mapping.close()
+        except BufferError:
+            pass
+        self.mapping = None
+
+    # timed_phase() runs one phase of control_box and reports its wall time and the bytes it consumed to the collector
+    def timed_phase(self, phase):
+        data = self.context.data
+        offset = data.offset if data is not None else 0
+        started = time.perf_counter()
+        try:
+            getattr(self, phase)()
+        finally:
+            data = self.context.data
+            self.collector.phase(phase, time.perf_counter() - started, (data.offset if data is not None else 0) - offset)
+
+    # result() packages the outcome of the disassembly for the batch and archive interfaces
+    def result(self):
+        error = self.error
+        if self.classfile is None and error is None:
+            error = "ERROR: '" + str(self.pathway) + "' could not be disassembled"
+        return DisassemblyResult(self.pathway, self.classfile, error)
+
     # Reading the bytecode--------------------------------------------------------------------------------------------------
-    # The raw binaries for the '.class' file is read. It is converted to hexadecimal form and each byte is stored into an
-    # array object.
+    # The raw binaries for the '.class' file are read and wrapped in a class_reader. The reader is a cursor over the
+    # raw bytes; every function further down the disassembly reads its values through it (data.u1(), data.u2(),
+    # data.u4(), ...) instead of removing them from the front of a list.
     def bytecode(self):
         # read raw bytecode binaries
-        classfile_data = open(self.pathway, 'rb')
-        raw_data = classfile_data.read()
-        classfile_data.close()
-
-        # convert binaries to hexadecimal
-        raw_data = bytes.hex(raw_data)
-
-        # sort each individual byte into array
-        half_byte = []
-        for byte_data in raw_data:
-            half_byte.append(byte_data)
-
-        # sort each byte into global array object
-        total_bytes = ((len(raw_data)) / 2)
-        byte_split = []
-        while total_bytes != 0:
-            byte_split.append(half_byte[0] + half_byte[1])
-            del half_byte[0:2]
-            total_bytes = total_bytes - 1
-
-        # The data variable is globalized to avoid building redundancies further down in the disassembly. It is used
-        # by both classes within the program.
-        global data
-        data = byte_split
+        if self.source is not None:
+            raw_data = self.source
+        else:
+            classfile_data = open(self.pathway, 'rb')
+            if self.scan == "version":
+                raw_data = classfile_data.read(VERSION_HEADER_SIZE)   # only the magic number and version are needed
+            elif os.fstat(classfile_data.fileno()).st_size >= MMAP_THRESHOLD:
+                # large classes (generated protobuf or parser code) are parsed straight from the page cache
+                raw_data = self.mapping = map_stream(classfile_data)
+            else:
+                raw_data = classfile_data.read()
+            classfile_data.close()
+
+        # The reader is kept in the parse context, which is shared with the attribute parsers further down in the
+        # disassembly.
+        self.context.data = class_reader(raw_data)
+        self.context.unknown_attributes = self.classfile.unknown_attributes
 
     # Magic-Number Processing-----------------------------------------------------------------------------------------------
-    # All '.class' files begin with the magic number 'cafebabe'. This function identifies the data, writes it to a file and
-    # removes the magic number from the main data dump (i.e. bytecode.data).
+    # All '.class' files begin with the magic number 'cafebabe'. This function identifies the data and writes it to a file.
     def magic_number(self):
-        global data
+        data = self.context.data
 
         magic = "cafebabe"
 
         # magic number is four bytes of data:
-        get_magic = data[0] + data[1] + data[2] + data[3]
+        get_magic = format(data.u4(), "08x")
 
+        self.classfile.magic = get_magic
         if magic == get_magic:                                             # check to ensure the magic number is present
-            del data[0:4]                                         # remove the magic number from the main data dump
             if self.write:      # if write operations are specified, write the data
                 store_magic = open((self.classfile_dir + "/magic_number.txt"), "w")  # store magic number
                 store_magic.write(get_magic)                                    # this data may be used by another python script
@@ -179,20 +293,15 @@ class disassembler:
 
     # Major/Minor version numbers-------------------------------------------------------------------------------------------
     # All '.class' files contain major and minor version numbers that the JAVA virtual machine uses to understand how they
-    # should be handled. This function identifies the version numbers, removes them from the data dump and store them to a
-    # file.
+    # should be handled. This function identifies the version numbers and stores them to a file.
     def major_minor(self):
-        global data
-
-        # extract and remove major and minor version numbers from the data dump
-        minor_version = data[0] + data[1]
-        del data[0:2]
-        major_version = data[0] + data[1]
-        del data[0:2]
+        data = self.context.data
 
-        # convert the version numbers from hexadecimal to integer for evaluation
-        minor_version = int(minor_version, 16)
-        major_version = int(major_version, 16)
+        # extract the major and minor version numbers
+        minor_version = data.u2()
+        major_version = data.u2()
+        self.classfile.minor_version = minor_version
+        self.classfile.major_version = major_version
 
         # perform simple check on the version numbers and store the data
         if major_version > minor_version:                 # if major version is more than minor version
@@ -207,11 +316,9 @@ class disassembler:
     # This section identifes the number of constants in the constant pool
 
     def constant_pool_count(self):
-        global data
+        data = self.context.data
 
-        self.number_of_constants = data[0] + data[1]
-        self.number_of_constants = int(self.number_of_constants, 16)  # convert hexadecimal value to integer
-        del data[0:2]
+        self.number_of_constants = data.u2()
 
         if self.number_of_constants > 0:  # Verify that the Constant Pool Count is a valid integer
             if self.write:    # if write operations are specified, write the data
@@ -224,195 +331,90 @@ class disassembler:
     # Constant_Pool---------------------------------------------------------------------------------------------------------
 
     def constant_pool(self):
-        global data
-
-        # Reading the data from the constant pool is one of the larger operations involved in
-        # deconstructing the '.class' file. Like most of the other operations, it requires more
-        # specialized knowledge than can be explained within regular programming comments.
-        # Some of the processes in this section have extremely minimalized comments for this reason.
-
-        # the Constant_Pool_Tags are the readable tags associated with certain integer values
-        Constant_Pool_Tags = [[1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 15, 16, 17, 18, 19, 20],
-                              ["Constant_Utf8", "Constant_Integer", "Constant_Float", "Constant_Long",
-                               "Constant_Double", "Constant_Class", "Constant_String", "Constant_Fieldref",
-                               "Constant_Methodref", "Constant_InterfaceMethodref", "Constant_NameAndType",
-                               "Constant_MethodHandle", "Constant_MethodType", "CONSTANT_Dynamic", "Constant_InvokeDynamic",
-                               "CONSTANT_Module", "CONSTANT_Package"]]
-
-        Constant_Pool = [["reserved"]]  # first index of the constant pool is reserved by the JVM
-        Constant_Pool_index = 0  # initialize index count
-        number_of_constants = self.number_of_constants  # variable holding the number of constants for creating the loop counter
-
-        while number_of_constants != 1:  # loop iterates over the data for each constant in the constant pool
-            Constant_Type = data[0]  # the constant type is one byte of the data array
-            Constant_Type = int(Constant_Type, 16)  # convert the constant type to its integer equivalent
-            Constant_Pool_index = Constant_Pool_index + 1  # increment the constant pool index so that each iteration stores the data in a new index
-            for item in Constant_Pool_Tags[0]:  # the 'for' loop checks for the human readable tag associated with the constant type integer
-                if Constant_Type == item:
-                    Constant_Type = Constant_Pool_Tags[1][Constant_Pool_Tags[0].index(item)]
-
-            del data[0]  # clear the constant type from the data dump
-
-            temp_array = [Constant_Type]   # this array holds data that is then append to the constant pool during each iteration
-
-            # Each constant type needs to be handled differently
-            # the if structure below verifies the type of constant and performs the necessary operations for the type that it identifies
-            if Constant_Type == Constant_Pool_Tags[1][0]:     #Check for the Constant_Utf8
-                length = data[0] + data[1]
-                length = int(length, 16)
-                del data[0:2]   # clear the length value from the data dump
-                temp_array.append(length)
-                utf_data = ""
-                utf_string = data[0:length]
-                for text in utf_string:
-                    utf_data = utf_data + text
-                del data[0:length]
-
-                try:
-                    utf_data = bytearray.fromhex(utf_data).decode()
-                except:
-                    print("\tWARNING: bytecode contains special characters; data may be obfuscated")
-                temp_array.append(utf_data)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][1]:     #Check for Constant_Integer type
-                int_data = data[0] + data[1] + data[2] + data[3]
-                int_data = int(int_data, 16)
-                del data[0:4]  # remove int_data from the data dump
-                temp_array.append(int_data)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][2]:     #Check for Constant_Float type
-                float_data = data[0] + data[1] + data[2] + data[3]
-                float_data = float.fromhex(float_data)
-                del data[0:4]   # remove float_data from the data dump
-                temp_array.append(float_data)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][3]:     #Check for Constant_Long type
-                bytes = 8
-                long_data = ""
-                while bytes != 0:
-                    long_data = long_data + data[0]
-                    del data[0]
-                    bytes = bytes - 1
-                long_data = int(long_data, 16)
-                temp_array.append(long_data)
-                Constant_Pool.append(temp_array)
-                Constant_Pool.append("longspace")
-                number_of_constants = number_of_constants - 1   # the Constant_Long type accounts for two indexes into the constant pool
-            elif Constant_Type == Constant_Pool_Tags[1][4]:     #Check for Constant_Double type
-                bytes = 8
-                double_data = ""
-                while bytes != 0:
-                    double_data = double_data + data[0]
-                    del data[0]
-                    bytes = bytes - 1
-                double_data = float.fromhex(double_data)
-                temp_array.append(double_data)
-                Constant_Pool.append(temp_array)
-                Constant_Pool.append("doublespace")
-                number_of_constants = number_of_constants - 1    # the Constant_Double type accounts for two indexes into the constant pool
-            elif Constant_Type == Constant_Pool_Tags[1][5]:     #Check for the Constant_Class type
-                name_index = data[0] + data[1]
-                name_index = int(name_index, 16)
-                del data[0:2]  # clear the name index from the data dump
-                temp_array.append(name_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][6]:     #Check for the Constant_String
-                string_index = data[0] + data[1]
-                string_index = int(string_index, 16)
-                del data[0:2]  # clear the string_index from the data dump
-                temp_array.append(string_index)
-                Constant_Pool.append(temp_array)
-            elif (Constant_Type == Constant_Pool_Tags[1][7]) or (Constant_Type == Constant_Pool_Tags[1][8]) or \
-                    (Constant_Type == Constant_Pool_Tags[1][9]):     #Check for the Constant_Fieldref, Constant_Methodref and Constant_InterfaceMethodref
-                class_index = data[0] + data[1]
-                class_index = int(class_index, 16)
-                del data[0:2]   # clear the class_index from the data dump
-                name_and_type_index = data[0] + data[1]
-                name_and_type_index = int(name_and_type_index, 16)
-                del data[0:2]   # clear the name_and_type_index from the data dump
-                temp_array.append(class_index)
-                temp_array.append(name_and_type_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][10]:     #Check for the Constant_NameAndType type
-                name_index = data[0] + data[1]
-                name_index = int(name_index, 16)
-                del data[0:2]   # clear the name_index from the data dump
-                descriptor_index = data[0] + data[1]
-                descriptor_index = int(descriptor_index, 16)
-                del data[0:2]  # clear the descriptor_index from the data dump
-                temp_array.append(name_index)
-                temp_array.append(descriptor_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][11]:  # Check for the Constant_MethodHandle type
-                reference_kind = data[0]
-                reference_kind = int(reference_kind, 16)
-                del data[0]   # clear the reference_kind from the data dump
-                reference_index = data[0] + data[1]
-                reference_index = int(reference_index, 16)
-                del data[0:2]  # clear the reference_index from the data dump
-                temp_array.append(reference_kind)
-                temp_array.append(reference_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][12]:  # Check for the Constant_MethodType type
-                descriptor_index = data[0] + data[1]
-                descriptor_index = int(descriptor_index, 16)
-                del data[0:2]   # clear the descriptor_index from the data dump
-                temp_array.append(descriptor_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][13]:  # Check for the Constant_Dynamic type
-                bootstrap_method_attr_index = data[0] + data[1]
-                bootstrap_method_attr_index = int(bootstrap_method_attr_index, 16)
-                del data[0:2]  # clear the bootstrap_method_attr_index from the data dump
-                name_and_type_index = data[0] + data[1]
-                name_and_type_index = int(name_and_type_index, 16)
-                del data[0:2]  # clear the name_and_type_index from the data dump
-                temp_array.append(bootstrap_method_attr_index)
-                temp_array.append(name_and_type_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][14]:  # Check for the Constant_InvokeDynamic type
-                bootstrap_method_attr_index = data[0] + data[1]
-                bootstrap_method_attr_index = int(bootstrap_method_attr_index, 16)
-                del data[0:2]    # clear the bootstrap_method_attr_index from the data dump
-                name_and_type_index = data[0] + data[1]
-                name_and_type_index = int(name_and_type_index, 16)
-                del data[0:2]  # clear the name_and_type_index from the data dump
-                temp_array.append(bootstrap_method_attr_index)
-                temp_array.append(name_and_type_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][15]:  # Check for the Constant_Module type
-                name_index = data[0] + data[1]
-                name_index = int(name_index, 16)
-                del data[0:2]
-                temp_array.append(name_index)
-                Constant_Pool.append(temp_array)
-            elif Constant_Type == Constant_Pool_Tags[1][16]: # Check for the Constant_Package type
-                name_index = data[0] + data[1]
-                name_index = int(name_index, 16)
-                del data[0:2]
-                temp_array.append(name_index)
-                Constant_Pool.append(temp_array)
-            else:
-                print("ERROR: Unidentified Constant in the Constant Pool")
-                print(Constant_Type)
-                number_of_constants = 2
-            number_of_constants = number_of_constants - 1
-
-        self.constant_pool_data = Constant_Pool   # store the constant_pool array as a global object for use outside of this function
+        data = self.context.data
+
+        # The constant pool is read in a single pass straight from the buffer of the reader. Each entry is stored in
+        # the flat columns of a ConstantPool (see classfile.py): the tag byte, up to two u2 indexes and a u4 word.
+        # Utf8 strings are not decoded here; the pool keeps a copy of its own bytes and decodes a string the first
+        # time it is asked for. CONSTANT_SIZES gives the size of each entry after its tag byte (a Utf8 entry adds the
+        # length of its string to the 2 bytes of the length itself).
+
+        buffer = data.buffer
+        end = len(buffer)
+        count = self.number_of_constants
+        pool = ConstantPool(count)
+        tags = pool.tags
+        first = pool.first
+        second = pool.second
+        words = pool.words
+        # the offset and length of each constant are recorded in the OffsetMap, indexed like the pool
+        offsets = self.classfile.offsets
+        offsets.constant_offsets = constant_offsets = array("I", bytes(4 * count))
+        offsets.constant_lengths = constant_lengths = array("I", bytes(4 * count))
+
+        start = offset = data.offset
+        index = 1   # the first index of the constant pool is reserved by the JVM
+        while index < count:
+            if offset >= end:
+                raise EOFError("unexpected end of class file at byte " + str(offset))
+            tag = buffer[offset]
+            size = CONSTANT_SIZES.get(tag)
+            if size is None:
+                raise ValueError("ERROR: Unidentified Constant " + str(tag) + " in the Constant Pool at byte " +
+                                 str(offset))
+            if offset + 1 + size > end:
+                raise EOFError("unexpected end of class file at byte " + str(offset))
+            tags[index] = tag
+
+            if tag == 1:     # Constant_Utf8: length and the offset of the string within the pool
+                length = _u2.unpack_from(buffer, offset + 1)[0]
+                first[index] = length
+                words[index] = offset + 3 - start
+                size = size + length
+                if offset + 1 + size > end:
+                    raise EOFError("unexpected end of class file at byte " + str(offset))
+            elif size == 2:     # Constant_Class, Constant_String, Constant_MethodType, CONSTANT_Module, CONSTANT_Package
+                first[index] = _u2.unpack_from(buffer, offset + 1)[0]
+            elif tag == 15:     # Constant_MethodHandle: reference_kind and reference_index
+                first[index] = buffer[offset + 1]
+                second[index] = _u2.unpack_from(buffer, offset + 2)[0]
+            elif tag == 3 or tag == 4:     # Constant_Integer and Constant_Float are kept as their raw bits
+                words[index] = _u4.unpack_from(buffer, offset + 1)[0]
+            elif size == 4:     # the references, Constant_NameAndType, CONSTANT_Dynamic and Constant_InvokeDynamic
+                first[index], second[index] = _u2_u2.unpack_from(buffer, offset + 1)
+            else:     # Constant_Long and Constant_Double take up two indexes; each slot holds one word of the value
+                if index + 1 >= count:
+                    raise ValueError("ERROR: 8-byte constant in the last slot of the Constant Pool")
+                words[index], words[index + 1] = _u4_u4.unpack_from(buffer, offset + 1)
+                constant_offsets[index] = offset
+                constant_lengths[index] = 1 + size
+                offset = offset + 1 + size
+                index = index + 2
+                continue
+
+            constant_offsets[index] = offset
+            constant_lengths[index] = 1 + size
+            offset = offset + 1 + size
+            index = index + 1
+
+        data.offset = offset
+        pool.data = bytes(buffer[start:offset])   # owned by the pool, so it outlives the input buffer
+
+        self.constant_pool_data = pool   # store the constant pool as a global object for use outside of this function
+        self.context.constant_pool = pool
+        self.classfile.constant_pool = pool
 
-        if self.number_of_constants == len(Constant_Pool):
-            if self.write:   # if write operations are specified, write the data
-                const_pool_dir = self.classfile_dir + "/constant_pool"
-                if (path.exists(const_pool_dir)) == False:
-                    os.mkdir(const_pool_dir)
-                const_count = 0
-                for constant in Constant_Pool:
-                    store_const_pool = open((const_pool_dir + "/constant_" + str(const_count) + ".txt"), "w", encoding="utf-8")  #store constant pool data
-                    for item in constant:
-                        store_const_pool.write(str(item) + "\n")                     #this data is used by another python script
-                    store_const_pool.close()
-                    const_count = const_count + 1
-        else:
-            print("ERROR: All of the Constants have not been correctly identified")
+        if self.write:   # if write operations are specified, write the data
+            const_pool_dir = self.classfile_dir + "/constant_pool"
+            if (path.exists(const_pool_dir)) == False:
+                os.mkdir(const_pool_dir)
+            const_count = 0
+            for constant in pool:
+                store_const_pool = open((const_pool_dir + "/constant_" + str(const_count) + ".txt"), "w", encoding="utf-8", errors="surrogatepass")  #store constant pool data
+                for item in constant:
+                    store_const_pool.write(str(item) + "\n")                     #this data is used by another python script
+                store_const_pool.close()
+                const_count = const_count + 1
 
     # Access_Flags----------------------------------------------------------------------------------------------------------
     # This section contains the declaration for the type of access permitted to the highest level class within the bytecode.
@@ -422,10 +424,10 @@ class disassembler:
 
 
     def access_flags(self):
-        global data
+        data = self.context.data
 
-        access_flags = data[0] + data[1]
-        del data[0:2]
+        self.classfile.access_flags = data.u2()
+        access_flags = format(self.classfile.access_flags, "04x")
         zero = access_flags[0]
         first = access_flags[1]
         second = access_flags[2]
@@ -471,31 +473,30 @@ class disassembler:
     # The this_class represents the class that contains the main entry point for the program.
 
     def this_class(self):
-        global data
-
-        this_class = data[0] + data[1]  # this_class is two bytes of the data[] array
-        this_class = int(this_class, 16)  # convert this_class hex data to its integer equivalent
-        del data[0:2]  # clear the this_class data from the hex dump
-
-        # this section performs several checks to ensure that the this_class data is valid
-        if (this_class > 0) and (this_class < int(self.number_of_constants)):
-            if self.write:    # if write operations are specified, write the data
-                if self.constant_pool_data[this_class][0] == "Constant_Class":
-                    store_this_class = open((self.classfile_dir + "/this_class.txt"), "w")  # store this_class data
-                    store_this_class.write(self.constant_pool_data[this_class][0] + "\n" + str(self.constant_pool_data[this_class][1]))  # this data is used by another python script
-                    store_this_class.close()
-        else:
-            print("ERROR: the this_class value is incorrect")  # if the this_class data is invalid, the program exits here
+        data = self.context.data
+
+        this_class = data.u2()  # this_class is two bytes of data
+        self.classfile.this_class = this_class
+
+        # this section performs several checks to ensure that the this_class data is valid; a class without a name
+        # can not be used by anything downstream, so it fails here instead of being returned half-usable
+        if (this_class <= 0) or (this_class >= int(self.number_of_constants)):
+            raise ValueError("ERROR: the this_class value is incorrect")
+        if self.constant_pool_data.tags[this_class] != CONSTANT_CLASS:
+            raise ValueError("ERROR: this_class does not refer to a Constant_Class entry")
+        if self.write:    # if write operations are specified, write the data
+            store_this_class = open((self.classfile_dir + "/this_class.txt"), "w")  # store this_class data
+            store_this_class.write(self.constant_pool_data[this_class][0] + "\n" + str(self.constant_pool_data[this_class][1]))  # this data is used by another python script
+            store_this_class.close()
 
     # super_class-------------------------------------------------------------------------------------------------------
     # The super_class represents the direct super class in relation to the main entry point of the program.
 
     def super_class(self):
-        global data
+        data = self.context.data
 
-        super_class = data[0] + data[1]   # the super_class data is two bytes long
-        super_class = int(super_class, 16)  # convert the super_class data to its integer equivalent
-        del data[0:2]  # remove the super_class data from the hex-dump
+        super_class = data.u2()   # the super_class data is two bytes long
+        self.classfile.super_class = super_class
 
         # this section performs several checks to ensure that the super_class data is valid
         if (super_class >= 0) and (super_class < int(self.number_of_constants)):
@@ -513,11 +514,9 @@ class disassembler:
     # the interfaces_count is an integer value that gives the number of interfaces present within the '.class' file.
 
     def interfaces_count(self):
-        global data
+        data = self.context.data
 
-        self.i_count = data[0] + data[1]  # the interfaces_count is two bytes of data
-        self.i_count = int(self.i_count, 16)  # convert the interfaces_count to its integer equivalent
-        del data[0:2]  # clear the interfaces_count from the hex-dump
+        self.i_count = data.u2()  # the interfaces_count is two bytes of data
 
         if self.write:   # if write operations are specified, write the data
             store_interfaces_count = open((self.classfile_dir + "/interfaces_count.txt"), "w")  # store interfaces_count data
@@ -529,15 +528,13 @@ class disassembler:
     # '.class' file. ('.class' files may contain zero or more interfaces.)
 
     def interfaces(self):
-        global data
+        data = self.context.data
 
         interfaces = []  # empty array for storing interface indexes into the constant pool
         i_check = True   # variable used to evaluate the integrity of the indexes associated with interfaces
         interfaces_count = self.i_count  # inherit the interfaces count from the previous function
         while interfaces_count != 0:
-            interface = data[0] + data[1]    # read the interface index
-            interface = int(interface, 16)             # convert the index to integer
-            del data[0:2]                         # remove the processed data from the data dump
+            interface = data.u2()    # read the interface index
             interfaces.append(interface)               # store data to array so that it can be written to a file
             if self.constant_pool_data[interface][0] == "Constant_Class":   # ensure that the index is valid
                 interfaces_count = interfaces_count - 1                     # decrement the loop counter
@@ -546,6 +543,7 @@ class disassembler:
                 i_check = False  # if the interface is invalid the loop will exit and the function will not continue
                 print("ERROR: Interfaces do not match constant pool data")  # Error statement for debugging
 
+        self.classfile.interfaces = interfaces
         if i_check:   # if the interfaces are valid, the data is written to a text file
             if self.write:   # if write operations are specified, write the data
                 store_interfaces = open((self.classfile_dir + "/interfaces.txt"), "w")  # store interfaces data
@@ -560,12 +558,10 @@ class disassembler:
     # the fields_count is an integer value that gives the number of fields that are described within the '.class' file.
 
     def fields_count(self):
-        global data
+        data = self.context.data
 
         # f_count is initialized as an object because it is used in the next section
-        self.f_count = data[0] + data[1]  # fields_count is two bytes of data
-        self.f_count = int(self.f_count, 16)  # convert fields_count to its integer equivalent
-        del data[0:2]  # remove fields_count data from the hex-dump
+        self.f_count = data.u2()  # fields_count is two bytes of data
 
         if self.write:  # if write operations are specified, write the data
             store_fields_count = open((self.classfile_dir + "/fields_count.txt"), "w")  # store fields_count data
@@ -577,90 +573,54 @@ class disassembler:
     # This section describes the method that is used to extract the data associated with fields within the '.class' file.
 
     def fields(self):
-        global data
+        data = self.context.data
 
         # the fields_count is localized to this method in its own variable - f_count
         f_count = self.f_count
         # main loop of the fields method
         while f_count != 0:
+            field_offset = data.offset
             # access_flags
-            flag_data = data[0] + data[1]
-            f_access_flags = []
-            zero = flag_data[0]    # define first half-byte of Access Flag data
-            first = flag_data[1]   # define second half-byte of Access Flag data
-            second = flag_data[2]  # define third half-byte of Access Flag data
-            third = flag_data[3]   # define fourth half-byte of Access Flag data
-
-            if zero == "0":  # check for access flags in the first half-byte
-                zero = None
-            elif zero == "1":
-                f_access_flags.append("ACC_SYNTHETIC")
-            elif zero == "4":
-                f_access_flags.append("ACC_ENUM")
-
-            if first != "0":  # this byte of data is always equal to zero with the fields structure
-                print("ERROR: Check field access flags")
-
-            if second == "0":  # check for access flags in the third half-byte
-                second = None
-            elif second == "1":
-                f_access_flags.append("ACC_FINAL")
-            elif second == "4":
-                f_access_flags.append("ACC_VOLATILE")
-            elif second == "8":
-                f_access_flags.append("ACC_TRANSIENT")
-
-            if third == "0":  # check for access flags in the fourth half-byte
-                third = None
-            elif third == "1":
-                f_access_flags.append("ACC_PUBLIC")
-            elif third == "2":
-                f_access_flags.append("ACC_PRIVATE")
-            elif third == "4":
-                f_access_flags.append("ACC_PROTECTED")
-            elif third == "8":
-                f_access_flags.append("ACC_STATIC")
-
-            if len(f_access_flags) == 0:
-                f_access_flags.append("No_Access_Flags")
-
-            del data[0:2]
+            f_flags = data.u2()   # decoded into names by FieldInfo.flag_names
 
             # name index
-            f_name_index = data[0] + data[1]
-            f_name_index = int(f_name_index, 16)
-            del data[0:2]
+            f_name_index = data.u2()
 
             # descriptor index
-            f_descriptor_index = data[0] + data[1]
-            f_descriptor_index = int(f_descriptor_index, 16)
-            del data[0:2]
+            f_descriptor_index = data.u2()
 
             # attribute count
-            f_attribute_count = data[0] + data[1]
-            f_attribute_count = int(f_attribute_count, 16)
-            del data[0:2]
+            f_attribute_count = data.u2()
+
+            constant_pool = self.classfile.constant_pool
+            field = FieldInfo(f_flags, f_name_index, f_descriptor_index, constant_pool.utf8(f_name_index),
+                              constant_pool.utf8(f_descriptor_index))
+            self.classfile.fields.append(field)
 
             while f_attribute_count != 0:   # main loop for processing attributes
 
                 # To minimize redundancies, the attribute_info structure is treated as a seperate object that can
                 # be called at will to disassemble the attributes for any given section of the bytecode.
 
-                attribute_info(self.constant_pool_data, self.classfile_dir, self.verbose, self.write)
+                attribute_offset = data.offset
+                attribute = attribute_info(self.context, self.classfile_dir)
+                if attribute.attribute is not None:
+                    field.attributes.append(attribute.attribute)
+                field.attribute_offsets.append((attribute_offset, data.offset - attribute_offset))
 
                 f_attribute_count = f_attribute_count - 1
 
+            self.classfile.offsets.fields.append((field_offset, data.offset - field_offset))
+
             # decrement the main loop counter (i.e. the field count)
             f_count = f_count - 1
 
 
     def methods_count(self):
-        global data
+        data = self.context.data
 
         # m_count is initialized as an object because it is used in the next section
-        self.m_count = data[0] + data[1]  # methods_count is two bytes of data
-        self.m_count = int(self.m_count, 16)  # convert methods_count to its integer equivalent
-        del data[0:2]  # remove methods_count data from the hex-dump
+        self.m_count = data.u2()  # methods_count is two bytes of data
 
         if self.write:   # if write operations are specified, write the data
             store_methods_count = open((self.classfile_dir + "/methods_count.txt"), "w")  # store methods_count data
@@ -668,93 +628,63 @@ class disassembler:
             store_methods_count.close()
 
     def methods(self):
-        global data
+        data = self.context.data
 
         # the methods_count is localized to this method in its own variable - m_count
         m_count = self.m_count
 
+        # In lazy mode the Code attributes are only located here; lazy_decoder parses them on first access.
+        decoder = lazy_decoder(self.context) if self.lazy else None
+        collector = self.context.collector
+
         # main loop for processing each method
         while m_count != 0:
+            method_offset = data.offset
             # access_flags
-            flag_data = data[0] + data[1]
-            m_access_flags = []
-            zero = flag_data[0]  # define first half-byte of Access Flag data
-            first = flag_data[1]  # define second half-byte of Access Flag data
-            second = flag_data[2]  # define third half-byte of Access Flag data
-            third = flag_data[3]  # define fourth half-byte of Access Flag data
-
-            if zero == "0":  # check for access flags in the first half-byte
-                zero = None
-            elif zero == "1":
-                m_access_flags.append("ACC_SYNTHETIC")
-
-            if first == "0":  # check for access flags in the third half-byte
-                first = None
-            elif first == "1":
-                m_access_flags.append("ACC_NATIVE")
-            elif first == "4":
-                m_access_flags.append("ACC_ABSTRACT")
-            elif first == "8":
-                m_access_flags.append("ACC_STRICT")
-
-            if second == "0":  # check for access flags in the third half-byte
-                second = None
-            elif second == "1":
-                m_access_flags.append("ACC_FINAL")
-            elif second == "2":
-                m_access_flags.append("ACC_SYNCHRONIZED")
-            elif second == "4":
-                m_access_flags.append("ACC_BRIDGE")
-            elif second == "8":
-                m_access_flags.append("ACC_VARARGS")
-
-            if third == "0":  # check for access flags in the fourth half-byte
-                third = None
-            elif third == "1":
-                m_access_flags.append("ACC_PUBLIC")
-            elif third == "2":
-                m_access_flags.append("ACC_PRIVATE")
-            elif third == "4":
-                m_access_flags.append("ACC_PROTECTED")
-            elif third == "8":
-                m_access_flags.append("ACC_STATIC")
-
-            if len(m_access_flags) == 0:
-                m_access_flags.append("No_Access_Flags")
-
-            del data[0:2]
+            m_flags = data.u2()   # decoded into names by MethodInfo.flag_names
 
             # name index
-            m_name_index = data[0] + data[1]
-            m_name_index = int(m_name_index, 16)
-            del data[0:2]
+            m_name_index = data.u2()
 
             # descriptor index
-            m_descriptor_index = data[0] + data[1]
-            m_descriptor_index = int(m_descriptor_index, 16)
-            del data[0:2]
+            m_descriptor_index = data.u2()
 
             # attribute count
-            m_attribute_count = data[0] + data[1]
-            m_attribute_count = int(m_attribute_count, 16)
-            del data[0:2]
+            m_attribute_count = data.u2()
+
+            constant_pool = self.classfile.constant_pool
+            method = MethodInfo(m_flags, m_name_index, m_descriptor_index, constant_pool.utf8(m_name_index),
+                                constant_pool.utf8(m_descriptor_index))
+            self.classfile.methods.append(method)
 
+            attributes = method.attributes
             while m_attribute_count != 0:
 
-                attribute_info(self.constant_pool_data, self.classfile_dir, self.verbose, self.write)
+                attribute_offset = data.offset
+                if decoder is not None and decoder.deferred(attribute_offset):
+                    data.skip(2)
+                    attribute_length = data.u4()
+                    data.skip(attribute_length)
+                    method.defer(LazyAttribute("Code", attribute_offset, attribute_length + 6, decoder))
+                    if collector is not None:
+                        collector.attribute("Code", attribute_length)
+                else:
+                    attribute = attribute_info(self.context, self.classfile_dir)
+                    if attribute.attribute is not None:
+                        attributes.append(attribute.attribute)
+                method.attribute_offsets.append((attribute_offset, data.offset - attribute_offset))
 
                 m_attribute_count = m_attribute_count - 1
 
+            self.classfile.offsets.methods.append((method_offset, data.offset - method_offset))
 
             m_count = m_count - 1   # decrement main loop counter
 
     def attributes_count(self):
-        global data
+        data = self.context.data
 
         # a_count is initialized as an object because it is used in the next section
-        self.a_count = data[0] + data[1]  # attributes_count is two bytes of data
-        self.a_count = int(self.a_count, 16)  # convert attributes_count to its integer equivalent
-        del data[0:2]  # remove attributes_count data from the hex-dump
+        self.a_count = data.u2()  # attributes_count is two bytes of data
 
         if self.write:   # if write operations are specified, write the data
             store_attributes_count = open((self.classfile_dir + "/attributes_count.txt"), "w")  # store attributes_count data
@@ -762,20 +692,79 @@ class disassembler:
             store_attributes_count.close()
 
     def attributes(self):
-        global data
+        data = self.context.data
 
         a_count = self.a_count
         while a_count != 0:
 
-            attribute_info(self.constant_pool_data, self.classfile_dir, self.verbose, self.write)
+            attribute_offset = data.offset
+            attribute = attribute_info(self.context, self.classfile_dir)
+            if attribute.attribute is not None:
+                self.classfile.attributes.append(attribute.attribute)
+            self.classfile.offsets.attributes.append((attribute_offset, data.offset - attribute_offset))
 
             a_count = a_count - 1
 
-        if len(data) == 0:
-            print("Complete")
+        if data.remaining() == 0:
+            if self.verbose:
+                print("Complete")
         else:
             print("Error: Remnant Data")
 
+# disassemble-----------------------------------------------------------------------------------------------------------
+# Convenience entry point for in-process use. The '.class' file is disassembled without writing anything to the
+# 'deconst_class' directory and the resulting ClassFile object is returned (None if the disassembly failed).
+
+def disassemble(pathway, verbose=False, fail_check=False, write=False, scan="full", attributes=None, collector=None,
+                lazy=False):
+    return disassembler(pathway, verbose=verbose, fail_check=fail_check, write=write, scan=scan,
+                        attributes=attributes, collector=collector, lazy=lazy).classfile
+
+
+# disassemble_bytes() parses a class that is already held in memory (bytes, bytearray or memoryview). The name is only
+# used to label the resulting ClassFile; nothing is read from or written to the filesystem.
+def disassemble_bytes(source, name=None, verbose=False, scan="full", attributes=None, collector=None, lazy=False):
+    if name is None:
+        name = "<memory>"
+    return disassembler(name, verbose=verbose, fail_check=False, write=False, source=source, scan=scan,
+                        attributes=attributes, collector=collector, lazy=lazy).classfile
+
+
+# lazy_decoder----------------------------------------------------------------------------------------------------------
+# Decodes the Code attributes that methods() deferred in lazy mode. The decoder keeps the parse context of the class,
+# so the class bytes and the constant pool stay alive for as long as a method has a Code attribute left to decode. Every
+# call reads through a reader and context of its own, so the methods can be decoded in any order and from any thread.
+# Lazily decoded attributes are not reported to the instrumentation collector.
+
+class lazy_decoder:
+
+    __slots__ = ("context",)
+
+    def __init__(self, context):
+        self.context = context
+
+    # deferred() tells whether the attribute_info structure at the offset is a Code attribute handled by the built-in
+    # parser; the reader is left where it was
+    def deferred(self, offset):
+        context = self.context
+        data = context.data
+        attribute_name_index = data.u2()
+        data.offset = offset
+        dispatch = context.attribute_dispatch.get(attribute_name_index)
+        if dispatch is None:
+            dispatch = resolve_attribute(context.constant_pool, attribute_name_index, context.allowed)
+            context.attribute_dispatch[attribute_name_index] = dispatch
+        return dispatch[0] == "Code" and dispatch[1] == "builtin"
+
+    def __call__(self, offset):
+        parsed = self.context
+        context = parse_context(parsed.pathway, False, False, parsed.allowed, False)
+        context.data = class_reader(parsed.data.buffer, offset)
+        context.constant_pool = parsed.constant_pool
+        context.attribute_dispatch = parsed.attribute_dispatch
+        context.unknown_attributes = parsed.unknown_attributes
+        return attribute_info(context, None).attribute
+
 # attribute_info--------------------------------------------------------------------------------------------------------
 # The attribute_info structures within the java bytecode are integrated into multiple sections, and essentially it
 # is the first point at which the abstract nature and redundancy within the bytecode becomes recognizable. To avoid
@@ -787,298 +776,177 @@ class attribute_info:
     # Certain attributes such as the "Deprecated" Attribute are represented solely by the attribute_name_index and
     # attribute_length. As such, they are not explicitly described by any method within this class.
 
-    def __init__(self, constant_pool, storage, verbose, write):
-        global data
-        global glob_path
+    def __init__(self, context, storage):
+        self.context = context   # parse_context of the class being disassembled
+        data = context.data
+        constant_pool = context.constant_pool
+        verbose = context.verbose
 
-        # The following variables are made globally accessible within the class because of the fact that certain
-        # attributes can contain nested attribute_info structures within themseleves. In those cases, the superclass
-        # creates an instance of itself that is initialized with the data that was originally passed to it.
+        # The following variables are made accessible within the class because of the fact that certain attributes
+        # can contain nested attribute_info structures within themseleves. In those cases, the superclass creates an
+        # instance of itself that is initialized with the context that was originally passed to it.
         self.storage = storage   # this variable holds the pathway that is used to write the attribute data to text files
         self.constant_pool = constant_pool
 
-        self.write = write
+        self.write = context.write
         self.verbose = verbose
 
         # the attribute name index gives the index into the constant pool that describes the type of attribute that follows
 
-        attribute_name_index = data[0] + data[1]
-        attribute_name_index = int(attribute_name_index, 16)
-        del data[0:2]
+        attribute_name_index = data.u2()
+
+        attribute_length = data.u4()  # length of the attribute in bytes (excluding the name_index and the length itself)
+
+        # The handler for each attribute_name_index is looked up once per class and cached in attribute_dispatch, so
+        # every further attribute with the same name costs a single dict lookup (see resolve_attribute below).
+        dispatch = context.attribute_dispatch.get(attribute_name_index)
+        if dispatch is None:
+            dispatch = resolve_attribute(constant_pool, attribute_name_index, context.allowed)
+            context.attribute_dispatch[attribute_name_index] = dispatch
+        attribute_type, kind, handler = dispatch
+        self.attribute_type = attribute_type
+        if context.collector is not None:
+            context.collector.attribute(attribute_type, attribute_length)
 
-        attribute_length = data[0] + data[1] + data[2] + data[3]  # length of the attribute in bytes (excluding the name_index and the length itself)
-        attribute_length = int(attribute_length, 16)
-        del data[0:4]
+        # Attributes missing from the allow-list are jumped over in one step using their length; self.attribute is left
+        # as None so that the caller does not record them. Attributes nested inside a skipped attribute (e.g. the
+        # LineNumberTable of a skipped Code attribute) are skipped with it.
+        if kind == "skip":
+            data.skip(attribute_length)
+            self.attribute = None
+            return
 
-        attribute_type = constant_pool[attribute_name_index][2]  # get the attribute type from the constant pool
+        if verbose:
+            print("\t" + str(constant_pool[attribute_name_index]))
 
         # The processing of the attribute info structures are self-contained to prevent cascading errors within the
-        # disassembler.
-        if attribute_type == "Signature":  # if the attribute type is "Signature" the associated method is called
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_signature(storage)
-        elif attribute_type == "Deprecated":  # if the attribute type is "Deprecated" the attrib_length is checked
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            if attribute_length != 0:
-                print("ERROR: Attribute - Deprecated - length is greater than 0 bytes")
-        elif attribute_type == "ConstantValue":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_constantvalue(storage)
-        elif (attribute_type == "RuntimeVisibleAnnotations") or (attribute_type == "RuntimeInvisibleAnnotations"):
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            runtime_visible_annotations = attribute_info.annotations()
-            runtime_visible_annotations.attribute_runtimevisibleannotations()
-        elif (attribute_type == "RuntimeVisibleParameterAnnotations") or (attribute_type == "RuntimeInvisibleParameterAnnotations"):
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            RVPA = attribute_info.annotations()
-            RVPA.attribute_runtimeparameterannotations()
-        elif (attribute_type == "RuntimeVisibleTypeAnnotations") or (attribute_type == "RuntimeInvisibleTypeAnnotations"):
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            RVTA = attribute_info.annotations()
-            RVTA.attribute_runtimetypeannotations()
-        elif attribute_type == "AnnotationDefault":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            AD = attribute_info.annotations()
-            AD.attribute_annotationdefault()
-        elif attribute_type == "SourceFile":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_sourcefile(storage)
-        elif attribute_type == "Exceptions":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_exceptions(storage)
-        elif attribute_type == "InnerClasses":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_innerclasses(storage)
-        elif attribute_type == "BootstrapMethods":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_bootstrapmethods(storage)
-        elif attribute_type == "Code":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_code(storage)
-        elif attribute_type == "LineNumberTable":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_linenumbertable(storage)
-        elif attribute_type == "LocalVariableTable":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_localvariabletable(storage)
-        elif attribute_type == "LocalVariableTypeTable":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_localvariabletypetable(storage)
-        elif attribute_type == "StackMapTable":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            attribute_info.attribute_stackmaptable(storage, write)
-        elif attribute_type == "EnclosingMethod":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_enclosingmethod(storage)
-        elif attribute_type == "Synthetic":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-        elif attribute_type == "SourceDebugExtension":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_sourcedebugextension(attribute_length, storage)
-        elif attribute_type == "MethodParameters":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_methodparameters(storage)
-        elif attribute_type == "Module":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_module(storage)
-        elif attribute_type == "ModulePackages":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_modulepackages(storage)
-        elif attribute_type == "ModuleMainClass":
-            MMC = open("module_main_class.txt", 'a')
-            MMC.write(glob_path + "\n")
-            MMC.close()
-            del data[0:attribute_length]
-        elif attribute_type == "NestHost":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_nesthost(storage)
-        elif attribute_type == "NestMembers":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_nestmembers(storage)
-        elif attribute_type == "Record":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_record(storage)
-        elif attribute_type == "PermittedSubclasses":
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
-            self.attribute_permittedsubclasses(storage)
+        # disassembler. self.attribute holds the object model of the attribute (see classfile.py) once it has been
+        # processed.
+        if kind == "builtin":
+            self.attribute = handler(self, attribute_length)
+        elif kind == "registered":
+            # registered handlers receive the raw attribute bytes and the constant pool
+            self.attribute = handler(attribute_type, data.read(attribute_length), constant_pool)
+            if self.attribute is None:
+                self.attribute = Attribute(attribute_type)
         else:
-            del data[0:attribute_length]
-            UiD = open("UnidentifiedAttribute.txt", 'a')
-            UiD.write(glob_path + "\n")
-            UiD.close()
-            if verbose:
-                print("\t" + str(constant_pool[attribute_name_index]))
+            # unknown attributes are kept as raw bytes and counted per class
+            self.attribute = UnknownAttribute(attribute_type, bytes(data.read(attribute_length)))
+            unknown_attributes = context.unknown_attributes
+            unknown_attributes[attribute_type] = unknown_attributes.get(attribute_type, 0) + 1
 
     def attribute_signature(self, pathway):
-        global data
+        data = self.context.data
         # The signature is a fixed length attribute. It occupies a total of two bytes.
 
-        signature_index = data[0] + data[1]
-        signature_index = int(signature_index, 16)
-        del data[0:2]
+        signature_index = data.u2()
 
         if self.write:
             write_signature = open((pathway + "/signatures.txt"), 'a')
             write_signature.write(str(signature_index) + "\n")
             write_signature.close()
 
+        return SignatureAttribute(self.attribute_type, signature_index)
+
     def attribute_constantvalue(self, pathway):
-        global data
+        data = self.context.data
         # The constant_value attribute is of fixed length. It occupies a total of two bytes
 
-        constant_value_index = data[0] + data[1]
-        constant_value_index = int(constant_value_index, 16)
-        del data[0:2]
+        constant_value_index = data.u2()
 
         if self.write:
             write_constant = open((pathway + "/constant_values.txt"), 'a')
             write_constant.write(str(constant_value_index) + "\n")
             write_constant.close()
 
+        return ConstantValueAttribute(self.attribute_type, constant_value_index)
+
 
     def attribute_sourcefile(self, pathway):
-        global data
+        data = self.context.data
         # The sourcefile attribute is an optional fixed-length attribute. It contains the index to a string representing
         # the name of the sourcefile.
 
-        sourcefile_index = data[0] + data[1]
-        sourcefile_index = int(sourcefile_index, 16)
-        del data[0:2]
+        sourcefile_index = data.u2()
 
         if self.write:
             write_sfileindex = open((pathway + "/sourcefile_index.txt"), 'a')
             write_sfileindex.write(str(sourcefile_index) + "\n")
             write_sfileindex.close()
 
-    def attribute_exceptions(self, pathway):
-        global data
-
-        number_of_exceptions = data[0] + data[1]
-        number_of_exceptions = int(number_of_exceptions, 16)
-        del data[0:2]
+        return SourceFileAttribute(self.attribute_type, sourcefile_index)
 
-        exceptions = [number_of_exceptions]
-
-        while number_of_exceptions != 0:
-            exception = data[0] + data[1]
-            exception = int(exception, 16)
-            del data[0:2]
+    def attribute_exceptions(self, pathway):
+        data = self.context.data
 
-            exceptions.append(exception)
+        number_of_exceptions = data.u2()
 
-            number_of_exceptions = number_of_exceptions - 1
+        exceptions = data.u2_array(number_of_exceptions).tolist()   # the exception_index_table in one pass
 
         # write operations for attribute_exceptions
         if self.write:
             write_except = open(pathway + "/exceptions.txt", 'a')
+            write_except.write(str(number_of_exceptions) + "\n")
             for item in exceptions:
                 write_except.write(str(item) + "\n")
             write_except.close()
 
+        return ExceptionsAttribute(self.attribute_type, exceptions)
+
 
     def attribute_innerclasses(self, pathway):
-        global data
+        data = self.context.data
 
         # The inner classes attribute - as the name suggests - only exists when there are inner classes. The following
         # information gives the necessary indexes for the JVM to access each inner class.
 
         # Note: This method may require additional testing
 
-        number_of_classes = data[0] + data[1]
-        number_of_classes = int(number_of_classes, 16)
-        del data[0:2]
-        inner_classes = [str(number_of_classes), "\n"]
+        number_of_classes = data.u2()
 
-        class_count = 1
-        while number_of_classes != 0:
-            inner_class_info_index = data[0] + data[1]
-            inner_class_info_index = int(inner_class_info_index, 16)
-            del data[0:2]
-            inner_classes.append(str(inner_class_info_index) + ",")
-
-            outer_class_info_index = data[0] + data[1]
-            outer_class_info_index = int(outer_class_info_index, 16)
-            del data[0:2]
-            inner_classes.append(str(outer_class_info_index) + ",")
-
-            inner_name_index = data[0] + data[1]
-            inner_name_index = int(inner_name_index, 16)
-            del data[0:2]
-            inner_classes.append(str(inner_name_index) + ",")
-
-            inner_class_access_flags = data[0] + data[1]
-            del data[0:2]
-            inner_classes.append(inner_class_access_flags)
-            inner_classes.append("\n")
-
-            class_count = class_count + 1
-            number_of_classes = number_of_classes - 1
+        # (inner_class_info_index, outer_class_info_index, inner_name_index, inner_class_access_flags)
+        classes = data.table(_u2_u2_u2_u2, number_of_classes)
 
         if self.write:
             write_ic = open(pathway + "/inner_classes.txt", 'w')
-            for item in inner_classes:
-                write_ic.write(item)
+            write_ic.write(str(number_of_classes) + "\n")
+            for inner_class_info_index, outer_class_info_index, inner_name_index, inner_class_flags in classes:
+                write_ic.write(str(inner_class_info_index) + "," + str(outer_class_info_index) + "," +
+                               str(inner_name_index) + "," + format(inner_class_flags, "04x") + "\n")
             write_ic.close()
 
+        return InnerClassesAttribute(self.attribute_type, classes)
+
 
     def attribute_bootstrapmethods(self, pathway):
-        global data
+        data = self.context.data
 
         # There is never more than one bootstrapmethods attribute in the attributes table of any given class file. The
         # following method has been tested and should run correctly in every operation.
 
-        num_bootstrap_methods = data[0] + data[1]
-        num_bootstrap_methods = int(num_bootstrap_methods, 16)
-        del data[0:2]
+        num_bootstrap_methods = data.u2()
 
         bootstrap_methods = [num_bootstrap_methods]
+        methods = []   # (bootstrap_method_ref, bootstrap_arguments)
 
         method_count = 1
         while num_bootstrap_methods != 0:
-            bootstrap_method_ref = data[0] + data[1]
-            bootstrap_method_ref = int(bootstrap_method_ref, 16)
-            del data[0:2]
+            bootstrap_method_ref = data.u2()
             bootstrap_methods.append(bootstrap_method_ref)
 
-            num_bootstrap_arguments = data[0] + data[1]
-            num_bootstrap_arguments = int(num_bootstrap_arguments, 16)
-            del data[0:2]
+            num_bootstrap_arguments = data.u2()
             bootstrap_methods.append(num_bootstrap_arguments)
 
+            bootstrap_arguments = []
             while num_bootstrap_arguments != 0:
-                bootstrap_argument = data[0] + data[1]
-                bootstrap_argument = int(bootstrap_argument, 16)
-                del data[0:2]
+                bootstrap_argument = data.u2()
                 bootstrap_methods.append(bootstrap_argument)
+                bootstrap_arguments.append(bootstrap_argument)
 
                 num_bootstrap_arguments = num_bootstrap_arguments - 1
 
+            methods.append((bootstrap_method_ref, tuple(bootstrap_arguments)))
+
             method_count = method_count + 1
             num_bootstrap_methods = num_bootstrap_methods - 1
 
@@ -1089,16 +957,14 @@ class attribute_info:
                 write_bsp.write(str(item) + "\n")
             write_bsp.close()
 
+        return BootstrapMethodsAttribute(self.attribute_type, methods)
+
     def attribute_enclosingmethod(self, pathway):
-        global data
+        data = self.context.data
 
-        class_index = data[0] + data[1]
-        class_index = int(class_index, 16)
-        del data[0:2]
+        class_index = data.u2()
 
-        method_index = data[0] + data[1]
-        method_index = int(method_index, 16)
-        del data[0:2]
+        method_index = data.u2()
 
         if self.write:
             write_em = open(pathway + "/enclosing_method.txt", 'w')
@@ -1106,53 +972,45 @@ class attribute_info:
             write_em.write(str(method_index))
             write_em.close()
 
+        return EnclosingMethodAttribute(self.attribute_type, class_index, method_index)
+
     def attribute_nesthost(self, pathway):
-        global data
+        data = self.context.data
 
-        host_class_index = data[0] + data[1]
-        host_class_index = int(host_class_index, 16)
-        del data[0:2]
+        host_class_index = data.u2()
 
         if self.write:
             write_hci = open(pathway + "/nest_host.txt", 'w')
             write_hci.write(str(host_class_index))
             write_hci.close()
 
+        return NestHostAttribute(self.attribute_type, host_class_index)
+
     def attribute_nestmembers(self, pathway):
-        global data
+        data = self.context.data
 
-        number_of_classes = data[0] + data[1]
-        number_of_classes = int(number_of_classes, 16)
-        del data[0:2]
+        number_of_classes = data.u2()
 
-        nest_members = [number_of_classes]
-
-        while number_of_classes != 0:
-            classes = data[0] + data[1]
-            classes = int(classes, 16)
-            del data[0:2]
-            nest_members.append(classes)
-            number_of_classes = number_of_classes - 1
+        nest_members = data.u2_array(number_of_classes).tolist()
 
         # write operations for attribute_nestmembers
         if self.write:
             write_nm = open(pathway + "/nest_members.txt", 'w')
+            write_nm.write(str(number_of_classes) + "\n")
             for item in nest_members:
                 write_nm.write(str(item) + "\n")
             write_nm.close()
 
+        return ClassListAttribute(self.attribute_type, nest_members)
+
     def attribute_permittedsubclasses(self, pathway):
-        global data
+        data = self.context.data
 
-        number_of_classes = data[0] + data[1]
-        number_of_classes = int(number_of_classes, 16)
-        del data[0:2]
+        number_of_classes = data.u2()
         permitted_subclasses = [number_of_classes]
 
         while number_of_classes != 0:
-            classes = data[0] + data[1]
-            classes = int(classes, 16)
-            del data[0:2]
+            classes = data.u2()
             permitted_subclasses.append(classes)
 
             number_of_classes = number_of_classes - 1
@@ -1163,34 +1021,33 @@ class attribute_info:
                 write_ps.write(str(item) + "\n")
             write_ps.close()
 
+        return ClassListAttribute(self.attribute_type, permitted_subclasses[1:])
+
 
     def attribute_record(self, pathway):
-        global data
+        data = self.context.data
 
-        components_count = data[0] + data[1]
-        components_count = int(components_count, 16)
-        del data[0:2]
+        components_count = data.u2()
         record = [components_count]
+        components = []
 
         while components_count != 0:
-            name_index = data[0] + data[1]
-            name_index = int(name_index, 16)
-            del data[0:2]
+            name_index = data.u2()
             record.append(name_index)
 
-            descriptor_index = data[0] + data[1]
-            descriptor_index = int(descriptor_index, 16)
-            del data[0:2]
+            descriptor_index = data.u2()
             record.append(descriptor_index)
 
-            attributes_count = data[0] + data[1]
-            attributes_count = int(attributes_count, 16)
-            del data[0:2]
+            attributes_count = data.u2()
             record.append(attributes_count)
 
+            component = RecordComponent(name_index, descriptor_index, [])
             while attributes_count != 0:
-                attribute_info(self.constant_pool, pathway, self.verbose, self.write)
+                attribute = attribute_info(self.context, pathway)
+                if attribute.attribute is not None:
+                    component.attributes.append(attribute.attribute)
                 attributes_count = attributes_count - 1
+            components.append(component)
 
             components_count = components_count - 1
 
@@ -1200,24 +1057,24 @@ class attribute_info:
                 write_record.write(str(item) + "\n")
             write_record.close()
 
+        return RecordAttribute(self.attribute_type, components)
+
 
     def attribute_methodparameters(self, pathway):
-        global data
+        data = self.context.data
 
-        parameters_count = data[0]
-        parameters_count = int(parameters_count, 16)
-        del data[0]
+        parameters_count = data.u1()
         methodparameters = [parameters_count]
+        parameters = []   # (name_index, access_flags)
 
         while parameters_count != 0:
-            name_index = data[0] + data[1]
-            name_index = int(name_index, 16)
-            del data[0:2]
+            name_index = data.u2()
             methodparameters.append(name_index)
 
-            access_flags = data[0] + data[1]
-            del data[0:2]
+            parameter_flags = data.u2()
+            access_flags = format(parameter_flags, "04x")
             methodparameters.append(access_flags)
+            parameters.append((name_index, parameter_flags))
 
             parameters_count = parameters_count - 1
 
@@ -1227,18 +1084,16 @@ class attribute_info:
                 write_mp.write(str(item) + "\n")
             write_mp.close()
 
+        return MethodParametersAttribute(self.attribute_type, parameters)
+
     def attribute_modulepackages(self, pathway):
-        global data
+        data = self.context.data
 
-        package_count = data[0] + data[1]
-        package_count = int(package_count, 16)
-        del data[0:2]
+        package_count = data.u2()
         modulepackages= [package_count]
 
         while package_count != 0:
-            package_index = data[0] + data[1]
-            package_index = int(package_index, 16)
-            del data[0:2]
+            package_index = data.u2()
             modulepackages.append(package_index)
 
             package_count = package_count - 1
@@ -1249,142 +1104,122 @@ class attribute_info:
                 write_mp.write(str(item) + "\n")
             write_mp.close()
 
+        return ModulePackagesAttribute(self.attribute_type, modulepackages[1:])
+
 
     def attribute_module(self, pathway):
-        global data
+        data = self.context.data
 
-        module_name_index = data[0] + data[1]
-        module_name_index = int(module_name_index, 16)
-        del data[0:2]
+        module_name_index = data.u2()
         module = [module_name_index]
 
-        module_flags = data[0] + data[1]
-        del data[0:2]
+        module_flag_bits = data.u2()
+        module_flags = format(module_flag_bits, "04x")
         module.append(module_flags)
 
-        module_version_index = data[0] + data[1]
-        module_version_index = int(module_version_index, 16)
-        del data[0:2]
+        module_version_index = data.u2()
         module.append(module_version_index)
 
-        requires_count = data[0] + data[1]
-        requires_count = int(requires_count, 16)
-        del data[0:2]
+        requires_count = data.u2()
         module.append(requires_count)
+        requires = []
 
         while requires_count != 0:
-            requires_index = data[0] + data[1]
-            requires_index = int(requires_index, 16)
-            del data[0:2]
+            requires_index = data.u2()
             module.append(requires_index)
 
-            requires_flags = data[0] + data[1]
-            del data[0:2]
+            requires_flag_bits = data.u2()
+            requires_flags = format(requires_flag_bits, "04x")
             module.append(requires_flags)
 
-            requires_version_index = data[0] + data[1]
-            requires_version_index = int(requires_version_index, 16)
-            del data[0:2]
+            requires_version_index = data.u2()
             module.append(requires_version_index)
+            requires.append((requires_index, requires_flag_bits, requires_version_index))
 
             requires_count = requires_count - 1
 
-        exports_count = data[0] + data[1]
-        exports_count = int(exports_count, 16)
-        del data[0:2]
+        exports_count = data.u2()
         module.append(exports_count)
+        exports = []
 
         while exports_count != 0:
-            exports_index = data[0] + data[1]
-            exports_index = int(exports_index, 16)
-            del data[0:2]
+            exports_index = data.u2()
             module.append(exports_index)
 
-            exports_flags = data[0] + data[1]
-            del data[0:2]
+            exports_flag_bits = data.u2()
+            exports_flags = format(exports_flag_bits, "04x")
             module.append(exports_flags)
 
-            exports_to_count = data[0] + data[1]
-            exports_to_count = int(exports_to_count, 16)
-            del data[0:2]
+            exports_to_count = data.u2()
             module.append(exports_to_count)
 
+            exports_to = []
             while exports_to_count != 0:
-                exports_to_index = data[0] + data[1]
-                exports_to_index = int(exports_to_index, 16)
-                del data[0:2]
+                exports_to_index = data.u2()
                 module.append(exports_to_index)
+                exports_to.append(exports_to_index)
 
                 exports_to_count = exports_to_count - 1
+            exports.append((exports_index, exports_flag_bits, tuple(exports_to)))
 
             exports_count = exports_count - 1
 
-        opens_count = data[0] + data[1]
-        opens_count = int(opens_count, 16)
-        del data[0:2]
+        opens_count = data.u2()
         module.append(opens_count)
+        opens = []
 
         while opens_count != 0:
-            opens_index = data[0] + data[1]
-            opens_index = int(opens_index, 16)
-            del data[0:2]
+            opens_index = data.u2()
             module.append(opens_index)
 
-            opens_flags = data[0] + data[1]
-            del data[0:2]
+            opens_flag_bits = data.u2()
+            opens_flags = format(opens_flag_bits, "04x")
             module.append(opens_flags)
 
-            opens_to_count = data[0] + data[1]
-            opens_to_count = int(opens_to_count, 16)
-            del data[0:2]
+            opens_to_count = data.u2()
             module.append(opens_to_count)
 
+            opens_to = []
             while opens_to_count != 0:
-                opens_to_index = data[0] + data[1]
-                opens_to_index = int(opens_to_index, 16)
-                del data[0:2]
+                opens_to_index = data.u2()
                 module.append(opens_to_index)
+                opens_to.append(opens_to_index)
 
                 opens_to_count = opens_to_count - 1
+            opens.append((opens_index, opens_flag_bits, tuple(opens_to)))
 
             opens_count = opens_count - 1
 
-        uses_count = data[0] + data[1]
-        uses_count = int(uses_count, 16)
-        del data[0:2]
+        uses_count = data.u2()
         module.append(uses_count)
+        uses = []
 
         while uses_count != 0:
-            uses_index = data[0] + data[1]
-            uses_index = int(uses_index, 16)
-            del data[0:2]
+            uses_index = data.u2()
             module.append(uses_index)
+            uses.append(uses_index)
 
             uses_count = uses_count - 1
 
-        provides_count = data[0] + data[1]
-        provides_count = int(provides_count, 16)
-        del data[0:2]
+        provides_count = data.u2()
         module.append(provides_count)
+        provides = []
 
         while provides_count != 0:
-            provides_index = data[0] + data[1]
-            provides_index = int(provides_index, 16)
-            del data[0:2]
+            provides_index = data.u2()
             module.append(provides_index)
 
-            provides_with_count = data[0] + data[1]
-            provides_with_count = int(provides_with_count, 16)
-            del data[0:2]
+            provides_with_count = data.u2()
             module.append(provides_with_count)
 
+            provides_with = []
             while provides_with_count != 0:
-                provides_with_index = data[0] + data[1]
-                provides_with_index = int(provides_with_index, 16)
-                del data[0:2]
+                provides_with_index = data.u2()
                 module.append(provides_with_index)
+                provides_with.append(provides_with_index)
 
                 provides_with_count = provides_with_count - 1
+            provides.append((provides_index, tuple(provides_with)))
 
             provides_count = provides_count - 1
 
@@ -1393,17 +1228,15 @@ class attribute_info:
             for item in module:
                 write_mod.write(str(item) + "\n")
             write_mod.close()
-    
+
+        return ModuleAttribute(self.attribute_type, module_name_index, module_flag_bits, module_version_index, requires,
+                               exports, opens, uses, provides)
+
     def attribute_sourcedebugextension(self, attribute_length, pathway):
-        global data
+        data = self.context.data
 
-        sde = []
-        while attribute_length != 0:
-            debug_extension = data[0]
-            debug_extension = int(debug_extension, 16)
-            del data[0]
-            sde.append(debug_extension)
-            attribute_length = attribute_length - 1
+        debug_extension = bytes(data.read(attribute_length))
+        sde = list(debug_extension)
 
         if self.write:
             write_sde = open(pathway + "/source_debug_extension.txt", "w")
@@ -1411,199 +1244,45 @@ class attribute_info:
                 write_sde.write(str(item) + "\n")
             write_sde.close()
 
+        return SourceDebugExtensionAttribute(self.attribute_type, debug_extension)
+
     def attribute_code(self, pathway):
-        global data
-
-        # The code attribute can have multiple attributes of the same type attached to it. The following globals are
-        # used to keep track of each of these attribute so that they can be written to a unique file.
-        global linenumbertable_count
-        linenumbertable_count = 0
-
-        global localvariabletable_count
-        localvariabletable_count = 0
-
-        global lvtt_count
-        lvtt_count = 0
-
-        # The list of 2d arrays below describe the JAVA bytecode operators alongside their hexadecimal opcodes.
-        # The data is used to create a human readable version of the opcode logic similar to the javap output.
-
-        Constants = [["00", "01", "02", "03", "04", "05", "06", "07", "08", "09", "0a",
-                      "0b", "0c", "0d", "0e", "0f", "10", "11", "12", "13", "14"],
-                     ["nop", "aconst_null", "iconst_ml", "iconst_0", "iconst_1", "iconst_2", "iconst_3",
-                      "iconst_4", "iconst_5", "lconst_0", "lconst_1", "fconst_0", "fconst_1", "fconst_2",
-                      "dconst_0", "dconst_1", "bipush", "sipush", "ldc", "ldc_w", "ldc2_w"]]
-
-        Loads = [["15", "16", "17", "18", "19", "1a", "1b", "1c", "1d", "1e", "1f", "20",
-                  "21", "22", "23", "24", "25", "26", "27", "28", "29", "2a", "2b", "2c",
-                  "2d", "2e", "2f", "30", "31", "32", "33", "34", "35"],
-                 ["iload", "lload", "fload", "dload", "aload", "iload_0", "iload_1", "iload_2",
-                  "iload_3", "lload_0", "lload_1", "lload_2", "lload_3", "fload_0", "fload_1",
-                  "fload_2", "fload_3", "dload_0", "dload_1", "dload_2", "dload_3", "aload_0",
-                  "aload_1", "aload_2", "aload_3", "iaload", "laload", "faload", "daload", "aaload",
-                  "baload", "caload", "saload"]]
-
-        Stores = [["36", "37", "38", "39", "3a", "3b", "3c", "3d", "3e", "3f", "40", "41",
-                   "42", "43", "44", "45", "46", "47", "48", "49", "4a", "4b", "4c", "4d",
-                   "4e", "4f", "50", "51", "52", "53", "54", "55", "56"],
-                  ["istore", "lstore", "fstore", "dstore", "astore", "istore_0", "istore_1", "istore_2",
-                   "istore_3", "lstore_0", "lstore_1", "lstore_2", "lstore_3", "fstore_0", "fstore_1",
-                   "fstore_2", "fstore_3", "dstore_0", "dstore_1", "dstore_2", "dstore_3", "astore_0",
-                   "astore_1", "astore_2", "astore_3", "iastore", "lastore", "fastore", "dastore", "aastore",
-                   "bastore", "castore", "sastore"]]
-
-        Stack = [["57", "58", "59", "5a", "5b", "5c", "5d", "5e", "5f"],
-                 ["pop", "pop2", "dup", "dux_x1", "dup_x2", "dup2", "dup2_x1", "dup2_x2", "swap"]]
-
-        Math = [["60", "61", "62", "63", "64", "65", "66", "67", "68", "69", "6a", "6b",
-                 "6c", "6d", "6e", "6f", "70", "71", "72", "73", "74", "75", "76", "77",
-                 "78", "79", "7a", "7b", "7c", "7d", "7e", "7f", "80", "81", "82", "83",
-                 "84"],
-                ["iadd", "ladd", "fadd", "dadd", "isub", "lsub", "fsub", "dsub", "imul", "lmul",
-                 "fmul", "dmul", "idiv", "ldiv", "fdiv", "ddiv", "irem", "lrem", "frem", "drem",
-                 "ineg", "fneg", "lneg", "dneg", "ishl", "lshl", "ishr", "lshr", "iushr", "lushr",
-                 "iand", "land", "ior", "lor", "ixor", "lxor", "iinc"]]
-
-        Conversions = [["85", "86", "87", "88", "89", "8a", "8b", "8c", "8d", "8e", "8f", "90", "91", "92", "93"],
-                       ["i2l", "i2f", "i2d", "l2i", "l2f", "l2d", "f2i", "f2l", "f2d", "d2i", "d2l", "d2f", "i2b",
-                        "i2c", "i2s"]]
-
-        Comparisons = [["94", "95", "96", "97", "98", "99", "9a", "9b", "9c", "9d", "9e", "9f",
-                        "a0", "a1", "a2", "a3", "a4", "a5", "a6"],
-                       ["lcmp", "fcmpl", "fcmpg", "dcmpl", "dcmpg", "ifeq", "ifne", "iflt", "ifge", "ifgt", "ifle",
-                        "if_icmpeq", "if_icmpne", "if_icmplt", "if_icmpge", "if_icmpgt", "if_icmple",
-                        "if_acmpeq", "if_acmpne"]]
-
-        Control = [["a7", "a8", "a9", "aa", "ab", "ac", "ad", "ae", "af", "b0", "b1"],
-                   ["goto", "jsr", "ret", "tableswitch", "lookupswitch", "ireturn", "lreturn", "freturn",
-                    "dreturn", "areturn", "return", ]]
-
-        References = [["b2", "b3", "b4", "b5", "b6", "b7", "b8", "b9", "ba", "bb", "bc", "bd", "be", "bf", "c0",
-                       "c1", "c2", "c3", ],
-                      ["getstatic", "putstatic", "getfield", "putfield", "invokevirtual", "invokespecial",
-                       "invokestatic", "invokeinterface", "invokedynamic", "new", "newarray", "anewarray",
-                       "arraylength", "athrow", "checkcast", "instanceof", "monitorenter", "monitorexit"]]
-
-        Extended = [["c4", "c5", "c6", "c7", "c8", "c9"],
-                    ["wide", "multianewarray", "ifnull", "ifnonull", "goto_w", "jsr_w"]]
-
-        Reserved = [["ca", "fe", "ff"],
-                    ["breakpoint", "impdep1", "impdep2"]]
-
-
-        max_stack = data[0] + data[1]   # the maximum depth of the operand stack
-        max_stack = int(max_stack, 16)
-        del data[0:2]
-
-        max_locals = data[0] + data[1]  # the total number of local variable used in the method
-        max_locals = int(max_locals, 16)
-        del data[0:2]
-
-        code_length = data[0] + data[1] + data[2] + data[3] # The length in bytes of the code for this method.
-        code_length = int(code_length, 16)                  # Note: the code length includes the bytes for the data
-        del data[0:4]                                       # associated with the code attribute itself; i.e. the "line
-                                                            # number table", "local variable table" and "stack map
-                                                            # table".
-        store_codelength = code_length
-        code = []   # array used to store bytecode opcodes
-        while code_length != 0:
-            # get the human-readable opcode associated with the hexadecimal value
-
-            for opcode in Constants[0]:
-                if opcode == data[0]:
-                    index = Constants[0].index(opcode)
-                    code.append(Constants[1][index])
-
-            for opcode in Loads[0]:
-                if opcode == data[0]:
-                    index = Loads[0].index(opcode)
-                    code.append(Loads[1][index])
-
-            for opcode in Stores[0]:
-                if opcode == data[0]:
-                    index = Stores[0].index(opcode)
-                    code.append(Stores[1][index])
-
-            for opcode in Stack[0]:
-                if opcode == data[0]:
-                    index = Stack[0].index(opcode)
-                    code.append(Stack[1][index])
-
-            for opcode in Math[0]:
-                if opcode == data[0]:
-                    index = Math[0].index(opcode)
-                    code.append(Math[1][index])
-
-            for opcode in Conversions[0]:
-                if opcode == data[0]:
-                    index = Conversions[0].index(opcode)
-                    code.append(Conversions[1][index])
-
-            for opcode in Comparisons[0]:
-                if opcode == data[0]:
-                    index = Comparisons[0].index(opcode)
-                    code.append(Comparisons[1][index])
-
-            for opcode in Control[0]:
-                if opcode == data[0]:
-                    index = Control[0].index(opcode)
-                    code.append(Control[1][index])
-
-            for opcode in References[0]:
-                if opcode == data[0]:
-                    index = References[0].index(opcode)
-                    code.append(References[1][index])
-
-            for opcode in Extended[0]:
-                if opcode == data[0]:
-                    index = Extended[0].index(opcode)
-                    code.append(Extended[1][index])
-
-            for opcode in Reserved[0]:
-                if opcode == data[0]:
-                    index = Reserved[0].index(opcode)
-                    code.append(Reserved[1][index])
-
-            del data[0]
-
-            code_length = code_length - 1
-
-        exception_table_length = data[0] + data[1]
-        exception_table_length = int(exception_table_length, 16)
-        del data[0:2]
+        data = self.context.data
 
-        store_exceptiontablelength = exception_table_length
-        exception_tables = []  # array used to store exception tables
-        while exception_table_length != 0:
+        # The code attribute can have multiple attributes of the same type attached to it. The following counters in
+        # the parse context are used to keep track of each of these attribute so that they can be written to a unique
+        # file.
+        context = self.context
+        context.linenumbertable_count = 0
+        context.localvariabletable_count = 0
+        context.lvtt_count = 0
+
+        max_stack = data.u2()   # the maximum depth of the operand stack
 
-            start_pc = data[0] + data[1]
-            start_pc = int(start_pc, 16)
-            del data[0:2]
+        max_locals = data.u2()  # the total number of local variable used in the method
 
-            end_pc = data[0] + data[1]
-            end_pc = int(end_pc, 16)
-            del data[0:2]
+        code_length = data.u4()   # The length in bytes of the code for this method.
+        store_codelength = code_length
+        code_bytes = bytes(data.read(code_length))   # raw bytecode of the method
 
-            handler_pc = data[0] + data[1]
-            handler_pc = int(handler_pc, 16)
-            del data[0:2]
+        # decode the bytecode into (pc, opcode, operands) instructions in a single pass over the code array, using
+        # the opcode table built once in opcodes.py
+        instructions = decode_instructions(code_bytes)
+        if context.collector is not None:
+            context.collector.decoded(len(instructions))
 
-            catch_type = data[0] + data[1]
-            catch_type = int(catch_type, 16)
-            del data[0:2]
+        exception_table_length = data.u2()
 
-            exception_tables.append([start_pc, end_pc, handler_pc, catch_type])
-            exception_table_length = exception_table_length - 1
+        store_exceptiontablelength = exception_table_length
+        # (start_pc, end_pc, handler_pc, catch_type) records, decoded in one pass
+        exception_tables = [ExceptionEntry(*entry) for entry in data.table(_u2_u2_u2_u2, exception_table_length)]
 
-        attributes_count = data[0] + data[1]   # the number of attributes attached to this code attribute specificaly
-        attributes_count = int(attributes_count, 16)
-        del data[0:2]
+        attributes_count = data.u2()   # the number of attributes attached to this code attribute specificaly
 
         if self.write:
             # create unique code directory
-            global code_count
-            code_count = code_count + 1
-            code_dir = pathway + "/code_" + str(code_count)
+            context.code_count = context.code_count + 1
+            code_dir = pathway + "/code_" + str(context.code_count)
             os.mkdir(code_dir)
 
             # write code data to file
@@ -1611,184 +1290,117 @@ class attribute_info:
             write_code.write(str(max_stack) + "\n")
             write_code.write(str(max_locals) + "\n")
             write_code.write(str(store_codelength) + "\n")
-            for opcode in code:
-                write_code.write(str(opcode) + "\n")
+            for instruction in instructions:
+                write_code.write(format_instruction(instruction) + "\n")
             write_code.write(str(store_exceptiontablelength) + "\n")
             for table in exception_tables:
-                write_code.write(str(table[0]) + "," + str(table[1]) + "," + str(table[2]) + "," + str(table[3]) + "\n")
+                write_code.write(str(table.start_pc) + "," + str(table.end_pc) + "," + str(table.handler_pc) + "," +
+                                 str(table.catch_type) + "\n")
             write_code.write(str(attributes_count))
             write_code.close()
         else:
             code_dir = None
 
+        code_attribute = CodeAttribute(self.attribute_type, max_stack, max_locals, code_bytes, exception_tables, [],
+                                       instructions)
+
         # processed the attributes attached to this code attribute
         while attributes_count != 0:
-            attribute_info(self.constant_pool, code_dir, self.verbose, self.write)
+            attribute = attribute_info(self.context, code_dir)
+            if attribute.attribute is not None:
+                code_attribute.attributes.append(attribute.attribute)
             attributes_count = attributes_count - 1
 
-    def attribute_linenumbertable(self, pathway):
-        global data
-
-        line_number_table_length = data[0] + data[1]
-        line_number_table_length = int(line_number_table_length, 16)
-        del data[0:2]
-
-        line_number_table = [line_number_table_length]
-        while line_number_table_length != 0:
-            start_pc = data[0] + data[1]
-            start_pc = int(start_pc, 16)
-            del data[0:2]
+        return code_attribute
 
-            line_number = data[0] + data[1]
-            line_number = int(line_number, 16)
-            del data[0:2]
+    def attribute_linenumbertable(self, pathway):
+        data = self.context.data
 
-            line_number_table.append([start_pc, line_number])
+        line_number_table_length = data.u2()
 
-            line_number_table_length = line_number_table_length - 1
+        line_number_table = data.table(_u2_u2, line_number_table_length)   # (start_pc, line_number) in one pass
 
         if self.write:
-            global linenumbertable_count
+            context = self.context
 
             # According to the JAVA spec, a code attribute may have multiple line number tables. A unique entry is created
-            # for each of them using the global "linenumbertable_count".
-            lnt_path = pathway + "/linenumbertable_" + str(linenumbertable_count) + ".txt"
-            linenumbertable_count = linenumbertable_count + 1
+            # for each of them using the "linenumbertable_count" of the parse context.
+            lnt_path = pathway + "/linenumbertable_" + str(context.linenumbertable_count) + ".txt"
+            context.linenumbertable_count = context.linenumbertable_count + 1
 
             write_lnt = open(lnt_path, 'w')
-            for item in line_number_table:
-                if isinstance(item, list):
-                    for stuff in item:
-                        write_lnt.write(str(stuff) + ",")
-                    write_lnt.write("\n")
-                else:
-                    write_lnt.write(str(item) + "\n")
+            write_lnt.write(str(line_number_table_length) + "\n")
+            for start_pc, line_number in line_number_table:
+                write_lnt.write(str(start_pc) + "," + str(line_number) + ",\n")
             write_lnt.close()
 
+        return LineNumberTableAttribute(self.attribute_type, line_number_table)
 
-    def attribute_localvariabletable(self, pathway):
-        global data
-
-        local_variable_table_length = data[0] + data[1]
-        local_variable_table_length = int(local_variable_table_length, 16)
-        del data[0:2]
-
-        local_variable_table = [local_variable_table_length]
-
-        while local_variable_table_length != 0:
-            start_pc = data[0] + data[1]
-            start_pc = int(start_pc, 16)
-            del data[0:2]
-
-            length = data[0] + data[1]
-            length = int(length, 16)
-            del data[0:2]
 
-            name_index = data[0] + data[1]
-            name_index = int(name_index, 16)
-            del data[0:2]
-
-            descriptor_index = data[0] + data[1]
-            descriptor_index = int(descriptor_index, 16)
-            del data[0:2]
-
-            index = data[0] + data[1]
-            index = int(index, 16)
-            del data[0:2]
+    def attribute_localvariabletable(self, pathway):
+        data = self.context.data
 
-            local_variable_table.append([start_pc, length, name_index, descriptor_index, index])
+        local_variable_table_length = data.u2()
 
-            local_variable_table_length = local_variable_table_length - 1
+        # (start_pc, length, name_index, descriptor_index, index) records, decoded in one pass
+        local_variable_table = data.table(_local_variable, local_variable_table_length)
 
         # write operations for local variable table
         if self.write:
-            global localvariabletable_count  # global variable for keeping track of each local variable table and its associated Code
+            context = self.context   # keeps track of each local variable table and its associated Code
 
-            lvt_path = pathway + "/localvariabletable_" + str(localvariabletable_count) + ".txt"
+            lvt_path = pathway + "/localvariabletable_" + str(context.localvariabletable_count) + ".txt"
             write_lvt = open(lvt_path, 'w')
-            localvariabletable_count = localvariabletable_count + 1
+            context.localvariabletable_count = context.localvariabletable_count + 1
 
+            write_lvt.write(str(local_variable_table_length) + "\n")
             for item in local_variable_table:
-                if isinstance(item, list):
-                    for stuff in item:
-                        write_lvt.write(str(stuff) + ",")
-                    write_lvt.write("\n")
-                else:
-                    write_lvt.write(str(item) + "\n")
+                write_lvt.write(",".join([str(value) for value in item]) + ",\n")
 
             write_lvt.close()
 
-    def attribute_localvariabletypetable(self, pathway):
-        global data
-
-        lvtt_length = data[0] + data[1]
-        lvtt_length = int(lvtt_length, 16)
-        del data[0:2]
-
-        local_variable_type_table = [lvtt_length]
-
-        while lvtt_length != 0:
-            start_pc = data[0] + data[1]
-            start_pc = int(start_pc, 16)
-            del data[0:2]
-
-            length = data[0] + data[1]
-            length = int(length, 16)
-            del data[0:2]
-
-            name_index = data[0] + data[1]
-            name_index = int(name_index, 16)
-            del data[0:2]
-
-            signature_index = data[0] + data[1]
-            signature_index = int(signature_index, 16)
-            del data[0:2]
+        return LocalVariableTableAttribute(self.attribute_type, local_variable_table)
 
-            index = data[0] + data[1]
-            index = int(index, 16)
-            del data[0:2]
+    def attribute_localvariabletypetable(self, pathway):
+        data = self.context.data
 
-            local_variable_type_table.append([start_pc, length, name_index, signature_index, index])
+        lvtt_length = data.u2()
 
-            lvtt_length = lvtt_length - 1
+        # (start_pc, length, name_index, signature_index, index) records, decoded in one pass
+        local_variable_type_table = data.table(_local_variable, lvtt_length)
 
         # write operations for local variable type table
         if self.write:
-            global lvtt_count
+            context = self.context
 
-            lvtt_path = pathway + "/localvariabletypetable_" + str(lvtt_count) + ".txt"
+            lvtt_path = pathway + "/localvariabletypetable_" + str(context.lvtt_count) + ".txt"
             write_lvtt = open(lvtt_path, 'w')
-            lvtt_count = lvtt_count + 1
+            context.lvtt_count = context.lvtt_count + 1
 
+            write_lvtt.write(str(lvtt_length) + "\n")
             for item in local_variable_type_table:
-                if isinstance(item, list):
-                    for stuff in item:
-                        write_lvtt.write(str(stuff) + ",")
-                    write_lvtt.write("\n")
-                else:
-                    write_lvtt.write(str(item) + "\n")
+                write_lvtt.write(",".join([str(value) for value in item]) + ",\n")
 
             write_lvtt.close()
 
+        return LocalVariableTableAttribute(self.attribute_type, local_variable_type_table)
+
 
     class attribute_stackmaptable:
-        def __init__(self, pathway, write):
-            global data
+        def __init__(self, pathway, write, data):
+            self.data = data   # class_reader of the parse context
 
             # number of entries in the stack_map_table
-            number_of_entries = data[0] + data[1]
-            number_of_entries = int(number_of_entries, 16)
-            del data[0:2]
+            number_of_entries = data.u2()
 
             stack_map_table = [str(number_of_entries)]
+            self.entries = []   # StackMapFrame objects
 
             # Note: not all Java compilers use stack_map_tables. Typically, they are found in the newer versions
 
             while number_of_entries != 0:  # major loop for identifying each frame within the stack_map_table
 
-                stack_map_frame = data[0]  # the type of stack_map_frame is given by one byte of data
-                stack_map_frame = int(stack_map_frame, 16)  # convert hex to integer
-                del data[0]  # remove the data from the data[] array
+                stack_map_frame = data.u1()  # the type of stack_map_frame is given by one byte of data
 
                 # Stack-Map-Frames are identified by a unique integer between 0-255. This section identifies the type of
                 # Stack-Map-Frame and processes it accordingly. Note: Certain frames contain unique structures known as
@@ -1796,74 +1408,69 @@ class attribute_info:
                 # redundancy in the code.
                 if (stack_map_frame >= 0) and (stack_map_frame <= 63):
                     stack_map_table.append("same_frame\n")
+                    self.entries.append(StackMapFrame(stack_map_frame, stack_map_frame))
                 elif (stack_map_frame >= 64) and (stack_map_frame <= 127):
                     stack_map_table.append("same_locals_1_stack_item_frame\n")
                     vti = self.verification_type_info()
-                    for item in vti:
-                        stack_map_table.append(str(item) + "-")
-                    stack_map_table.append("\n")
+                    stack_map_table.append(self.verification_type_text(vti) + "\n")
+                    self.entries.append(StackMapFrame(stack_map_frame, stack_map_frame - 64, (), (vti,)))
                 elif (stack_map_frame == 247):
                     stack_map_table.append("same_locals_1_stack_item_frame_extended")
-                    offset_delta = data[0] + data[1]
-                    del data[0:2]
-                    stack_map_table.append(offset_delta + "\n")
+                    offset_delta = data.u2()
+                    stack_map_table.append(format(offset_delta, "04x") + "\n")
                     vti = self.verification_type_info()
-                    for item in vti:
-                        stack_map_table.append(str(item) + "-")
-                    stack_map_table.append("\n")
+                    stack_map_table.append(self.verification_type_text(vti) + "\n")
+                    self.entries.append(StackMapFrame(stack_map_frame, offset_delta, (), (vti,)))
                 elif (stack_map_frame >= 248) and (stack_map_frame <= 250):
                     stack_map_table.append("chop_frame\n")
-                    offset_delta = data[0] + data[1]
-                    del data[0:2]
-                    stack_map_table.append(offset_delta + "\n")
+                    offset_delta = data.u2()
+                    stack_map_table.append(format(offset_delta, "04x") + "\n")
+                    self.entries.append(StackMapFrame(stack_map_frame, offset_delta))
                 elif (stack_map_frame == 251):
                     stack_map_table.append("same_frame_extended\n")
-                    offset_delta = data[0] + data[1]
-                    del data[0:2]
-                    stack_map_table.append(offset_delta + "\n")
+                    offset_delta = data.u2()
+                    stack_map_table.append(format(offset_delta, "04x") + "\n")
+                    self.entries.append(StackMapFrame(stack_map_frame, offset_delta))
                 elif (stack_map_frame >= 252) and (stack_map_frame <= 254):
                     stack_map_table.append("append_frame\n")
-                    offset_delta = data[0] + data[1]
-                    del data[0:2]
-                    stack_map_table.append(str(offset_delta) + "\n")
+                    offset_delta = data.u2()
+                    stack_map_table.append(format(offset_delta, "04x") + "\n")
 
+                    frame_locals = []
                     number_of_locals = stack_map_frame - 251
                     while number_of_locals != 0:
                         vti = self.verification_type_info()
-                        for item in vti:
-                            stack_map_table.append(str(item) + "-")
-                        stack_map_table.append("\n")
+                        stack_map_table.append(self.verification_type_text(vti) + "\n")
+                        frame_locals.append(vti)
                         number_of_locals = number_of_locals - 1
+                    self.entries.append(StackMapFrame(stack_map_frame, offset_delta, tuple(frame_locals)))
 
                 elif (stack_map_frame == 255):
                     stack_map_table.append("full_frame\n")
-                    offset_delta = data[0] + data[1]
-                    del data[0:2]
-                    stack_map_table.append(str(offset_delta) + "\n")
+                    offset_delta = data.u2()
+                    stack_map_table.append(format(offset_delta, "04x") + "\n")
 
-                    number_of_locals = data[0] + data[1]
-                    number_of_locals = int(number_of_locals, 16)
-                    del data[0:2]
+                    number_of_locals = data.u2()
                     stack_map_table.append(str(number_of_locals) + "\n")
 
+                    frame_locals = []
                     while number_of_locals != 0:
                         vti = self.verification_type_info()
-                        for locals in vti:
-                            stack_map_table.append(str(locals) + "-")
-                        stack_map_table.append("\n")
+                        stack_map_table.append(self.verification_type_text(vti) + "\n")
+                        frame_locals.append(vti)
                         number_of_locals = number_of_locals - 1
 
-                    number_of_stack_items = data[0] + data[1]
-                    number_of_stack_items = int(number_of_stack_items, 16)
-                    del data[0:2]
+                    number_of_stack_items = data.u2()
                     stack_map_table.append(str(number_of_stack_items) + "\n")
 
+                    frame_stack = []
                     while number_of_stack_items != 0:
                         vti = self.verification_type_info()
-                        for stacks in vti:
-                            stack_map_table.append(str(stacks) + "-")
-                        stack_map_table.append("\n")
+                        stack_map_table.append(self.verification_type_text(vti) + "\n")
+                        frame_stack.append(vti)
                         number_of_stack_items = number_of_stack_items - 1
+                    self.entries.append(StackMapFrame(stack_map_frame, offset_delta, tuple(frame_locals),
+                                                      tuple(frame_stack)))
 
                 number_of_entries = number_of_entries - 1
 
@@ -1876,284 +1483,333 @@ class attribute_info:
                     write_smt.write(item)
                 write_smt.close()
 
+        # returns the verification_type_info as a (tag,) tuple, or a (tag, index) tuple for the Object_variable_info and
+        # Uninitialized_variable_info types
         def verification_type_info(self):
-            global data
+            data = self.data
 
-            v_type = data[0]
-            v_type = int(v_type, 16)
-            del data[0]
-            v_t_i = [v_type]
+            v_type = data.u1()
 
             if v_type == 7:
-                cpool_index = data[0] + data[1]
-                del data[0:2]
-                v_t_i.append(cpool_index)
+                cpool_index = data.u2()
+                return (v_type, cpool_index)
             elif v_type == 8:
-                offset = data[0] + data[1]
-                del data[0:2]
-                v_t_i.append(offset)
+                offset = data.u2()
+                return (v_type, offset)
+
+            return (v_type,)
 
-            return v_t_i
+        # text form of a verification_type_info used in stackmaptable.txt; the tag is written as an integer and the
+        # index or offset that follows it as a four digit hexadecimal value
+        def verification_type_text(self, vti):
+            text = str(vti[0]) + "-"
+            if len(vti) == 2:
+                text = text + format(vti[1], "04x") + "-"
+            return text
 
     class annotations:
 
+        def __init__(self, data):
+            self.data = data   # class_reader of the parse context
+
         def attribute_annotationdefault(self):
-            global data
+            data = self.data
 
             # The annotation default attribute is the same as the element_value structure outlined in
             # the JVM classfile specifications
-            default_value = attribute_info.annotations()
-            default_value.element_value_structure()
+            default_value = attribute_info.annotations(data)
+            return default_value.element_value_structure()
 
 
         def attribute_runtimetypeannotations(self):
-            global data
-
-            type_parameter_target = ["00", "01"]
-            supertype_target = "10"
-            type_parameter_bound_target = ["11", "12"]
-            empty_target = ["13", "14", "15"]
-            formal_parameter_target = "16"
-            throws_target = "17"
-            localvar_target = ["40", "41"]
-            catch_target = "42"
-            offset_target = ["43", "44", "45", "46"]
-            type_argument_target = ["47", "48", "49", "4A", "4B"]
-
-            num_annotations = data[0] + data[1]
-            num_annotations = int(num_annotations, 16)
-            del data[0:2]
+            data = self.data
+
+            type_parameter_target = [0x00, 0x01]
+            supertype_target = 0x10
+            type_parameter_bound_target = [0x11, 0x12]
+            empty_target = [0x13, 0x14, 0x15]
+            formal_parameter_target = 0x16
+            throws_target = 0x17
+            localvar_target = [0x40, 0x41]
+            catch_target = 0x42
+            offset_target = [0x43, 0x44, 0x45, 0x46]
+            type_argument_target = [0x47, 0x48, 0x49, 0x4A, 0x4B]
+
+            num_annotations = data.u2()
+            type_annotations = []
 
             while num_annotations != 0:
-                target_type = data[0]
-                del data[0]
+                target_type = data.u1()
+                target_info = ()   # the empty target contains no data
 
                 for item in type_parameter_target:
                     if item == target_type:
-                        type_parameter_index = data[0]
-                        type_parameter_index = int(type_parameter_index, 16)
-                        del data[0]
+                        type_parameter_index = data.u1()
+                        target_info = (type_parameter_index,)
 
                 if target_type == supertype_target:
-                    supertype_index = data[0] + data[1]
-                    supertype_index = int(supertype_index, 16)
-                    del data[0:2]
+                    supertype_index = data.u2()
+                    target_info = (supertype_index,)
 
                 for item in type_parameter_bound_target:
                     if item == target_type:
-                        type_parameter_index = data[0]
-                        type_parameter_index = int(type_parameter_index, 16)
-                        del data[0]
-
-                        bound_index = data[0]
-                        bound_index = int(bound_index, 16)
-                        del data[0]
+                        type_parameter_index = data.u1()
 
-                # the empty target contains no data
+                        bound_index = data.u1()
+                        target_info = (type_parameter_index, bound_index)
 
                 if target_type == formal_parameter_target:
-                    formal_parameter_index = data[0]
-                    formal_parameter_index = int(formal_parameter_index, 16)
-                    del data[0]
+                    formal_parameter_index = data.u1()
+                    target_info = (formal_parameter_index,)
 
                 if target_type == throws_target:
-                    throws_type_index = data[0] + data[1]
-                    throws_type_index = int(throws_type_index, 16)
-                    del data[0:2]
-                
+                    throws_type_index = data.u2()
+                    target_info = (throws_type_index,)
+
                 if (target_type == localvar_target[0]) or (target_type == localvar_target[1]):
-                    table_length = data[0] + data[1]
-                    table_length = int(table_length, 16)
-                    del data[0:2]
+                    table_length = data.u2()
 
+                    table = []
                     while table_length != 0:
-                        start_pc = data[0] + data[1]
-                        start_pc = int(start_pc, 16)
-                        del data[0:2]
+                        start_pc = data.u2()
 
-                        length = data[0] + data[1]
-                        length = int(length, 16)
-                        del data[0:2]
+                        length = data.u2()
 
-                        index = data[0] + data[1]
-                        index = int(index, 16)
-                        del data[0:2]
+                        index = data.u2()
 
+                        table.append((start_pc, length, index))
                         table_length = table_length - 1
+                    target_info = tuple(table)
 
                 if target_type == catch_target:
-                    exception_table_index = data[0] + data[1]
-                    exception_table_index = int(exception_table_index, 16)
-                    del data[0:2]
+                    exception_table_index = data.u2()
+                    target_info = (exception_table_index,)
 
                 for item in offset_target:
                     if target_type == item:
-                        offset = data[0] + data[1]
-                        offset = int(offset, 16)
-                        del data[0:2]
+                        offset = data.u2()
+                        target_info = (offset,)
 
                 for item in type_argument_target:
                     if target_type == item:
-                        offset = data[0] + data[1]
-                        offset = int(offset, 16)
-                        del data[0:2]
+                        offset = data.u2()
 
-                        type_argument_index = data[0]
-                        type_argument_index = int(type_argument_index, 16)
-                        del data[0]
+                        type_argument_index = data.u1()
+                        target_info = (offset, type_argument_index)
 
                 # type path structure
-                path_length = data[0]
-                path_length = int(path_length, 16)
-                del data[0]
+                path_length = data.u1()
 
+                target_path = []
                 while path_length != 0:
-                    type_path_kind = data[0]
-                    type_path_kind = int(type_path_kind, 16)
-                    del data[0]
+                    type_path_kind = data.u1()
 
-                    type_argument_index = data[0]
-                    type_argument_index = int(type_argument_index, 16)
-                    del data[0]
+                    type_argument_index = data.u1()
 
+                    target_path.append((type_path_kind, type_argument_index))
                     path_length = path_length - 1
 
-                type_index = data[0] + data[1]
-                type_index = int(type_index, 16)
-                del data[0:2]
+                type_index = data.u2()
 
-                num_element_value_pairs = data[0] + data[1]
-                num_element_value_pairs = int(num_element_value_pairs, 16)
-                del data[0:2]
+                num_element_value_pairs = data.u2()
 
+                element_value_pairs = []
                 while num_element_value_pairs != 0:
 
-                    element_name_index = data[0] + data[1]
-                    element_name_index = int(element_name_index, 16)
-                    del data[0:2]
+                    element_name_index = data.u2()
 
-                    element_value = attribute_info.annotations()
-                    element_value.element_value_structure()
+                    element_value = attribute_info.annotations(data)
+                    element_value_pairs.append((element_name_index, element_value.element_value_structure()))
 
                     num_element_value_pairs = num_element_value_pairs - 1
 
+                type_annotations.append(TypeAnnotation(target_type, target_info, tuple(target_path), type_index,
+                                                       element_value_pairs))
                 num_annotations = num_annotations - 1
 
+            return type_annotations
+
 
         def attribute_runtimeparameterannotations(self):
-            global data
-            num_paramters = data[0]
-            num_paramters = int(num_paramters, 16)
-            del data[0]
+            data = self.data
+            num_paramters = data.u1()
 
+            parameters = []
             while num_paramters != 0:
-                parameter_annotations = attribute_info.annotations()
-                parameter_annotations.attribute_runtimevisibleannotations()
+                parameter_annotations = attribute_info.annotations(data)
+                parameters.append(parameter_annotations.attribute_runtimevisibleannotations())
 
                 num_paramters = num_paramters - 1
 
+            return parameters
+
 
         def attribute_runtimevisibleannotations(self):
-            global data
+            data = self.data
 
-            num_annotations = data[0] + data[1]
-            num_annotations = int(num_annotations, 16)
-            del data[0:2]
+            num_annotations = data.u2()
+            annotations = []
 
             while num_annotations != 0:
-                type_index = data[0] + data[1]
-                type_index = int(type_index, 16)
-                del data[0:2]
+                type_index = data.u2()
 
-                num_element_value_pairs = data[0] + data[1]
-                num_element_value_pairs = int(num_element_value_pairs, 16)
-                del data[0:2]
+                num_element_value_pairs = data.u2()
 
+                element_value_pairs = []
                 while num_element_value_pairs != 0:
 
-                    element_name_index = data[0] + data[1]
-                    element_name_index = int(element_name_index, 16)
-                    del data[0:2]
+                    element_name_index = data.u2()
 
-                    element_value = attribute_info.annotations()
-                    element_value.element_value_structure()
+                    element_value = attribute_info.annotations(data)
+                    element_value_pairs.append((element_name_index, element_value.element_value_structure()))
 
                     num_element_value_pairs = num_element_value_pairs - 1
 
+                annotations.append(Annotation(type_index, element_value_pairs))
                 num_annotations = num_annotations - 1
 
+            return annotations
+
         # The element value structure is not an attribute itself, but is utilized by multiple attribute types within the
         # classfile. Hence, it is defined in its own method.
         def element_value_structure(self):
-            global glob_path
-            global data
+            data = self.data
 
             consts = ["B", "C", "D", "F", "I", "J", "S", "Z", "s"]
 
-            hex_tag = data[0]
-            hex_tag = int(hex_tag, 16)
+            hex_tag = data.u1()
             tag = chr(hex_tag)
-            del data[0]
+            value = None
 
             if tag == "e":
-                type_name_index = data[0] + data[1]
-                type_name_index = int(type_name_index, 16)
-                del data[0:2]
+                type_name_index = data.u2()
 
-                const_name_index = data[0] + data[1]
-                const_name_index = int(const_name_index, 16)
-                del data[0:2]
+                const_name_index = data.u2()
+                value = (type_name_index, const_name_index)
 
             elif tag == "c":
-                class_info_index = data[0] + data[1]
-                class_info_index = int(class_info_index, 16)
-                del data[0:2]
+                class_info_index = data.u2()
+                value = class_info_index
 
             elif tag == "@":
-                type_index = data[0] + data[1]
-                type_index = int(type_index, 16)
-                del data[0:2]
+                type_index = data.u2()
 
-                num_element_value_pairs = data[0] + data[1]
-                num_element_value_pairs = int(num_element_value_pairs, 16)
-                del data[0:2]
+                num_element_value_pairs = data.u2()
 
+                element_value_pairs = []
                 while num_element_value_pairs != 0:
-                    element_name_index = data[0] + data[1]
-                    element_name_index = int(element_name_index, 16)
-                    del data[0:2]
+                    element_name_index = data.u2()
 
-                    nested_element_value = attribute_info.annotations()
-                    nested_element_value.element_value_structure()
+                    nested_element_value = attribute_info.annotations(data)
+                    element_value_pairs.append((element_name_index, nested_element_value.element_value_structure()))
 
                     num_element_value_pairs = num_element_value_pairs - 1
+                value = Annotation(type_index, element_value_pairs)
 
             elif tag == "[":
-                num_values = data[0] + data[1]
-                num_values = int(num_values, 16)
-                del data[0:2]
+                num_values = data.u2()
 
+                value = []
                 while num_values != 0:
-                    nested_info = attribute_info.annotations()
-                    nested_info.element_value_structure()
+                    nested_info = attribute_info.annotations(data)
+                    value.append(nested_info.element_value_structure())
                     num_values = num_values - 1
 
             else:
                 for constant in consts:
                     if tag == constant:
-                        const_value_index = data[0] + data[1]
-                        const_value_index = int(const_value_index, 16)
-                        del data[0:2]
-
-
-
-#import os
-#dir_path = r"RuntimeVisibleTypeAnnotations"
-#classlist = []
-#for cfile in os.scandir(dir_path):
-#    classlist.append(cfile)
-
-#for classfile in classlist:
-#    java_bytecode_disassembler(classfile, write=False)
-
-#java_bytecode_disassembler(r"ideaIU-2022.2.3.win\plugins\space\lib\space\circlet\code\review/QualityGateVMImpl.class", verbose=True, write=False, fail_check=False)
+                        const_value_index = data.u2()
+                        value = const_value_index
+
+            return ElementValue(tag, value)
+
+
+# Attribute dispatch----------------------------------------------------------------------------------------------------
+# attribute_info looks up the handler for each attribute by name instead of walking a chain of comparisons. The built-in
+# handlers read the attribute through the class_reader and return its object model.
+
+def _attribute_deprecated(info, attribute_length):
+    if attribute_length != 0:
+        print("ERROR: Attribute - Deprecated - length is greater than 0 bytes")
+        info.context.data.skip(attribute_length)
+    return Attribute(info.attribute_type)
+
+
+def _attribute_modulemainclass(info, attribute_length):
+    if info.context.log_files:
+        MMC = open("module_main_class.txt", 'a')
+        MMC.write(info.context.pathway + "\n")
+        MMC.close()
+    return ModuleMainClassAttribute(info.attribute_type, info.context.data.u2())
+
+
+BUILTIN_ATTRIBUTES = {
+    "Signature": lambda info, length: info.attribute_signature(info.storage),
+    "Deprecated": _attribute_deprecated,
+    "Synthetic": lambda info, length: Attribute(info.attribute_type),
+    "ConstantValue": lambda info, length: info.attribute_constantvalue(info.storage),
+    "RuntimeVisibleAnnotations": lambda info, length: AnnotationsAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_runtimevisibleannotations()),
+    "RuntimeInvisibleAnnotations": lambda info, length: AnnotationsAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_runtimevisibleannotations()),
+    "RuntimeVisibleParameterAnnotations": lambda info, length: ParameterAnnotationsAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_runtimeparameterannotations()),
+    "RuntimeInvisibleParameterAnnotations": lambda info, length: ParameterAnnotationsAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_runtimeparameterannotations()),
+    "RuntimeVisibleTypeAnnotations": lambda info, length: TypeAnnotationsAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_runtimetypeannotations()),
+    "RuntimeInvisibleTypeAnnotations": lambda info, length: TypeAnnotationsAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_runtimetypeannotations()),
+    "AnnotationDefault": lambda info, length: AnnotationDefaultAttribute(
+        info.attribute_type, attribute_info.annotations(info.context.data).attribute_annotationdefault()),
+    "SourceFile": lambda info, length: info.attribute_sourcefile(info.storage),
+    "Exceptions": lambda info, length: info.attribute_exceptions(info.storage),
+    "InnerClasses": lambda info, length: info.attribute_innerclasses(info.storage),
+    "BootstrapMethods": lambda info, length: info.attribute_bootstrapmethods(info.storage),
+    "Code": lambda info, length: info.attribute_code(info.storage),
+    "LineNumberTable": lambda info, length: info.attribute_linenumbertable(info.storage),
+    "LocalVariableTable": lambda info, length: info.attribute_localvariabletable(info.storage),
+    "LocalVariableTypeTable": lambda info, length: info.attribute_localvariabletypetable(info.storage),
+    "StackMapTable": lambda info, length: StackMapTableAttribute(
+        info.attribute_type, attribute_info.attribute_stackmaptable(info.storage, info.write, info.context.data).entries),
+    "EnclosingMethod": lambda info, length: info.attribute_enclosingmethod(info.storage),
+    "SourceDebugExtension": lambda info, length: info.attribute_sourcedebugextension(length, info.storage),
+    "MethodParameters": lambda info, length: info.attribute_methodparameters(info.storage),
+    "Module": lambda info, length: info.attribute_module(info.storage),
+    "ModulePackages": lambda info, length: info.attribute_modulepackages(info.storage),
+    "ModuleMainClass": _attribute_modulemainclass,
+    "NestHost": lambda info, length: info.attribute_nesthost(info.storage),
+    "NestMembers": lambda info, length: info.attribute_nestmembers(info.storage),
+    "Record": lambda info, length: info.attribute_record(info.storage),
+    "PermittedSubclasses": lambda info, length: info.attribute_permittedsubclasses(info.storage),
+}
+
+# Handlers for vendor attributes (Scala signatures, Kotlin metadata, GraalVM, ...) are added with
+# register_attribute_handler(). A registered handler is called as handler(name, info, constant_pool), where info is a
+# memoryview of the attribute bytes (convert it with bytes() to keep it), and returns the object to store in the model.
+# Registered handlers take precedence over the built-in ones. The batch interface runs in worker processes, so the
+# handlers should be registered when the module that defines them is imported.
+ATTRIBUTE_HANDLERS = {}
+
+
+def register_attribute_handler(name, handler):
+    ATTRIBUTE_HANDLERS[name] = handler
+
+
+def unregister_attribute_handler(name):
+    ATTRIBUTE_HANDLERS.pop(name, None)
+
+
+# resolve_attribute() maps an attribute_name_index to (name, kind, handler), where kind is "skip", "registered",
+# "builtin" or "unknown". The result is cached per class by attribute_info.
+def resolve_attribute(constant_pool, attribute_name_index, allowed):
+    attribute_type = constant_pool.utf8(attribute_name_index)
+    if allowed is not None and attribute_type not in allowed:
+        return attribute_type, "skip", None
+    handler = ATTRIBUTE_HANDLERS.get(attribute_type)
+    if handler is not None:
+        return attribute_type, "registered", handler
+    handler = BUILTIN_ATTRIBUTES.get(attribute_type)
+    if handler is not None:
+        return attribute_type, "builtin", handler
+    return attribute_type, "unknown", None
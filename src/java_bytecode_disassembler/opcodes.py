@@ -0,0 +1,200 @@
+import struct   # big-endian decoding of instruction operands
+
+# opcodes---------------------------------------------------------------------------------------------------------------
+# The JVM instruction set, built once when the module is imported. OPCODES is a 256-slot table indexed by the opcode
+# byte; every defined slot holds (mnemonic, layout) and undefined opcodes hold None. The layout describes the operands
+# that follow the opcode:
+#
+#     None                     no operands
+#     struct.Struct            fixed-size operands, unpacked in one call (e.g. ">H" for a constant pool index,
+#                              ">h" for a branch offset, ">HBB" for invokeinterface)
+#     "tableswitch"            variable-length instructions that are padded to a four byte boundary
+#     "lookupswitch"
+#     "wide"                   modifies the operand size of the instruction that follows it
+#
+# CONSTANT_OPERANDS marks the instructions whose first operand is a constant pool index (ldc, getfield, invoke*, new,
+# checkcast, ...); constant_operand() returns that index for a decoded instruction.
+#
+# decode_instructions() walks the code array of a Code attribute once and returns a list of (pc, opcode, operands)
+# tuples. Operands are signed or unsigned exactly as the JVM specification describes them.
+
+_s1 = struct.Struct(">b")     # byte immediate (bipush), or signed increment
+_u1 = struct.Struct(">B")     # local variable index, ldc index, array type
+_s2 = struct.Struct(">h")     # sipush immediate, 16-bit branch offset
+_u2 = struct.Struct(">H")     # constant pool index
+_s4 = struct.Struct(">i")     # 32-bit branch offset
+_iinc = struct.Struct(">Bb")                # local variable index, signed increment
+_invokeinterface = struct.Struct(">HBB")    # constant pool index, count, 0
+_invokedynamic = struct.Struct(">HBB")      # constant pool index, 0, 0
+_multianewarray = struct.Struct(">HB")      # constant pool index, dimensions
+_wide = struct.Struct(">BH")                # modified opcode, local variable index
+_wide_iinc = struct.Struct(">BHh")          # iinc, local variable index, signed increment
+_switch = struct.Struct(">iii")             # default, low/npairs, high (tableswitch only)
+
+_INSTRUCTIONS = (
+    # Constants
+    (0x00, "nop", None), (0x01, "aconst_null", None), (0x02, "iconst_m1", None), (0x03, "iconst_0", None),
+    (0x04, "iconst_1", None), (0x05, "iconst_2", None), (0x06, "iconst_3", None), (0x07, "iconst_4", None),
+    (0x08, "iconst_5", None), (0x09, "lconst_0", None), (0x0a, "lconst_1", None), (0x0b, "fconst_0", None),
+    (0x0c, "fconst_1", None), (0x0d, "fconst_2", None), (0x0e, "dconst_0", None), (0x0f, "dconst_1", None),
+    (0x10, "bipush", _s1), (0x11, "sipush", _s2), (0x12, "ldc", _u1), (0x13, "ldc_w", _u2), (0x14, "ldc2_w", _u2),
+    # Loads
+    (0x15, "iload", _u1), (0x16, "lload", _u1), (0x17, "fload", _u1), (0x18, "dload", _u1), (0x19, "aload", _u1),
+    (0x1a, "iload_0", None), (0x1b, "iload_1", None), (0x1c, "iload_2", None), (0x1d, "iload_3", None),
+    (0x1e, "lload_0", None), (0x1f, "lload_1", None), (0x20, "lload_2", None), (0x21, "lload_3", None),
+    (0x22, "fload_0", None), (0x23, "fload_1", None), (0x24, "fload_2", None), (0x25, "fload_3", None),
+    (0x26, "dload_0", None), (0x27, "dload_1", None), (0x28, "dload_2", None), (0x29, "dload_3", None),
+    (0x2a, "aload_0", None), (0x2b, "aload_1", None), (0x2c, "aload_2", None), (0x2d, "aload_3", None),
+    (0x2e, "iaload", None), (0x2f, "laload", None), (0x30, "faload", None), (0x31, "daload", None),
+    (0x32, "aaload", None), (0x33, "baload", None), (0x34, "caload", None), (0x35, "saload", None),
+    # Stores
+    (0x36, "istore", _u1), (0x37, "lstore", _u1), (0x38, "fstore", _u1), (0x39, "dstore", _u1),
+    (0x3a, "astore", _u1),
+    (0x3b, "istore_0", None), (0x3c, "istore_1", None), (0x3d, "istore_2", None), (0x3e, "istore_3", None),
+    (0x3f, "lstore_0", None), (0x40, "lstore_1", None), (0x41, "lstore_2", None), (0x42, "lstore_3", None),
+    (0x43, "fstore_0", None), (0x44, "fstore_1", None), (0x45, "fstore_2", None), (0x46, "fstore_3", None),
+    (0x47, "dstore_0", None), (0x48, "dstore_1", None), (0x49, "dstore_2", None), (0x4a, "dstore_3", None),
+    (0x4b, "astore_0", None), (0x4c, "astore_1", None), (0x4d, "astore_2", None), (0x4e, "astore_3", None),
+    (0x4f, "iastore", None), (0x50, "lastore", None), (0x51, "fastore", None), (0x52, "dastore", None),
+    (0x53, "aastore", None), (0x54, "bastore", None), (0x55, "castore", None), (0x56, "sastore", None),
+    # Stack
+    (0x57, "pop", None), (0x58, "pop2", None), (0x59, "dup", None), (0x5a, "dup_x1", None), (0x5b, "dup_x2", None),
+    (0x5c, "dup2", None), (0x5d, "dup2_x1", None), (0x5e, "dup2_x2", None), (0x5f, "swap", None),
+    # Math
+    (0x60, "iadd", None), (0x61, "ladd", None), (0x62, "fadd", None), (0x63, "dadd", None),
+    (0x64, "isub", None), (0x65, "lsub", None), (0x66, "fsub", None), (0x67, "dsub", None),
+    (0x68, "imul", None), (0x69, "lmul", None), (0x6a, "fmul", None), (0x6b, "dmul", None),
+    (0x6c, "idiv", None), (0x6d, "ldiv", None), (0x6e, "fdiv", None), (0x6f, "ddiv", None),
+    (0x70, "irem", None), (0x71, "lrem", None), (0x72, "frem", None), (0x73, "drem", None),
+    (0x74, "ineg", None), (0x75, "lneg", None), (0x76, "fneg", None), (0x77, "dneg", None),
+    (0x78, "ishl", None), (0x79, "lshl", None), (0x7a, "ishr", None), (0x7b, "lshr", None),
+    (0x7c, "iushr", None), (0x7d, "lushr", None), (0x7e, "iand", None), (0x7f, "land", None),
+    (0x80, "ior", None), (0x81, "lor", None), (0x82, "ixor", None), (0x83, "lxor", None), (0x84, "iinc", _iinc),
+    # Conversions
+    (0x85, "i2l", None), (0x86, "i2f", None), (0x87, "i2d", None), (0x88, "l2i", None), (0x89, "l2f", None),
+    (0x8a, "l2d", None), (0x8b, "f2i", None), (0x8c, "f2l", None), (0x8d, "f2d", None), (0x8e, "d2i", None),
+    (0x8f, "d2l", None), (0x90, "d2f", None), (0x91, "i2b", None), (0x92, "i2c", None), (0x93, "i2s", None),
+    # Comparisons
+    (0x94, "lcmp", None), (0x95, "fcmpl", None), (0x96, "fcmpg", None), (0x97, "dcmpl", None), (0x98, "dcmpg", None),
+    (0x99, "ifeq", _s2), (0x9a, "ifne", _s2), (0x9b, "iflt", _s2), (0x9c, "ifge", _s2), (0x9d, "ifgt", _s2),
+    (0x9e, "ifle", _s2), (0x9f, "if_icmpeq", _s2), (0xa0, "if_icmpne", _s2), (0xa1, "if_icmplt", _s2),
+    (0xa2, "if_icmpge", _s2), (0xa3, "if_icmpgt", _s2), (0xa4, "if_icmple", _s2), (0xa5, "if_acmpeq", _s2),
+    (0xa6, "if_acmpne", _s2),
+    # Control
+    (0xa7, "goto", _s2), (0xa8, "jsr", _s2), (0xa9, "ret", _u1), (0xaa, "tableswitch", "tableswitch"),
+    (0xab, "lookupswitch", "lookupswitch"), (0xac, "ireturn", None), (0xad, "lreturn", None),
+    (0xae, "freturn", None), (0xaf, "dreturn", None), (0xb0, "areturn", None), (0xb1, "return", None),
+    # References
+    (0xb2, "getstatic", _u2), (0xb3, "putstatic", _u2), (0xb4, "getfield", _u2), (0xb5, "putfield", _u2),
+    (0xb6, "invokevirtual", _u2), (0xb7, "invokespecial", _u2), (0xb8, "invokestatic", _u2),
+    (0xb9, "invokeinterface", _invokeinterface), (0xba, "invokedynamic", _invokedynamic), (0xbb, "new", _u2),
+    (0xbc, "newarray", _u1), (0xbd, "anewarray", _u2), (0xbe, "arraylength", None), (0xbf, "athrow", None),
+    (0xc0, "checkcast", _u2), (0xc1, "instanceof", _u2), (0xc2, "monitorenter", None), (0xc3, "monitorexit", None),
+    # Extended
+    (0xc4, "wide", "wide"), (0xc5, "multianewarray", _multianewarray), (0xc6, "ifnull", _s2),
+    (0xc7, "ifnonnull", _s2), (0xc8, "goto_w", _s4), (0xc9, "jsr_w", _s4),
+    # Reserved
+    (0xca, "breakpoint", None), (0xfe, "impdep1", None), (0xff, "impdep2", None),
+)
+
+OPCODES = [None] * 256
+for _opcode, _mnemonic, _layout in _INSTRUCTIONS:
+    OPCODES[_opcode] = (_mnemonic, _layout)
+
+MNEMONICS = [entry[0] if entry is not None else None for entry in OPCODES]    # opcode -> mnemonic
+_LAYOUTS = [entry[1] if entry is not None else None for entry in OPCODES]
+_DEFINED = [entry is not None for entry in OPCODES]
+CONSTANT_OPERANDS = [False] * 256
+for _opcode in (0x12, 0x13, 0x14, 0xb2, 0xb3, 0xb4, 0xb5, 0xb6, 0xb7, 0xb8, 0xb9, 0xba, 0xbb, 0xbd, 0xc0, 0xc1, 0xc5):
+    CONSTANT_OPERANDS[_opcode] = True
+_SIZES = [layout.size if isinstance(layout, struct.Struct) else 0 for layout in _LAYOUTS]
+
+
+def decode_instructions(code):
+    instructions = []
+    append = instructions.append
+    layouts = _LAYOUTS
+    sizes = _SIZES
+    defined = _DEFINED
+    end = len(code)
+    pc = 0
+    try:
+        while pc < end:
+            opcode = code[pc]
+            layout = layouts[opcode]
+            if layout is None:
+                if not defined[opcode]:
+                    raise ValueError("invalid opcode 0x" + format(opcode, "02x") + " at pc " + str(pc))
+                append((pc, opcode, ()))
+                pc += 1
+            elif sizes[opcode]:
+                append((pc, opcode, layout.unpack_from(code, pc + 1)))
+                pc += 1 + sizes[opcode]
+            else:
+                pc = _decode_variable(code, pc, opcode, append)
+    except (struct.error, IndexError):   # IndexError: a wide opcode is the last byte of the code array
+        raise EOFError("instruction at pc " + str(pc) + " runs past the end of the code array") from None
+    if pc != end:
+        raise EOFError("instruction at pc " + str(pc) + " runs past the end of the code array")
+    return instructions
+
+
+# _decode_variable() handles the three variable-length instructions and returns the pc of the next instruction.
+#
+#     tableswitch     (default, low, high, (offset, ...))
+#     lookupswitch    (default, ((match, offset), ...))
+#     wide            (opcode, index) or (iinc, index, increment)
+def _decode_variable(code, pc, opcode, append):
+    if opcode == 0xc4:
+        modified = code[pc + 1]
+        if modified == 0x84:
+            append((pc, opcode, _wide_iinc.unpack_from(code, pc + 1)))
+            return pc + 6
+        if _LAYOUTS[modified] is not _u1 or modified == 0x12 or modified == 0xbc:
+            raise ValueError("invalid wide instruction 0x" + format(modified, "02x") + " at pc " + str(pc))
+        append((pc, opcode, _wide.unpack_from(code, pc + 1)))
+        return pc + 4
+
+    # the operands of both switches start at the next multiple of four, counted from the start of the code array
+    start = (pc + 4) & ~3
+    if opcode == 0xaa:
+        default, low, high = _switch.unpack_from(code, start)
+        count = high - low + 1
+        if count < 0:
+            raise ValueError("invalid tableswitch bounds at pc " + str(pc))
+        offsets = struct.unpack_from(">" + str(count) + "i", code, start + 12)
+        append((pc, opcode, (default, low, high, offsets)))
+        return start + 12 + 4 * count
+
+    default, npairs = struct.unpack_from(">ii", code, start)
+    if npairs < 0:
+        raise ValueError("invalid lookupswitch pair count at pc " + str(pc))
+    flat = struct.unpack_from(">" + str(2 * npairs) + "i", code, start + 8)
+    append((pc, opcode, (default, tuple(zip(flat[0::2], flat[1::2])))))
+    return start + 8 + 8 * npairs
+
+
+def constant_operand(instruction):
+    if CONSTANT_OPERANDS[instruction[1]]:
+        return instruction[2][0]
+    return None
+
+
+# format_instruction() renders a decoded instruction as a single line of text, e.g. "12: invokevirtual 42"
+def format_instruction(instruction):
+    pc, opcode, operands = instruction
+    text = str(pc) + ": " + MNEMONICS[opcode]
+    if opcode == 0xc4:
+        return text + " " + " ".join([MNEMONICS[operands[0]]] + [str(value) for value in operands[1:]])
+    if opcode == 0xaa:
+        default, low, high, offsets = operands
+        return (text + " " + str(low) + " to " + str(high) + " " +
+                " ".join([str(low + index) + ":" + str(offset) for index, offset in enumerate(offsets)]) +
+                " default:" + str(default))
+    if opcode == 0xab:
+        default, pairs = operands
+        return (text + " " + str(len(pairs)) + " " +
+                " ".join([str(match) + ":" + str(offset) for match, offset in pairs]) + " default:" + str(default))
+    if operands:
+        return text + " " + " ".join([str(value) for value in operands])
+    return text
@@ -0,0 +1,145 @@
+import json      # structured output
+import math      # non-finite Float and Double constants
+import os
+import pickle    # compact binary output
+from array import array
+
+from .classfile import ConstantPool
+
+# output----------------------------------------------------------------------------------------------------------------
+# Structured output of disassembled classes. Instead of the 'deconst_class' directory tree (one small text file per
+# constant, per code attribute, ...), a class is written as exactly one file, encoded in memory and stored with a
+# single buffered write:
+#
+#     "json"      a JSON document ('.json')
+#     "binary"    the same document as a pickle of plain dicts, lists and bytes ('.bin'); it is smaller and faster to
+#                 load, and can be read without this package being installed
+#
+# write_jsonl() writes a whole batch of results into one JSON-Lines stream, one result per line.
+#
+# The document mirrors the object model in classfile.py: every object becomes a dict of its slots plus a "type" key
+# holding the class name, the constant pool becomes a list of its entries, and raw bytes become hex strings in JSON.
+# JSON has no NaN or infinities, so non-finite Float and Double constants are written as the strings Java prints for
+# them ("NaN", "Infinity", "-Infinity"); the binary format keeps them as floats.
+
+OUTPUT_FORMATS = ("json", "binary")
+OUTPUT_SUFFIXES = {"json": ".json", "binary": ".bin"}
+
+_slots = {}   # class -> names of all of its public slots, including the inherited ones
+
+
+def slots_of(cls):
+    names = _slots.get(cls)
+    if names is None:
+        names = []
+        for base in reversed(cls.__mro__):
+            for name in base.__dict__.get("__slots__", ()):
+                if name not in names and not name.startswith("_"):
+                    names.append(name)
+        _slots[cls] = names
+    return names
+
+
+# to_plain() converts a value of the object model into plain dicts, lists, strings and numbers
+def to_plain(value, binary=False):
+    if isinstance(value, float) and not binary and not math.isfinite(value):
+        return "NaN" if value != value else ("Infinity" if value > 0 else "-Infinity")
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value) if binary else bytes(value).hex()
+    if isinstance(value, (list, tuple, array)):
+        return [to_plain(item, binary) for item in value]
+    if isinstance(value, dict):
+        return {str(key): to_plain(item, binary) for key, item in value.items()}
+    if isinstance(value, ConstantPool):
+        return to_plain(value.entries, binary)
+    document = {"type": type(value).__name__}
+    for name in slots_of(type(value)):
+        document[name] = to_plain(getattr(value, name), binary)
+    return document
+
+
+def classfile_to_dict(classfile, binary=False):
+    return to_plain(classfile, binary)
+
+
+def result_to_dict(result, binary=False):
+    return {"path": result.path, "ok": result.ok, "error": result.error,
+            "classfile": to_plain(result.classfile, binary)}
+
+
+# dumps() encodes a ClassFile into the bytes of a single output file
+def dumps(classfile, format="json"):
+    if format == "json":
+        return json.dumps(to_plain(classfile), separators=(",", ":"), allow_nan=False).encode("utf-8")
+    if format == "binary":
+        return pickle.dumps(to_plain(classfile, binary=True), protocol=pickle.HIGHEST_PROTOCOL)
+    raise ValueError("ERROR: unknown output format '" + str(format) + "', expected one of " + ", ".join(OUTPUT_FORMATS))
+
+
+def loads(raw, format="json"):
+    if format == "json":
+        return json.loads(raw)
+    if format == "binary":
+        return pickle.loads(raw)
+    raise ValueError("ERROR: unknown output format '" + str(format) + "', expected one of " + ", ".join(OUTPUT_FORMATS))
+
+
+# write_classfile() stores the class in one file with one buffered write and returns the path of the file
+def write_classfile(classfile, pathway, format="json"):
+    encoded = dumps(classfile, format)
+    with open(pathway, "wb") as output:
+        output.write(encoded)
+    return pathway
+
+
+# output_name() picks the file name for a class written into an output directory: the binary name of the class with
+# the package separators replaced by dots (e.g. 'net.minecraft.bundler.Main.json'), or the file name of the input when
+# the class could not be disassembled far enough to know its name or its name can not be read from the constant pool
+def output_name(result, format="json"):
+    name = None
+    if result.classfile is not None and result.classfile.constant_pool is not None:
+        try:
+            name = result.classfile.this_class_name
+        except (ValueError, IndexError):
+            name = None
+    if name:
+        name = name.replace("/", ".")
+    else:
+        name = os.path.basename(str(result.path).replace("!/", "/")).removesuffix(".class")
+    return name + OUTPUT_SUFFIXES[format]
+
+
+# unique_name() returns the name unchanged the first time it is seen and 'name~2', 'name~3', ... (before the suffix)
+# after that. Names are compared case-insensitively, since they may end up on a case-insensitive file system.
+def unique_name(name, used):
+    stem, suffix = os.path.splitext(name)
+    candidate = name
+    count = 1
+    while candidate.casefold() in used:
+        count = count + 1
+        candidate = stem + "~" + str(count) + suffix
+    used.add(candidate.casefold())
+    return candidate
+
+
+# write_results() writes every successfully disassembled result into the directory, one file per class, and yields the
+# results back so that it can be chained onto iter_disassemble(). The same class can come from several inputs (e.g. a
+# copy in two archives); each copy gets its own file, named with unique_name() in the order of the results.
+def write_results(results, directory, format="json"):
+    os.makedirs(directory, exist_ok=True)
+    used = set()   # casefolded names of the files written so far
+    for result in results:
+        if result.ok:
+            name = unique_name(output_name(result, format), used)
+            write_classfile(result.classfile, os.path.join(directory, name), format)
+        yield result
+
+
+# write_jsonl() appends one JSON line per result (failed results included) to the given text stream and yields the
+# results back
+def write_jsonl(results, stream):
+    for result in results:
+        stream.write(json.dumps(result_to_dict(result), separators=(",", ":"), allow_nan=False) + "\n")
+        yield result
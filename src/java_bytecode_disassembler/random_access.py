@@ -0,0 +1,182 @@
+import mmap                             # zero-copy view of the class file
+import os
+import threading
+from collections import OrderedDict     # least recently used order of the open indexes
+
+from .classfile import MethodInfo
+from .java_bytecode_disassembler import MMAP_THRESHOLD, attribute_info, disassembler, parse_context
+from .reader import class_reader, map_stream
+
+# random_access---------------------------------------------------------------------------------------------------------
+# Random access to single methods and attributes of a class. A ClassIndex reads the class file (or keeps the bytes it
+# was given) and walks it once with every attribute skipped by its length, which costs the constant pool and
+# the field/method headers only. The offsets recorded by that walk (see OffsetMap in classfile.py) are then used to
+# jump straight to one method or attribute and decode nothing else:
+#
+#     index = open_class("Main.class")
+#     code = index.method("main", "([Ljava/lang/String;)V").code
+#
+# open_class() keeps the indexes of the most recently used files, so asking for another method of the same class does
+# not walk the file again. An index is rebuilt when the modification time or size of its file changes. Decoded methods
+# are cached on the index.
+#
+# Files below MMAP_THRESHOLD (which covers nearly every class) are read into bytes, so an index holds no handle on its
+# file and a compiler can replace the file while it is indexed; on Windows a mapped file can not be truncated or
+# replaced. Larger files are mapped, and their mapping is closed when open_class() drops the index from its cache.
+
+INDEX_CACHE_SIZE = 64   # number of indexes kept by open_class()
+
+
+def file_stamp(pathway):
+    stat = os.stat(pathway)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_file(pathway):
+    with open(pathway, "rb") as stream:
+        if os.fstat(stream.fileno()).st_size >= MMAP_THRESHOLD:
+            return map_stream(stream)
+        return stream.read()
+
+
+class ClassIndex:
+
+    __slots__ = ("pathway", "buffer", "stamp", "classfile", "dispatch", "decoded")
+
+    def __init__(self, pathway=None, source=None, name=None):
+        if source is None:
+            self.pathway = os.fspath(pathway)
+            self.stamp = file_stamp(self.pathway)
+            self.buffer = load_file(self.pathway)
+        else:
+            self.pathway = name if name is not None else "<memory>"
+            self.stamp = None
+            self.buffer = source
+        self.dispatch = {}   # attribute handlers resolved for this class (see parse_context.attribute_dispatch)
+        self.decoded = {}    # (name, descriptor) -> MethodInfo decoded by method()
+
+        # the allow-list is empty, so every attribute is skipped using its length
+        parser = disassembler(self.pathway, write=False, fail_check=False, source=self.buffer, attributes=())
+        if parser.classfile is None:
+            raise ValueError("ERROR: '" + self.pathway + "' could not be indexed\n" + str(parser.error))
+        self.classfile = parser.classfile   # constant pool, offsets and the members without their attributes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # close() unmaps the file; methods and attributes that were already decoded stay valid
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass   # a registered attribute handler still holds a view of the bytes; the mmap is closed with it
+
+    # stale() tells whether the file has changed since it was indexed
+    def stale(self):
+        if self.stamp is None:
+            return False
+        try:
+            return file_stamp(self.pathway) != self.stamp
+        except OSError:
+            return True
+
+    @property
+    def methods(self):
+        return [(method.name, method.descriptor) for method in self.classfile.methods]
+
+    def context(self, offset):
+        context = parse_context(self.pathway, False, False, None, False)
+        context.data = class_reader(self.buffer, offset)
+        context.constant_pool = self.classfile.constant_pool
+        context.attribute_dispatch = self.dispatch
+        context.unknown_attributes = self.classfile.unknown_attributes
+        return context
+
+    def find_method(self, name, descriptor=None):
+        for position, method in enumerate(self.classfile.methods):
+            if method.name == name and (descriptor is None or method.descriptor == descriptor):
+                return position
+        return None
+
+    # method() decodes one method_info structure, with all of its attributes, by seeking to its offset
+    def method(self, name, descriptor=None):
+        position = self.find_method(name, descriptor)
+        if position is None:
+            return None
+        header = self.classfile.methods[position]
+        key = (header.name, header.descriptor)
+        method = self.decoded.get(key)
+        if method is not None:
+            return method
+
+        method = MethodInfo(header.access_flags, header.name_index, header.descriptor_index, header.name,
+                            header.descriptor)
+        for offset, length in header.attribute_offsets:
+            attribute = attribute_info(self.context(offset), None).attribute
+            if attribute is not None:
+                method.attributes.append(attribute)
+            method.attribute_offsets.append((offset, length))
+        self.decoded[key] = method
+        return method
+
+    # method_attribute() decodes one named attribute of a method (e.g. "Code") and nothing else
+    def method_attribute(self, name, descriptor, attribute_name):
+        position = self.find_method(name, descriptor)
+        if position is None:
+            return None
+        return self.decode_attribute(self.classfile.methods[position].attribute_offsets, attribute_name)
+
+    # attribute() decodes one named class level attribute (e.g. "BootstrapMethods")
+    def attribute(self, attribute_name):
+        return self.decode_attribute(self.classfile.offsets.attributes, attribute_name)
+
+    def decode_attribute(self, offsets, attribute_name):
+        constant_pool = self.classfile.constant_pool
+        for offset, length in offsets:
+            context = self.context(offset)
+            attribute_name_index = context.data.u2()
+            if constant_pool.utf8(attribute_name_index) == attribute_name:
+                context.data.offset = offset
+                return attribute_info(context, None).attribute
+        return None
+
+
+_indexes = OrderedDict()   # real path -> ClassIndex, least recently used first
+_indexes_lock = threading.Lock()
+
+
+# open_class() returns the ClassIndex of a '.class' file, reusing the index built by an earlier call while the file is
+# unchanged. Indexes that are dropped from the cache (evicted, or replaced because their file changed) are closed: the
+# methods and attributes they decoded stay valid, but a mapped index can not decode anything new.
+def open_class(pathway):
+    key = os.path.realpath(pathway)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and not index.stale():
+            _indexes.move_to_end(key)
+            return index
+
+    index = ClassIndex(key)
+    dropped = []
+    with _indexes_lock:
+        previous = _indexes.pop(key, None)
+        if previous is not None:
+            dropped.append(previous)
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            dropped.append(_indexes.popitem(last=False)[1])
+    for previous in dropped:
+        previous.close()
+    return index
+
+
+def clear_index_cache():
+    with _indexes_lock:
+        dropped = list(_indexes.values())
+        _indexes.clear()
+    for index in dropped:
+        index.close()
@@ -0,0 +1,101 @@
+import mmap     # memory-mapped input for large class files and archives
+import os
+import struct   # big-endian decoding of the multi-byte values found in '.class' files
+import sys
+from array import array   # bulk decoding of u2 tables
+
+# class_reader----------------------------------------------------------------------------------------------------------
+# The java classfile format is a stream of big-endian unsigned integers (u1, u2 and u4) interleaved with raw byte
+# strings. The class_reader wraps the raw bytes of a '.class' file in a memoryview and walks over them with a simple
+# integer cursor. Nothing is copied or removed from the underlying buffer while reading; each read only moves the
+# cursor forward, so a class file of any size is processed in linear time.
+
+_u2 = struct.Struct(">H")
+_u4 = struct.Struct(">I")
+_u8 = struct.Struct(">Q")
+_swap = sys.byteorder == "little"   # array('H') holds native byte order, the class file is big-endian
+
+
+class class_reader:
+
+    __slots__ = ("buffer", "offset")
+
+    def __init__(self, source, offset=0):
+        self.buffer = memoryview(source)   # zero-copy view of the raw bytes (bytes, bytearray, mmap, ...)
+        if self.buffer.format != "B" or self.buffer.ndim != 1:
+            self.buffer = self.buffer.cast("B")
+        self.offset = offset               # position of the next unread byte
+
+    def u1(self):
+        try:
+            value = self.buffer[self.offset]
+        except IndexError:
+            raise EOFError("unexpected end of class file at byte " + str(self.offset)) from None
+        self.offset += 1
+        return value
+
+    def u2(self):
+        try:
+            value = _u2.unpack_from(self.buffer, self.offset)[0]
+        except struct.error:
+            raise EOFError("unexpected end of class file at byte " + str(self.offset)) from None
+        self.offset += 2
+        return value
+
+    def u4(self):
+        try:
+            value = _u4.unpack_from(self.buffer, self.offset)[0]
+        except struct.error:
+            raise EOFError("unexpected end of class file at byte " + str(self.offset)) from None
+        self.offset += 4
+        return value
+
+    def u8(self):
+        try:
+            value = _u8.unpack_from(self.buffer, self.offset)[0]
+        except struct.error:
+            raise EOFError("unexpected end of class file at byte " + str(self.offset)) from None
+        self.offset += 8
+        return value
+
+    # read() returns a memoryview slice of the underlying buffer; callers that need to keep the data after the parse
+    # has finished should convert it with bytes().
+    def read(self, length):
+        end = self.offset + length
+        if end > len(self.buffer):
+            raise EOFError("unexpected end of class file at byte " + str(self.offset))
+        value = self.buffer[self.offset:end]
+        self.offset = end
+        return value
+
+    # table() decodes count fixed-width records (e.g. the entries of a LineNumberTable) in a single pass and returns
+    # them as a list of tuples; record is the struct.Struct of one entry
+    def table(self, record, count):
+        return list(record.iter_unpack(self.read(record.size * count)))
+
+    # u2_array() decodes count consecutive u2 values (e.g. the class indexes of a NestMembers attribute) in a single pass
+    def u2_array(self, count):
+        values = array("H")
+        values.frombytes(self.read(2 * count))
+        if _swap:
+            values.byteswap()
+        return values
+
+    # skip() moves the cursor over data that does not need to be decoded
+    def skip(self, length):
+        end = self.offset + length
+        if end > len(self.buffer):
+            raise EOFError("unexpected end of class file at byte " + str(self.offset))
+        self.offset = end
+
+    def remaining(self):
+        return len(self.buffer) - self.offset
+
+
+# map_stream() maps an open file read-only into memory. The class_reader works on the mapping directly, so no copy of the
+# file is made and the pages are only read from disk as the parser reaches them. Empty files can not be mapped and are
+# returned as empty bytes.
+def map_stream(stream):
+    if os.fstat(stream.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
@@ -0,0 +1,51 @@
+import os
+import struct
+import zipfile
+
+import pytest
+
+from java_bytecode_disassembler.benchmark.generator import attribute, constant_pool_builder
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+# make_corpus builds a corpus directory inside tmp_path, which is also made the working directory so that default output
+# files land there. The layout maps relative paths to their content: "class" for a copy of Main.class, "broken" for a
+# truncated one, bytes for any other file, and a dict (a layout of its own) for an archive.
+@pytest.fixture
+def make_corpus(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main_class = open(MAIN_CLASS, "rb").read()
+    contents = {"class": main_class, "broken": main_class[:100]}
+
+    def make(layout, root="corpus"):
+        root = tmp_path / root
+        root.mkdir()
+        for name, content in layout.items():
+            pathway = root / name
+            pathway.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(content, dict):
+                with zipfile.ZipFile(pathway, "w") as archive:
+                    for entry, entry_content in content.items():
+                        archive.writestr(entry, contents.get(entry_content, entry_content))
+            else:
+                pathway.write_bytes(contents.get(content, content))
+        return root
+
+    return make
+
+
+# broken_class is a class that parses, but whose constant pool references are broken: the name of its super class is an
+# Integer constant, and its method run() calls a Methodref whose class_index points at a Utf8 entry
+@pytest.fixture
+def broken_class():
+    pool = constant_pool_builder()
+    this_class = pool.class_ref("test/Broken")
+    super_class = pool.add(("Class", "broken"), struct.pack(">BH", 7, pool.integer(1)))
+    methodref = pool.add(("Methodref", "broken"), struct.pack(">BHH", 10, pool.utf8("test/Broken"),
+                                                              pool.name_and_type("run", "()V")))
+    code = struct.pack(">BHB", 0xb8, methodref, 0xb1)   # invokestatic #methodref; return
+    method = (struct.pack(">HHHH", 0x0009, pool.utf8("run"), pool.utf8("()V"), 1) +
+              attribute(pool.utf8("Code"), struct.pack(">HHI", 1, 0, len(code)) + code + struct.pack(">HH", 0, 0)))
+    return (struct.pack(">IHH", 0xcafebabe, 0, 61) + pool.encode() +
+            struct.pack(">HHHHHH", 0x0021, this_class, super_class, 0, 0, 1) + method + struct.pack(">H", 0))
@@ -0,0 +1,96 @@
+import io
+import os
+import zipfile
+
+from java_bytecode_disassembler import disassemble_archive, disassemble_many, iter_archive_classes
+from java_bytecode_disassembler.archive import read_entry
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def make_jar(target):
+    main_class = open(MAIN_CLASS, "rb").read()
+
+    nested = io.BytesIO()
+    with zipfile.ZipFile(nested, "w") as archive:
+        archive.writestr("lib/Util.class", main_class)
+
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+        archive.writestr("net/minecraft/bundler/", "")
+        archive.writestr("net/minecraft/bundler/Main.class", main_class)
+        archive.writestr("net/minecraft/bundler/Broken.class", main_class[:100])
+        archive.writestr("WEB-INF/lib/util.jar", nested.getvalue())
+    return target
+
+
+def test_iter_archive_classes_reads_entries_in_memory(tmp_path):
+    jar = make_jar(tmp_path / "app.jar")
+
+    entries = list(iter_archive_classes(jar))
+
+    assert [name for name, data in entries] == [
+        str(jar) + "!/net/minecraft/bundler/Main.class",
+        str(jar) + "!/net/minecraft/bundler/Broken.class",
+        str(jar) + "!/WEB-INF/lib/util.jar!/lib/Util.class",
+    ]
+    assert entries[0][1] == open(MAIN_CLASS, "rb").read()
+
+
+def test_disassemble_archive_from_file_object(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jar = make_jar(io.BytesIO())
+
+    results = list(disassemble_archive(jar, name="app.jar"))
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[0].classfile.this_class_name == "net/minecraft/bundler/Main"
+    assert "EOFError" in results[1].error
+    assert os.listdir(tmp_path) == []   # nothing is extracted or written
+
+
+def test_batch_expands_archives(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    make_jar(corpus / "app.war")
+    (corpus / "bad.jar").write_bytes(b"not a zip file")
+
+    serial = disassemble_many(corpus, workers=1)
+    parallel = disassemble_many(corpus, workers=2, chunksize=1)
+
+    assert [os.path.basename(result.path) for result in serial] == [
+        "Main.class", "Broken.class", "Util.class", "bad.jar"]
+    assert [result.ok for result in serial] == [True, False, True, False]
+    assert "BadZipFile" in serial[3].error
+    assert [result.path for result in parallel] == [result.path for result in serial]
+    assert [result.ok for result in parallel] == [result.ok for result in serial]
+
+
+def test_version_scan_of_archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jar = make_jar(tmp_path / "app.jar")
+
+    results = disassemble_many(jar, workers=1, scan="version")
+
+    assert [result.ok for result in results] == [True, True, True]
+    assert {result.classfile.major_version for result in results} == {61}
+
+
+def test_stored_entries_are_read_zero_copy(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main_class = open(MAIN_CLASS, "rb").read()
+    jar = tmp_path / "stored.jar"
+    with zipfile.ZipFile(jar, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("a/Main.class", main_class)
+        archive.writestr("b/Main.class", main_class, compress_type=zipfile.ZIP_DEFLATED)
+
+    with zipfile.ZipFile(jar) as archive:
+        stored, deflated = archive.infolist()
+        view = read_entry(archive, stored, zero_copy=True)
+        assert isinstance(view, memoryview) and view == main_class
+        assert read_entry(archive, stored, scan="version", zero_copy=True) == main_class[:8]
+        assert read_entry(archive, deflated, zero_copy=True) == main_class
+
+    assert [result.ok for result in disassemble_archive(jar)] == [True, True]
+    assert [result.ok for result in disassemble_many(jar, workers=1)] == [True, True]
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from java_bytecode_disassembler import disassemble_many
+from java_bytecode_disassembler.__main__ import main
+
+LAYOUT = {"a/b/Main" + str(index) + ".class": "class" for index in range(5)}
+LAYOUT.update({"a/Broken.class": "broken", "a/notes.txt": b"not a class file"})
+
+
+def test_disassemble_many_collects_results_and_errors(make_corpus):
+    corpus = make_corpus(LAYOUT)
+
+    results = disassemble_many([corpus], workers=2, chunksize=2)
+
+    assert len(results) == 6
+    failed = [result for result in results if not result.ok]
+    assert [os.path.basename(result.path) for result in failed] == ["Broken.class"]
+    assert "EOFError" in failed[0].error
+    assert all(result.classfile.this_class_name == "net/minecraft/bundler/Main" for result in results if result.ok)
+
+
+def test_serial_and_parallel_results_match(make_corpus):
+    corpus = make_corpus(LAYOUT)
+
+    serial = disassemble_many(corpus, workers=1)
+    parallel = disassemble_many(corpus, workers=2, chunksize=1)
+    assert [result.path for result in serial] == [result.path for result in parallel]
+    assert [result.ok for result in serial] == [result.ok for result in parallel]
+
+
+def test_command_line_reports_failures(make_corpus, capsys):
+    corpus = make_corpus(LAYOUT)
+
+    assert main(["-j", "1", str(corpus)]) == 1
+    captured = capsys.readouterr()
+    assert "Disassembled 6 classes (1 failed)" in captured.out
+    assert "Broken.class" in captured.err
+
+
+@pytest.mark.parametrize("option", ["-j", "--chunksize"])
+@pytest.mark.parametrize("value", ["0", "-2"])
+def test_command_line_rejects_non_positive_counts(capsys, option, value):
+    with pytest.raises(SystemExit) as raised:
+        main([option, value, "Main.class"])
+    assert raised.value.code == 2
+    assert "must be at least 1" in capsys.readouterr().err
@@ -0,0 +1,52 @@
+import pytest
+
+from java_bytecode_disassembler import disassemble_bytes
+from java_bytecode_disassembler.benchmark import DIMENSIONS, flagged_phases, generate_class, growth_exponent, scale
+from java_bytecode_disassembler.benchmark.__main__ import main
+
+
+@pytest.mark.parametrize("dimension", DIMENSIONS)
+def test_generated_class_parses(dimension):
+    classfile = disassemble_bytes(generate_class(**{dimension: 12}))
+    assert classfile is not None
+    assert classfile.this_class_name == "benchmark/Generated"
+    if dimension == "methods":
+        assert len(classfile.methods) == 12
+
+
+def test_growth_exponent():
+    sizes = [100, 200, 400, 800]
+    assert growth_exponent(sizes, [size * 1e-6 for size in sizes]) == pytest.approx(1.0)
+    assert growth_exponent(sizes, [size * size * 1e-9 for size in sizes]) == pytest.approx(2.0)
+    assert growth_exponent([100], [1.0]) is None
+
+
+def test_scale_reports_every_phase():
+    report = scale("code_length", steps=2, start=100, repeat=1)
+    assert report["sizes"] == [100, 200]
+    phases = report["phases"]
+    for phase in ("total", "constant_pool", "methods", "attribute_code", "decode_instructions", "stackmaptable"):
+        assert len(phases[phase]["times"]) == 2
+        assert phases[phase]["memory"][-1] is not None
+
+    # the parser methods are restored afterwards
+    assert disassemble_bytes(generate_class()) is not None
+
+
+def test_scale_flags_quadratic_phase(monkeypatch):
+    from java_bytecode_disassembler.benchmark import runner
+
+    def fake_measure(source, repeat=3, memory=True):
+        size = len(source)
+        return {"total": {"time": size * 1e-6, "calls": 1, "memory": None},
+                "slow": {"time": size * size * 1e-6, "calls": 1, "memory": None}}
+
+    monkeypatch.setattr(runner, "measure", fake_measure)
+    assert flagged_phases(scale("constants", steps=3, start=2000)) == ["slow"]
+    with pytest.raises(ValueError):
+        scale("unknown")
+
+
+def test_command_line(capsys):
+    assert main(["--dimension", "methods", "--steps", "2", "--start", "2", "--repeat", "1", "--no-memory"]) == 0
+    assert "attribute_code" in capsys.readouterr().out
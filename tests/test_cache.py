@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from java_bytecode_disassembler import ResultCache, disassemble_many
+from java_bytecode_disassembler.__main__ import main
+from java_bytecode_disassembler.cache import cache_key
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+LAYOUT = {"Main" + str(index) + ".class": "class" for index in range(3)}
+LAYOUT["Broken.class"] = "broken"
+
+
+def test_cache_hits_on_second_run(tmp_path, make_corpus):
+    corpus = make_corpus(LAYOUT)
+
+    cache = ResultCache(tmp_path / "cache")
+    first = disassemble_many(corpus, workers=1, cache=cache)
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 1)   # Main1 and Main2 hit the entry stored for Main0
+
+    cache = ResultCache(tmp_path / "cache")
+    second = disassemble_many(corpus, workers=2, chunksize=1, cache=cache)
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert [result.path for result in second] == [result.path for result in first]
+    assert [result.ok for result in second] == [False, True, True, True]
+    assert [result.classfile.name for result in second[1:]] == [result.path for result in second[1:]]
+    assert second[1].classfile.method("main").code.max_stack == 2
+
+
+def test_dedupe_parses_identical_classes_once(make_corpus):
+    corpus = make_corpus(LAYOUT)
+
+    results = disassemble_many(corpus, workers=2, chunksize=1, dedupe=True)
+    assert [result.ok for result in results] == [False, True, True, True]
+    assert [result.classfile.name for result in results[1:]] == [result.path for result in results[1:]]
+    assert results[1].classfile.methods is results[2].classfile.methods
+
+    with pytest.raises(ValueError):
+        disassemble_many(corpus, write=True, dedupe=True)
+
+
+def test_cache_key_and_eviction(tmp_path):
+    raw = open(MAIN_CLASS, "rb").read()
+    assert cache_key(raw) == cache_key(bytearray(raw))
+    assert cache_key(raw) != cache_key(raw, scan="header")
+    assert cache_key(raw, attributes=["Code", "SourceFile"]) == cache_key(raw, attributes=["SourceFile", "Code"])
+
+    cache = ResultCache(tmp_path / "cache", max_bytes=250)
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 100)
+    assert cache.get("a") == "x" * 100     # "a" is now the most recently used entry
+    cache.put("c", "z" * 100)
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert sorted(os.listdir(tmp_path / "cache")) == ["a.pickle", "c.pickle"]
+    assert len(ResultCache(tmp_path / "cache", max_bytes=250)) == 2
+
+
+@pytest.mark.parametrize("option", [["--cache", "cache"], ["--dedupe"]])
+def test_command_line_rejects_write_with_cache_or_dedupe(capsys, option):
+    with pytest.raises(SystemExit) as raised:
+        main(["--write"] + option + ["Main.class"])
+    assert raised.value.code == 2
+    assert "--write can not be combined" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+import os
+import zipfile
+
+from java_bytecode_disassembler import CallGraph, build_call_graph
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+MAIN = "net/minecraft/bundler/Main"
+RUN = MAIN + ".run:([Ljava/lang/String;)V"
+READ_RESOURCE = MAIN + ".readResource:(Ljava/lang/String;Lnet/minecraft/bundler/Main$ResourceParser;)Ljava/lang/Object;"
+
+
+def test_call_graph_of_a_class(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    graph = build_call_graph([MAIN_CLASS], workers=1)
+
+    assert graph.classes == 1 and graph.failed == []
+    assert graph.calls_from(MAIN + ".main:([Ljava/lang/String;)V") == [
+        (MAIN + ".<init>:()V", "invokespecial"), (RUN, "invokevirtual")]
+    assert set(graph.callers_of(READ_RESOURCE)) == {
+        RUN, MAIN + ".readAndExtractDir:(Ljava/lang/String;Ljava/nio/file/Path;Ljava/util/List;)V"}
+    assert graph.callers_of((MAIN, "readResource",
+                             "(Ljava/lang/String;Lnet/minecraft/bundler/Main$ResourceParser;)Ljava/lang/Object;")) == \
+        graph.callers_of(READ_RESOURCE)
+
+    # invokedynamic call sites point at the body of the lambda
+    lambda_body = MAIN + ".lambda$run$0:(Ljava/lang/String;Ljava/net/URLClassLoader;[Ljava/lang/String;)V"
+    assert (lambda_body, "invokedynamic") in graph.calls_from(RUN)
+    assert graph.callers_of("unknown.method:()V") == []
+
+    node = graph.ids[READ_RESOURCE]
+    assert graph.names[node] == READ_RESOURCE
+    assert sorted(graph.caller_ids(node)) == sorted(graph.ids[key] for key in graph.callers_of(READ_RESOURCE))
+
+
+def test_call_graph_of_an_archive_and_incremental_edges(tmp_path, monkeypatch, broken_class):
+    monkeypatch.chdir(tmp_path)
+    for name in ("app.jar", "copy.jar"):   # the copy of Main in the second archive adds no edges
+        with zipfile.ZipFile(tmp_path / name, "w") as archive:
+            archive.writestr("net/minecraft/bundler/Main.class", open(MAIN_CLASS, "rb").read())
+    with zipfile.ZipFile(tmp_path / "app.jar", "a") as archive:
+        archive.writestr("Broken.class", b"\xca\xfe\xba\xbe")
+        archive.writestr("test/Broken.class", broken_class)
+
+    graph = build_call_graph(tmp_path, workers=1)
+    assert graph.classes == 1 and len(graph.failed) == 2
+    assert not any(key.startswith("test/Broken.") for key in graph.names)
+    edges = graph.edge_count
+    assert edges == build_call_graph([MAIN_CLASS], workers=1).edge_count
+    assert graph.callers_of(READ_RESOURCE)
+
+    # adding edges after a query rebuilds the adjacency
+    caller = graph.node("test/Caller.call:()V")
+    graph.add_edge(caller, graph.ids[READ_RESOURCE], 0xb8)
+    assert graph.edge_count == edges + 1
+    assert "test/Caller.call:()V" in graph.callers_of(READ_RESOURCE)
+    assert graph.calls_from(caller) == [(READ_RESOURCE, "invokestatic")]
+
+    empty = CallGraph()
+    assert len(empty) == 0 and empty.callees_of("a.b:()V") == []
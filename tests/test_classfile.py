@@ -0,0 +1,304 @@
+import os
+import pickle
+
+import pytest
+
+from java_bytecode_disassembler import (Attribute, disassemble, disassemble_bytes, disassembler,
+                                       register_attribute_handler, unregister_attribute_handler)
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_disassemble_returns_object_model(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    classfile = disassemble(MAIN_CLASS)
+
+    assert classfile.magic == "cafebabe"
+    assert classfile.major_version == 61
+    assert classfile.this_class_name == "net/minecraft/bundler/Main"
+    assert classfile.super_class_name == "java/lang/Object"
+    assert classfile.interface_names == []
+    assert not os.path.exists(tmp_path / "deconst_class")
+
+    main = classfile.method("main", "([Ljava/lang/String;)V")
+    assert main is not None
+    assert main.code.max_stack == 2
+    assert len(main.code.code) == 12
+    assert main.flag_names == ["ACC_PUBLIC", "ACC_STATIC"]
+    assert main.code.attribute("LineNumberTable").line_number_table
+
+    read_resource = classfile.method("readResource")
+    assert [(entry.start_pc, entry.end_pc, entry.handler_pc) for entry in read_resource.code.exception_table] == \
+        [(17, 63, 76), (83, 88, 91)]
+
+    assert classfile.attribute("SourceFile") is not None
+    assert classfile.attribute("BootstrapMethods").bootstrap_methods
+
+
+def test_write_mode_still_builds_object_model(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = disassembler(MAIN_CLASS)
+    assert result.error is None
+    assert len(result.classfile.methods) == 11
+    assert os.path.exists(tmp_path / "deconst_class" / "Main" / "code_1" / "code.txt")
+
+
+def test_lazy_methods_decode_code_on_first_access(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    eager = disassemble(MAIN_CLASS)
+    lazy = disassemble(MAIN_CLASS, lazy=True)
+
+    assert [(method.name, method.descriptor) for method in lazy.methods] == \
+        [(method.name, method.descriptor) for method in eager.methods]
+    assert [method.attribute_offsets for method in lazy.methods] == [method.attribute_offsets for method in eager.methods]
+    assert not any(method.decoded for method in lazy.methods)
+
+    read_resource = lazy.method("readResource")
+    assert read_resource.attribute("Exceptions") is not None   # the other attributes are decoded up front
+    assert not read_resource.decoded
+    code = read_resource.code
+    assert read_resource.decoded and read_resource.code is code
+    assert code.instructions == eager.method("readResource").code.instructions
+
+    # pickling decodes the remaining methods instead of pickling the class bytes
+    restored = pickle.loads(pickle.dumps(lazy))
+    assert all(method.decoded for method in restored.methods)
+    assert [len(method.attributes) for method in restored.methods] == [len(method.attributes) for method in eager.methods]
+
+    with pytest.raises(ValueError):
+        disassembler(MAIN_CLASS, write=True, lazy=True)
+
+
+def test_failed_disassembly_reports_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    broken = tmp_path / "Broken.class"
+    broken.write_bytes(open(MAIN_CLASS, "rb").read()[:200])
+    result = disassembler(str(broken), write=False, fail_check=False)
+    assert result.classfile is None
+    assert "EOFError" in result.error
+
+
+def test_this_class_must_be_a_class_entry():
+    import struct
+
+    from java_bytecode_disassembler.benchmark.generator import constant_pool_builder
+
+    pool = constant_pool_builder()
+    this_class = pool.class_ref("test/Named")
+    name = pool.utf8("test/Named")
+    super_class = pool.class_ref("java/lang/Object")
+
+    def build(index):
+        return (struct.pack(">IHH", 0xcafebabe, 0, 61) + pool.encode() +
+                struct.pack(">HHHHHHH", 0x0021, index, super_class, 0, 0, 0, 0))
+
+    assert disassemble_bytes(build(this_class)).this_class_name == "test/Named"
+    for index in (name, 0, pool.count):
+        result = disassembler("broken", write=False, fail_check=False, source=build(index)).result()
+        assert result.classfile is None and "this_class" in result.error
+
+
+def test_disassemble_bytes_does_not_touch_the_filesystem(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = open(MAIN_CLASS, "rb").read()
+
+    for source in (raw, bytearray(raw), memoryview(raw)):
+        classfile = disassemble_bytes(source, name="net/minecraft/bundler/Main")
+        assert classfile.name == "net/minecraft/bundler/Main"
+        assert classfile.this_class_name == "net/minecraft/bundler/Main"
+        assert classfile.method("main").code.max_stack == 2
+
+    assert disassemble_bytes(raw[:100]) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_header_and_version_scans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    header = disassemble(MAIN_CLASS, scan="header")
+    assert header.this_class_name == "net/minecraft/bundler/Main"
+    assert header.super_class_name == "java/lang/Object"
+    assert header.fields == [] and header.methods == [] and header.attributes == []
+
+    version = disassemble(MAIN_CLASS, scan="version")
+    assert (version.magic, version.major_version, version.minor_version) == ("cafebabe", 61, 0)
+    assert version.constant_pool is None
+
+    # the version scan only needs the first 8 bytes
+    assert disassemble_bytes(open(MAIN_CLASS, "rb").read()[:8], scan="version").major_version == 61
+
+
+def test_attribute_allow_list(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    classfile = disassemble(MAIN_CLASS, attributes=["Code", "LineNumberTable"])
+    main = classfile.method("main")
+    assert [attribute.name for attribute in main.attributes] == ["Code"]
+    assert [attribute.name for attribute in main.code.attributes] == ["LineNumberTable"]
+    assert classfile.attributes == []
+
+    # nested attributes are skipped together with their Code attribute
+    classfile = disassemble(MAIN_CLASS, attributes=["LineNumberTable", "SourceFile"])
+    assert classfile.method("main").code is None
+    assert [attribute.name for attribute in classfile.attributes] == ["SourceFile"]
+
+
+class VendorAttribute(Attribute):
+
+    __slots__ = ("source_file",)
+
+    def __init__(self, name, source_file):
+        Attribute.__init__(self, name)
+        self.source_file = source_file
+
+
+def test_unknown_and_registered_attributes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # rename the SourceFile attribute so that no built-in handler recognises it
+    raw = open(MAIN_CLASS, "rb").read().replace(b"SourceFile", b"VendorAttr")
+
+    classfile = disassemble_bytes(raw)
+    assert classfile.unknown_attributes == {"VendorAttr": 1}
+    assert len(classfile.attribute("VendorAttr").info) == 2
+
+    register_attribute_handler("VendorAttr", lambda name, info, constant_pool: VendorAttribute(
+        name, constant_pool.utf8(int.from_bytes(info, "big"))))
+    try:
+        classfile = disassemble_bytes(raw)
+    finally:
+        unregister_attribute_handler("VendorAttr")
+    assert classfile.unknown_attributes == {}
+    assert classfile.attribute("VendorAttr").source_file == "Main.java"
+    assert not os.path.exists(tmp_path / "UnidentifiedAttribute.txt")
+
+
+def test_concurrent_disassembly_in_threads(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.chdir(tmp_path)
+    raw = open(MAIN_CLASS, "rb").read()
+    renamed = raw.replace(b"SourceFile", b"VendorAttr")
+
+    def parse(index):
+        classfile = disassemble_bytes(renamed if index % 2 else raw, name=str(index))
+        return classfile.name, classfile.unknown_attributes, classfile.method("readResource").code.exception_table
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse, range(64)))
+
+    for index, (name, unknown_attributes, exception_table) in enumerate(results):
+        assert name == str(index)
+        assert unknown_attributes == ({"VendorAttr": 1} if index % 2 else {})
+        assert [(entry.start_pc, entry.end_pc) for entry in exception_table] == [(17, 63), (83, 88)]
+
+
+def test_compact_constant_pool():
+    import struct
+
+    from java_bytecode_disassembler.benchmark.generator import constant_pool_builder
+
+    pool = constant_pool_builder()
+    this_class = pool.class_ref("test/Constants")
+    super_class = pool.class_ref("java/lang/Object")
+    negative = pool.integer(-1)
+    single = pool.add(("Float", 1.5), struct.pack(">Bf", 4, 1.5))
+    wide = pool.add(("Long", -2), struct.pack(">Bq", 5, -2), slots=2)
+    double = pool.add(("Double", 0.25), struct.pack(">Bd", 6, 0.25), slots=2)
+    text = pool.utf8("café")
+    raw = (struct.pack(">IHH", 0xcafebabe, 0, 61) + pool.encode() +
+           struct.pack(">HHHHHHH", 0x0021, this_class, super_class, 0, 0, 0, 0))
+
+    classfile = disassemble_bytes(raw)
+    constant_pool = classfile.constant_pool
+    assert len(constant_pool) == pool.count
+    assert constant_pool.value(negative) == -1
+    assert constant_pool.value(single) == 1.5
+    assert constant_pool.value(wide) == -2
+    assert constant_pool.value(double) == 0.25
+    assert constant_pool[0] == ["reserved"]
+    assert constant_pool[wide] == ["Constant_Long", -2]
+    assert constant_pool[wide + 1] == "longspace"
+    assert constant_pool[double + 1] == "doublespace"
+    assert constant_pool.tag(wide + 1) is None
+    assert constant_pool.tag(this_class) == "Constant_Class"
+    assert constant_pool.class_name(this_class) == "test/Constants"
+    assert constant_pool.utf8(text) == "café"
+    assert constant_pool.utf8(text) is constant_pool.utf8(text)
+    assert classfile.offsets.constant(wide + 1) is None
+    offset, length = classfile.offsets.constant(wide)
+    assert length == 9 and raw[offset] == 5
+    with pytest.raises(ValueError):
+        constant_pool.utf8(negative)
+
+    # an unknown tag cannot be skipped, since its length is unknown
+    broken = raw.replace(struct.pack(">Bf", 4, 1.5), struct.pack(">Bf", 2, 1.5))
+    assert disassembler("broken", write=False, fail_check=False, source=broken).classfile is None
+
+
+def test_resolve_references_and_instruction_operands(tmp_path, monkeypatch):
+    from java_bytecode_disassembler.opcodes import MNEMONICS
+
+    monkeypatch.chdir(tmp_path)
+    classfile = disassemble_bytes(open(MAIN_CLASS, "rb").read())
+    constant_pool = classfile.constant_pool
+
+    resolved = [(MNEMONICS[instruction[1]], constant_pool.resolve_instruction(instruction))
+                for method in classfile.methods if method.code is not None
+                for instruction in method.code.instructions]
+    assert ("new", "net/minecraft/bundler/Main") in resolved
+    assert ("invokespecial", ("net/minecraft/bundler/Main", "<init>", "()V")) in resolved
+    assert ("ldc", "main-class") in resolved
+    assert ("invokedynamic", (0, "parse", "()Lnet/minecraft/bundler/Main$ResourceParser;")) in resolved
+    assert ("aload_0", None) in resolved
+
+    invoke = next(instruction for instruction in classfile.method("main").code.instructions if instruction[1] == 0xb7)
+    first = constant_pool.resolve_instruction(invoke)
+    assert constant_pool.resolve_instruction(invoke) is first
+    assert constant_pool.resolved[invoke[2][0]] is first
+
+    handles = [index for index in range(1, len(constant_pool)) if constant_pool.tag(index) == "Constant_MethodHandle"]
+    assert handles
+    for index in handles:
+        reference_kind, owner, name, descriptor = constant_pool.resolve(index)
+        assert 1 <= reference_kind <= 9 and descriptor.startswith("(")
+    with pytest.raises(ValueError):
+        constant_pool.resolve(0)
+
+
+def test_modified_utf8_constants(capsys):
+    import struct
+
+    from java_bytecode_disassembler.benchmark.generator import constant_pool_builder
+    from java_bytecode_disassembler.classfile import decode_modified_utf8
+
+    def utf8(raw):
+        return pool.add(("Utf8", raw), struct.pack(">BH", 1, len(raw)) + raw)
+
+    pool = constant_pool_builder()
+    this_class = pool.class_ref("test/Strings")
+    super_class = pool.class_ref("java/lang/Object")
+    nul = utf8(b"a\xc0\x80b")
+    supplementary = utf8(b"x\xed\xa0\xbd\xed\xb8\x80")   # U+1F600 as a CESU-8 surrogate pair
+    lone = utf8(b"\xed\xa0\xbd")
+    accented = utf8("café ☕".encode("utf-8"))
+    malformed = utf8(b"\xff\xfe")
+    raw_nul = utf8(b"a\x00b")
+    four_byte = utf8("\U0001f600".encode("utf-8"))   # plain UTF-8, not modified UTF-8
+    raw = (struct.pack(">IHH", 0xcafebabe, 0, 61) + pool.encode() +
+           struct.pack(">HHHHHHH", 0x0021, this_class, super_class, 0, 0, 0, 0))
+
+    constant_pool = disassemble_bytes(raw).constant_pool
+    assert constant_pool.utf8(nul) == "a\x00b"
+    assert constant_pool.utf8(supplementary) == "x\U0001f600"
+    assert constant_pool.utf8(lone) == "\ud83d"
+    assert constant_pool.utf8(accented) == "café ☕"
+    assert constant_pool.class_name(this_class) == "test/Strings"
+    assert "WARNING" not in capsys.readouterr().out
+    assert constant_pool.utf8(malformed) == "fffe"
+    assert "WARNING" in capsys.readouterr().out
+    assert constant_pool.utf8(raw_nul) == "610062"
+    assert constant_pool.utf8(four_byte) == "f09f9880"
+    assert capsys.readouterr().out.count("WARNING") == 2
+    for invalid in (b"a\x00b", "\U0001f600".encode("utf-8")):
+        with pytest.raises(UnicodeDecodeError):
+            decode_modified_utf8(invalid)
@@ -0,0 +1,111 @@
+import os
+
+from java_bytecode_disassembler import CorpusIndex
+
+MAIN = "net/minecraft/bundler/Main"
+LAYOUT = {"Main.class": "class",
+          "app.jar": {"net/minecraft/bundler/Main.class": "class", "Broken.class": "broken"}}
+
+
+def test_index_and_query(tmp_path, make_corpus):
+    corpus = make_corpus(LAYOUT)
+
+    with CorpusIndex(tmp_path / "index.sqlite", batch_size=1) as index:
+        summary = index.update(corpus, workers=1)
+        assert len(summary["added"]) == 2 and summary["classes"] == 2
+        assert summary["failed"] == [str(corpus / "app.jar") + "!/Broken.class"]
+        assert index.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        assert index.classes_named(MAIN.replace("/", ".")) == [
+            (str(corpus / "Main.class"), str(corpus / "Main.class")),
+            (str(corpus / "app.jar"), str(corpus / "app.jar") + "!/net/minecraft/bundler/Main.class")]
+        assert [(path, count, failed) for path, count, failed in index.sources()] == [
+            (str(corpus / "Main.class"), 1, 0), (str(corpus / "app.jar"), 1, 1)]
+
+        methods = index.methods_with_descriptor("([Ljava/lang/String;)V")
+        assert {(owner, name) for owner, kind, name, descriptor, flags, entry in methods} == {(MAIN, "main"),
+                                                                                             (MAIN, "run")}
+        assert index.members(name="main", kind="method", owner=MAIN)[0][4] == 0x0009
+
+        references = index.references_to("java/lang/System", "getProperty")
+        assert references and all(row[0] == MAIN and row[1] == "method" for row in references)
+        assert index.references_to("java/net/URLClassLoader", kind="class")
+        assert index.references_to("no/such/Class") == []
+
+
+def test_incremental_update(tmp_path, make_corpus):
+    corpus = make_corpus(LAYOUT)
+    pathway = tmp_path / "index.sqlite"
+
+    with CorpusIndex(pathway) as index:
+        index.update(corpus, workers=1)
+        classes = index.count("classes")
+        members = index.count("members")
+
+    with CorpusIndex(pathway) as index:
+        summary = index.update(corpus, workers=1)
+        assert summary["unchanged"] == 2 and summary["classes"] == 0
+        assert index.count("classes") == classes
+
+        stat = os.stat(corpus / "Main.class")
+        os.utime(corpus / "Main.class", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        summary = index.update(corpus, workers=1)
+        assert summary["updated"] == [str(corpus / "Main.class")] and summary["unchanged"] == 1
+        assert index.count("classes") == classes and index.count("members") == members
+
+        os.remove(corpus / "app.jar")
+        summary = index.update(corpus, workers=1)
+        assert summary["removed"] == [str(corpus / "app.jar")]
+        assert index.count("classes") == 1 and index.count("members") == members // 2
+        assert len(index.classes_named(MAIN)) == 1
+
+
+def test_interrupted_update_is_resumed(tmp_path, monkeypatch, make_corpus):
+    from java_bytecode_disassembler import corpus_index
+
+    corpus = make_corpus(LAYOUT)
+    original = corpus_index.iter_disassemble
+
+    def interrupted(*args, **kwargs):
+        for count, result in enumerate(original(*args, **kwargs)):
+            if count == 2:
+                raise KeyboardInterrupt
+            yield result
+
+    with CorpusIndex(tmp_path / "index.sqlite", batch_size=1) as index:
+        monkeypatch.setattr(corpus_index, "iter_disassemble", interrupted)
+        try:
+            index.update(corpus, workers=1)
+        except KeyboardInterrupt:
+            pass
+        monkeypatch.setattr(corpus_index, "iter_disassemble", original)
+
+        # Main.class was committed with its stamp, app.jar was not finished and is indexed again
+        summary = index.update(corpus, workers=1)
+        assert summary["unchanged"] == 1 and summary["updated"] == [str(corpus / "app.jar")]
+        assert index.count("classes") == 2
+        assert index.update(corpus, workers=1)["unchanged"] == 2
+
+
+def test_missing_root(tmp_path, make_corpus):
+    corpus = make_corpus(LAYOUT)
+
+    with CorpusIndex(tmp_path / "index.sqlite") as index:
+        index.update(corpus / "app.jar", workers=1)
+        os.remove(corpus / "app.jar")
+        summary = index.update(corpus / "app.jar", workers=1)
+        assert summary["missing"] == [str(corpus / "app.jar")]
+        assert summary["removed"] == [str(corpus / "app.jar")]
+        assert index.count("sources") == 0 and index.count("classes") == 0
+
+
+def test_class_with_broken_references(tmp_path, make_corpus, broken_class):
+    corpus = make_corpus({"Main.class": "class", "app.jar": {"test/Broken.class": broken_class, "Main.class": "class"}})
+
+    with CorpusIndex(tmp_path / "index.sqlite") as index:
+        summary = index.update(corpus, workers=1)
+        assert summary["failed"] == [str(corpus / "app.jar") + "!/test/Broken.class"]
+        assert summary["classes"] == 2
+        assert [(path, count, failed) for path, count, failed in index.sources()] == [
+            (str(corpus / "Main.class"), 1, 0), (str(corpus / "app.jar"), 1, 1)]
+        assert index.update(corpus, workers=1)["unchanged"] == 2
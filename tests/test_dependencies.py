@@ -0,0 +1,67 @@
+import os
+
+from java_bytecode_disassembler import DependencyGraph, build_dependency_graph, class_dependencies, disassemble_bytes
+from java_bytecode_disassembler.__main__ import main
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_class_dependencies_from_the_constant_pool():
+    raw = open(MAIN_CLASS, "rb").read()
+    scanned = disassemble_bytes(raw, scan="constants")
+    assert scanned.methods == [] and scanned.this_class_name == "net/minecraft/bundler/Main"
+
+    dependencies = class_dependencies(scanned)
+    assert dependencies == class_dependencies(disassemble_bytes(raw))
+    assert "net/minecraft/bundler/Main" not in dependencies
+    assert {"java/lang/Object", "java/lang/String", "java/net/URLClassLoader", "java/nio/file/Path",
+            "net/minecraft/bundler/Main$ResourceParser"} <= set(dependencies)
+    assert dependencies == sorted(set(dependencies))
+
+
+def test_dependency_graph_cycles():
+    graph = DependencyGraph()
+    graph.add("app/A", ["app/B", "lib/C", "java/lang/Object"])
+    graph.add("app/B", ["app/A", "app/B"])
+    graph.add("lib/C", ["lib/D"])
+    graph.add("lib/D", ["lib/C", "app/B"])
+    graph.add("tool/E", ["lib/C"])
+
+    assert graph.cycles() == [["app/A", "app/B", "lib/C", "lib/D"]]
+    assert graph.dependencies_of("app/B") == ["app/A"]
+    assert graph.dependents_of("lib/C") == ["app/A", "lib/D", "tool/E"]
+    assert "app/A" in graph and "java/lang/Object" not in graph
+
+    packages = graph.packages()
+    assert packages.cycles() == [["app", "lib"]]
+    assert packages.dependencies_of("tool") == ["lib"]
+
+    graph.add("lib/D", [])   # adding a class again keeps the dependencies it already had
+    assert graph.dependencies_of("lib/D") == ["app/B", "lib/C"]
+
+
+def test_dependency_cycle_check_from_the_command_line(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Main.class").write_bytes(open(MAIN_CLASS, "rb").read())
+
+    graph = build_dependency_graph(tmp_path, workers=1)
+    assert graph.classes == 1 and graph.failed == []
+    assert "java/util/List" in graph.dependencies_of("net/minecraft/bundler/Main")
+
+    assert main(["--dependency-cycles", "class", "-j", "1", str(tmp_path)]) == 0
+    assert "0 class cycles" in capsys.readouterr().out
+
+
+def test_class_with_broken_references_is_reported(tmp_path, monkeypatch, capsys, broken_class):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Main.class").write_bytes(open(MAIN_CLASS, "rb").read())
+    (tmp_path / "Broken.class").write_bytes(broken_class)
+
+    graph = build_dependency_graph(tmp_path, workers=1)
+    assert graph.classes == 1 and graph.failed == [str(tmp_path / "Broken.class")]
+    assert "test/Broken" not in graph
+
+    assert main(["--dependency-cycles", "package", "-j", "1", str(tmp_path)]) == 1
+    captured = capsys.readouterr()
+    assert "FAILED: " + str(tmp_path / "Broken.class") in captured.err
+    assert "0 package cycles" in captured.out
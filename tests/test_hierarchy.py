@@ -0,0 +1,74 @@
+import os
+import pickle
+import zipfile
+
+import pytest
+
+from java_bytecode_disassembler import Hierarchy, build_hierarchy
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def make_hierarchy():
+    hierarchy = Hierarchy()
+    hierarchy.add("java/util/Collection", "java/lang/Object", ["java/lang/Iterable"], is_interface=True)
+    hierarchy.add("java/util/List", "java/lang/Object", ["java/util/Collection"], is_interface=True)
+    hierarchy.add("java/util/AbstractCollection", "java/lang/Object", ["java/util/Collection"])
+    hierarchy.add("java/util/AbstractList", "java/util/AbstractCollection", ["java/util/List"])
+    hierarchy.add("java/util/ArrayList", "java/util/AbstractList", ["java/util/List", "java/io/Serializable"])
+    hierarchy.add("java/util/ArrayDeque", "java/util/AbstractCollection", ["java/io/Serializable"])
+    hierarchy.add("java/lang/Object", None)
+    return hierarchy
+
+
+def test_subtype_queries():
+    hierarchy = make_hierarchy()
+
+    assert hierarchy.is_subtype("java/util/ArrayList", "java/util/ArrayList")
+    assert hierarchy.is_subtype("java/util/ArrayList", "java/lang/Iterable")
+    assert hierarchy.is_subtype("java/util/ArrayDeque", "java/util/Collection")
+    assert not hierarchy.is_subtype("java/util/ArrayDeque", "java/util/List")
+    assert not hierarchy.is_subtype("java/util/Collection", "java/util/List")
+    assert not hierarchy.is_subtype("java/util/ArrayList", "no/such/Type")
+
+    assert hierarchy.all_subtypes("java/util/Collection") == [
+        "java/util/AbstractCollection", "java/util/AbstractList", "java/util/ArrayDeque", "java/util/ArrayList",
+        "java/util/List"]
+    assert hierarchy.all_subtypes("java/io/Serializable") == ["java/util/ArrayDeque", "java/util/ArrayList"]
+    assert len(hierarchy.all_subtypes("java/lang/Object")) == len(hierarchy) - 3   # Object, Iterable, Serializable
+    assert hierarchy.all_supertypes("java/util/ArrayList") == [
+        "java/io/Serializable", "java/lang/Iterable", "java/lang/Object", "java/util/AbstractCollection",
+        "java/util/AbstractList", "java/util/Collection", "java/util/List"]
+    assert hierarchy.superclass("java/util/ArrayList") == "java/util/AbstractList"
+    assert hierarchy.is_interface("java/lang/Iterable") and not hierarchy.is_interface("java/util/ArrayList")
+    assert "java/util/List" in hierarchy and "java/lang/Iterable" not in hierarchy
+
+    # adding a class drops the encoding, which is rebuilt by the next query
+    hierarchy.add("test/MyList", "java/util/ArrayList")
+    assert hierarchy.is_subtype("test/MyList", "java/lang/Iterable")
+    assert "test/MyList" in hierarchy.all_subtypes("java/util/List")
+
+
+def test_build_save_and_load(tmp_path, monkeypatch, broken_class):
+    monkeypatch.chdir(tmp_path)
+    with zipfile.ZipFile(tmp_path / "app.jar", "w") as archive:
+        archive.writestr("net/minecraft/bundler/Main.class", open(MAIN_CLASS, "rb").read())
+        archive.writestr("test/Broken.class", broken_class)
+
+    hierarchy = build_hierarchy(tmp_path, workers=1)
+    assert hierarchy.classes == 1 and hierarchy.failed == [str(tmp_path / "app.jar") + "!/test/Broken.class"]
+    assert "test/Broken" not in hierarchy and len(hierarchy) == 2
+    assert hierarchy.superclass("net/minecraft/bundler/Main") == "java/lang/Object"
+    assert hierarchy.all_subtypes("java/lang/Object") == ["net/minecraft/bundler/Main"]
+
+    hierarchy = build_hierarchy([], hierarchy=make_hierarchy())
+    pathway = hierarchy.save(tmp_path / "hierarchy.bin")
+    loaded = Hierarchy.load(pathway)
+    assert loaded.order is not None   # the encoding is stored, not rebuilt
+    assert loaded.all_subtypes("java/util/List") == ["java/util/AbstractList", "java/util/ArrayList"]
+    assert loaded.is_subtype("java/util/ArrayList", "java/lang/Iterable")
+
+    with open(tmp_path / "other.bin", "wb") as output:
+        pickle.dump((0,), output)
+    with pytest.raises(ValueError):
+        Hierarchy.load(tmp_path / "other.bin")
@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+
+from java_bytecode_disassembler import Collector, disassemble, disassemble_bytes, disassemble_many
+from java_bytecode_disassembler.__main__ import main
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_collector_counts_one_class():
+    collector = Collector()
+    classfile = disassemble(MAIN_CLASS, collector=collector)
+
+    assert (collector.classes, collector.failed, collector.bytes) == (1, 0, os.path.getsize(MAIN_CLASS))
+    # the phases consume the class from the first to the last byte
+    assert sum(consumed for calls, seconds, consumed in collector.phases.values()) == collector.bytes
+    assert collector.phases["constant_pool"][0] == 1
+    code = [attribute for method in classfile.methods for attribute in method.attributes
+            if attribute.name == "Code"]
+    assert collector.attributes["Code"][0] == len(code)
+    assert collector.instructions == sum(len(attribute.instructions) for attribute in code)
+
+
+def test_collector_counts_failures_and_partial_scans():
+    collector = Collector()
+    source = open(MAIN_CLASS, "rb").read()
+    assert disassemble_bytes(source[:100], collector=collector) is None
+    disassemble_bytes(source, scan="header", collector=collector)
+    assert (collector.classes, collector.failed) == (2, 1)
+    assert "fields" not in collector.phases
+    assert collector.phases["interfaces"][0] == 1
+
+
+def test_batch_collectors_are_merged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for index in range(3):
+        shutil.copy(MAIN_CLASS, tmp_path / ("Main" + str(index) + ".class"))
+
+    single = Collector()
+    disassemble(MAIN_CLASS, collector=single)
+    for workers in (1, 2):
+        collector = Collector()
+        disassemble_many(tmp_path, workers=workers, chunksize=1, collector=collector)
+        assert collector.classes == 3
+        assert collector.bytes == 3 * single.bytes
+        assert collector.instructions == 3 * single.instructions
+        assert collector.attributes == {name: [count * 3, length * 3]
+                                        for name, (count, length) in single.attributes.items()}
+
+
+def test_exports(tmp_path, monkeypatch):
+    collector = Collector()
+    disassemble(MAIN_CLASS, collector=collector)
+    collector.attribute("Odd\"Name\n", 4)
+
+    document = json.loads(collector.to_json())
+    assert document["classes"] == 1
+    assert document["phases"]["methods"]["calls"] == 1
+
+    text = collector.to_prometheus()
+    assert "java_bytecode_disassembler_classes_total 1\n" in text
+    assert "# TYPE java_bytecode_disassembler_phase_seconds_total counter" in text
+    assert 'java_bytecode_disassembler_attributes_total{attribute="Odd\\"Name\\n"} 1' in text
+
+    monkeypatch.chdir(tmp_path)
+    assert main([MAIN_CLASS, "-j", "1", "--metrics", "run.prom"]) == 0
+    assert "java_bytecode_disassembler_bytes_total " + str(os.path.getsize(MAIN_CLASS)) in open("run.prom").read()
@@ -0,0 +1,88 @@
+import os
+import struct
+
+import pytest
+
+from java_bytecode_disassembler import disassemble
+from java_bytecode_disassembler.opcodes import MNEMONICS, OPCODES, decode_instructions, format_instruction
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_opcode_table():
+    assert len(OPCODES) == 256
+    assert MNEMONICS[0x00] == "nop"
+    assert MNEMONICS[0x02] == "iconst_m1"
+    assert MNEMONICS[0x5a] == "dup_x1"
+    assert MNEMONICS[0xc7] == "ifnonnull"
+    assert OPCODES[0xcb] is None
+
+
+def test_fixed_size_operands():
+    code = bytes([
+        0x10, 0xff,                 # 0: bipush -1
+        0x11, 0x80, 0x00,           # 2: sipush -32768
+        0x84, 0x01, 0xfe,           # 5: iinc 1 -2
+        0xb9, 0x00, 0x07, 0x02, 0x00,   # 8: invokeinterface #7, 2
+        0xc5, 0x00, 0x09, 0x03,     # 13: multianewarray #9, 3
+        0xa7, 0xff, 0xef,           # 17: goto -17
+        0xc8, 0x00, 0x00, 0x00, 0x05,   # 20: goto_w 5
+        0xb1,                       # 25: return
+    ])
+    assert decode_instructions(code) == [
+        (0, 0x10, (-1,)), (2, 0x11, (-32768,)), (5, 0x84, (1, -2)), (8, 0xb9, (7, 2, 0)), (13, 0xc5, (9, 3)),
+        (17, 0xa7, (-17,)), (20, 0xc8, (5,)), (25, 0xb1, ()),
+    ]
+
+
+def test_switch_padding_and_wide():
+    code = bytes([0x00, 0xaa, 0x00, 0x00]) + struct.pack(">iiiii", 20, 1, 2, 30, 40)      # 1: tableswitch
+    code += bytes([0xab]) + bytes(3) + struct.pack(">iiiiii", 50, 2, -1, 60, 7, 70)        # 24: lookupswitch
+    code += bytes([0xc4, 0x15, 0x01, 0x00])                                                # 52: wide iload 256
+    code += bytes([0xc4, 0x84, 0x01, 0x00, 0xff, 0x9c])                                   # 56: wide iinc 256 -100
+    code += bytes([0xb1])                                                                  # 62: return
+
+    instructions = decode_instructions(code)
+    assert instructions == [
+        (0, 0x00, ()),
+        (1, 0xaa, (20, 1, 2, (30, 40))),
+        (24, 0xab, (50, ((-1, 60), (7, 70)))),
+        (52, 0xc4, (0x15, 256)),
+        (56, 0xc4, (0x84, 256, -100)),
+        (62, 0xb1, ()),
+    ]
+    assert format_instruction(instructions[1]) == "1: tableswitch 1 to 2 1:30 2:40 default:20"
+    assert format_instruction(instructions[3]) == "52: wide iload 256"
+
+
+def test_invalid_code():
+    with pytest.raises(ValueError):
+        decode_instructions(bytes([0x00, 0xcb]))
+    with pytest.raises(EOFError):
+        decode_instructions(bytes([0x11, 0x00]))
+
+
+def test_truncated_variable_length_instructions():
+    truncated = (
+        b"\xc4",                                   # wide without the modified opcode
+        b"\xc4\x15\x00",                           # wide iload without the second index byte
+        b"\xc4\x84\x00\x01\x00",                   # wide iinc without the second increment byte
+        b"\xaa\x00\x00\x00\x00\x00\x00\x00",       # tableswitch cut off in its default offset
+        b"\xaa\x00\x00\x00" + struct.pack(">iii", 0, 0, 1) + struct.pack(">i", 0),   # one of two offsets
+        b"\xab\x00\x00\x00" + struct.pack(">ii", 0, 2) + struct.pack(">ii", 1, 0),   # one of two pairs
+    )
+    for code in truncated:
+        with pytest.raises(EOFError):
+            decode_instructions(code)
+        with pytest.raises(EOFError):
+            decode_instructions(memoryview(code))
+
+
+def test_code_attribute_instructions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main = disassemble(MAIN_CLASS).method("main", "([Ljava/lang/String;)V")
+
+    instructions = main.code.instructions
+    assert instructions[0][0] == 0
+    assert MNEMONICS[instructions[-1][1]] == "return"
+    assert len(instructions) < len(main.code.code)
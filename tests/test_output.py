@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import pickle
+
+from java_bytecode_disassembler import classfile_to_dict, disassemble, write_classfile
+from java_bytecode_disassembler.__main__ import main
+from java_bytecode_disassembler.output import loads
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_single_file_json_and_binary(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    classfile = disassemble(MAIN_CLASS)
+
+    document = classfile_to_dict(classfile)
+    assert document["type"] == "ClassFile"
+    assert document["major_version"] == 61
+    assert len(document["constant_pool"]) == len(classfile.constant_pool)
+    main = [method for method in document["methods"] if method["name"] == "main"][0]
+    code = main["attributes"][0]
+    assert code["type"] == "CodeAttribute"
+    assert bytes.fromhex(code["code"]) == classfile.method("main").code.code
+
+    json_path = write_classfile(classfile, str(tmp_path / "Main.json"))
+    binary_path = write_classfile(classfile, str(tmp_path / "Main.bin"), format="binary")
+    assert json.loads(open(json_path, "rb").read()) == document
+    binary = pickle.loads(open(binary_path, "rb").read())
+    assert binary == loads(open(binary_path, "rb").read(), "binary")
+    assert binary["methods"][0]["attributes"][0]["code"] == classfile.methods[0].code.code
+    assert os.path.getsize(binary_path) < os.path.getsize(json_path)
+    assert sorted(os.listdir(tmp_path)) == ["Main.bin", "Main.json"]
+
+
+def test_command_line_output_formats(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    broken = tmp_path / "Broken.class"
+    broken.write_bytes(open(MAIN_CLASS, "rb").read()[:100])
+
+    assert main(["-j", "1", "--format", "json", "-o", "out", MAIN_CLASS]) == 0
+    assert os.listdir(tmp_path / "out") == ["net.minecraft.bundler.Main.json"]
+
+    assert main(["-j", "1", "--format", "jsonl", "-o", "batch.jsonl", MAIN_CLASS, str(broken)]) == 1
+    assert main(["-j", "1", "--format", "jsonl", "-o", "batch.jsonl", MAIN_CLASS]) == 0
+    lines = [json.loads(line) for line in io.open(tmp_path / "batch.jsonl", encoding="utf-8")]
+    assert [line["ok"] for line in lines] == [True, False, True]
+    assert lines[0]["classfile"]["this_class"] == lines[2]["classfile"]["this_class"]
+    assert "EOFError" in lines[1]["error"]
+
+
+def test_same_class_from_several_inputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir(tmp_path / "copy")
+    copy = tmp_path / "copy" / "Main.class"
+    copy.write_bytes(open(MAIN_CLASS, "rb").read())
+
+    assert main(["-j", "1", "--format", "json", "-o", "out", MAIN_CLASS, str(copy), MAIN_CLASS]) == 0
+    assert sorted(os.listdir(tmp_path / "out")) == ["net.minecraft.bundler.Main.json", "net.minecraft.bundler.Main~2.json",
+                                                    "net.minecraft.bundler.Main~3.json"]
+
+
+def test_non_finite_constants_and_unreadable_names():
+    import struct
+
+    from java_bytecode_disassembler import DisassemblyResult, disassemble_bytes
+    from java_bytecode_disassembler.benchmark.generator import constant_pool_builder
+    from java_bytecode_disassembler.output import dumps, output_name
+
+    pool = constant_pool_builder()
+    this_class = pool.class_ref("test/Constants")
+    super_class = pool.class_ref("java/lang/Object")
+    nan = pool.add(("Float", "nan"), struct.pack(">BI", 4, 0x7fc00000))
+    infinity = pool.add(("Double", "-inf"), struct.pack(">Bd", 6, float("-inf")), slots=2)
+    raw = (struct.pack(">IHH", 0xcafebabe, 0, 61) + pool.encode() +
+           struct.pack(">HHHHHHH", 0x0021, this_class, super_class, 0, 0, 0, 0))
+    classfile = disassemble_bytes(raw)
+
+    def reject(token):
+        raise ValueError(token)
+
+    document = json.loads(dumps(classfile), parse_constant=reject)
+    assert document["constant_pool"][nan] == ["Constant_Float", "NaN"]
+    assert document["constant_pool"][infinity] == ["Constant_Double", "-Infinity"]
+    assert loads(dumps(classfile, "binary"), "binary")["constant_pool"][infinity][1] == float("-inf")
+
+    classfile.this_class = super_class - 1   # the Utf8 entry holding the name of the super class
+    assert output_name(DisassemblyResult("lib.jar!/test/Constants.class", classfile)) == "Constants.json"
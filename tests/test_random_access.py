@@ -0,0 +1,79 @@
+import os
+import shutil
+
+from java_bytecode_disassembler import ClassIndex, disassemble, open_class
+from java_bytecode_disassembler.random_access import clear_index_cache
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_offset_map_covers_the_class():
+    classfile = disassemble(MAIN_CLASS)
+    offsets = classfile.offsets
+    raw = open(MAIN_CLASS, "rb").read()
+
+    assert len(offsets.constants) == len(classfile.constant_pool)
+    end = 10   # the constant pool starts after the magic number, the versions and constant_pool_count
+    for entry in offsets.constants:
+        if entry is not None:
+            assert entry[0] == end
+            end = entry[0] + entry[1]
+    assert len(offsets.methods) == len(classfile.methods)
+    assert offsets.attributes[-1][0] + offsets.attributes[-1][1] == len(raw)
+
+    for method, (offset, length) in zip(classfile.methods, offsets.methods):
+        assert raw[offset + 2:offset + 4] == method.name_index.to_bytes(2, "big")
+        assert sum(attribute_length for attribute_offset, attribute_length in method.attribute_offsets) == length - 8
+
+
+def test_class_index_decodes_single_methods(tmp_path):
+    classfile = disassemble(MAIN_CLASS)
+    copy = tmp_path / "Main.class"
+    shutil.copy(MAIN_CLASS, copy)
+    clear_index_cache()
+
+    index = open_class(copy)
+    assert index.methods == [(method.name, method.descriptor) for method in classfile.methods]
+    assert all(method.attributes == [] for method in index.classfile.methods)   # nothing was decoded up front
+
+    method = index.method("readResource")
+    assert method.code.instructions == classfile.method("readResource").code.instructions
+    assert index.method("readResource") is method
+    assert index.method("missing") is None
+    assert index.method_attribute("main", "([Ljava/lang/String;)V", "Code").max_stack == 2
+    assert index.attribute("SourceFile").sourcefile_index == classfile.attribute("SourceFile").sourcefile_index
+
+    assert open_class(copy) is index
+    copy.write_bytes(open(MAIN_CLASS, "rb").read())
+    os.utime(copy, ns=(index.stamp[0] + 10 ** 9, index.stamp[0] + 10 ** 9))
+    assert open_class(copy) is not index   # the file changed, so it is indexed again
+
+    with ClassIndex(source=open(MAIN_CLASS, "rb").read()) as in_memory:
+        assert in_memory.method("main").code.max_locals == classfile.method("main").code.max_locals
+
+
+def test_open_class_holds_no_mapping_of_small_files(tmp_path, monkeypatch):
+    from java_bytecode_disassembler import random_access
+
+    copies = []
+    for name in ("A.class", "B.class"):
+        shutil.copy(MAIN_CLASS, tmp_path / name)
+        copies.append(tmp_path / name)
+    clear_index_cache()
+
+    index = open_class(copies[0])
+    assert isinstance(index.buffer, bytes)   # the file can be replaced while it is indexed
+    os.replace(copies[1], copies[0])
+    copies[1].write_bytes(open(MAIN_CLASS, "rb").read())
+
+    # large files are mapped, and the mapping is closed once the index leaves the cache
+    monkeypatch.setattr(random_access, "MMAP_THRESHOLD", 0)
+    monkeypatch.setattr(random_access, "INDEX_CACHE_SIZE", 1)
+    clear_index_cache()
+    mapped = open_class(copies[0])
+    method = mapped.method("main")
+    assert not mapped.buffer.closed
+    open_class(copies[1])
+    assert mapped.buffer.closed
+    assert method.code.max_stack == 2
+    clear_index_cache()
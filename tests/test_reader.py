@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from java_bytecode_disassembler.reader import class_reader
+
+MAIN_CLASS = os.path.join(os.path.dirname(__file__), "Main.class")
+
+
+def test_big_endian_reads():
+    data = class_reader(bytes.fromhex("cafebabe0000003d0212ff"))
+    assert data.u4() == 0xCAFEBABE
+    assert data.u2() == 0
+    assert data.u2() == 61
+    assert data.u2() == 0x0212
+    assert data.u1() == 0xFF
+    assert data.remaining() == 0
+
+
+def test_read_is_zero_copy_and_bounded():
+    raw = bytearray(b"\x00\x03abcdef")
+    data = class_reader(raw)
+    length = data.u2()
+    chunk = data.read(length)
+    assert isinstance(chunk, memoryview)
+    assert bytes(chunk) == b"abc"
+    data.skip(2)
+    assert data.remaining() == 1
+    with pytest.raises(EOFError):
+        data.read(2)
+
+
+def test_main_class_parses_to_the_end(tmp_path, monkeypatch, capsys):
+    from java_bytecode_disassembler import disassembler
+
+    monkeypatch.chdir(tmp_path)
+    disassembler(MAIN_CLASS, write=False, verbose=True)
+    assert "Complete" in capsys.readouterr().out
+
+
+def test_truncated_values_raise_eof():
+    with pytest.raises(EOFError):
+        class_reader(b"\x01").u2()
+    with pytest.raises(EOFError):
+        class_reader(b"").u1()
+
+
+def test_bulk_tables():
+    import struct
+
+    reader = class_reader(bytes([0, 1, 0, 2, 0xff, 0xfe, 0, 3, 0, 4, 0, 5]))
+    assert reader.table(struct.Struct(">HH"), 2) == [(1, 2), (0xfffe, 3)]
+    assert reader.u2_array(2).tolist() == [4, 5]
+    assert reader.offset == 12
+    assert reader.table(struct.Struct(">HH"), 0) == []
+    with pytest.raises(EOFError):
+        reader.u2_array(1)
+
+
+def test_large_classes_are_parsed_from_a_mapping(tmp_path, monkeypatch):
+    from java_bytecode_disassembler import disassembler, java_bytecode_disassembler
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(java_bytecode_disassembler, "MMAP_THRESHOLD", 0)
+    mapped = []
+    original = java_bytecode_disassembler.map_stream
+    monkeypatch.setattr(java_bytecode_disassembler, "map_stream", lambda stream: mapped.append(1) or original(stream))
+
+    parser = disassembler(MAIN_CLASS, write=False)
+    assert mapped and parser.classfile.method("main").code.max_stack == 2
+    assert parser.mapping is None   # closed once the parse is done
+
+    lazy = disassembler(MAIN_CLASS, write=False, lazy=True)
+    assert not lazy.mapping.closed   # the deferred Code attributes still read from it
+    assert lazy.classfile.method("main").code.max_stack == 2